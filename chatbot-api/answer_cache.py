@@ -0,0 +1,133 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from retriever import normalize_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_question(question: str) -> str:
+    """Accent-folded, lowercased words: "Âge minimum chez Qatar ?" -> "age minimum chez qatar"."""
+    return " ".join(normalize_tokens(question))
+
+
+class AnswerCache:
+    """Chat answers: in-memory LRU with TTL, plus an optional SQLite tier that survives restarts.
+
+    Keys cover the normalized question, language, include_sources, brief, the
+    knowledge-base version and the model name, so a new cabin_docs.json or model
+    never serves an old answer; entries of previous versions are purged from disk.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 6 * 3600, sqlite_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._db = None
+        self._kb_version = None
+        self.counters = {"hits_memory": 0, "hits_disk": 0, "misses": 0, "stores": 0,
+                         "bypassed": 0, "expired": 0, "evicted": 0}
+        if sqlite_path:
+            os.makedirs(os.path.dirname(os.path.abspath(sqlite_path)), exist_ok=True)
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS answers ("
+                             "key TEXT PRIMARY KEY, value TEXT NOT NULL, kb_version TEXT NOT NULL, "
+                             "model TEXT NOT NULL, created_at REAL NOT NULL, expires_at REAL NOT NULL)")
+
+    @classmethod
+    def from_env(cls) -> Optional["AnswerCache"]:
+        """CHAT_CACHE_ENABLED (1), CHAT_CACHE_MAX_ENTRIES (1024), CHAT_CACHE_TTL seconds (21600),
+        CHAT_CACHE_SQLITE (path of the persistent tier, disabled when empty)."""
+        if os.getenv("CHAT_CACHE_ENABLED", "1") != "1":
+            return None
+        return cls(max_entries=int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "1024")),
+                   ttl=float(os.getenv("CHAT_CACHE_TTL", str(6 * 3600))),
+                   sqlite_path=os.getenv("CHAT_CACHE_SQLITE") or None)
+
+    @staticmethod
+    def make_key(question: str, language: str, include_sources: bool, brief: bool,
+                 kb_version: str, model: str) -> str:
+        raw = json.dumps([normalize_question(question), language, bool(include_sources), bool(brief),
+                          kb_version, model])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def set_kb_version(self, kb_version: str):
+        """Drop every entry built on another knowledge base (called on each request, cheap)."""
+        if kb_version == self._kb_version:
+            return
+        with self._lock:
+            if self._kb_version is not None:
+                logger.info("cabin_docs.json modifié: cache des réponses vidé")
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM answers WHERE kb_version != ?", (kb_version,))
+            self._kb_version = kb_version
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.counters["hits_memory"] += 1
+                    return entry[1]
+                del self._memory[key]
+                self.counters["expired"] += 1
+            if self._db is not None:
+                row = self._db.execute("SELECT value, expires_at FROM answers WHERE key = ? AND expires_at > ?",
+                                       (key, now)).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, row[1], value)
+                    self.counters["hits_disk"] += 1
+                    return value
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, key: str, value: dict, model: str = ""):
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self.counters["stores"] += 1
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?)",
+                                 (key, json.dumps(value, ensure_ascii=False), self._kb_version or "",
+                                  model, now, expires_at))
+
+    def _remember(self, key: str, expires_at: float, value: dict):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.counters["evicted"] += 1
+
+    def record_bypass(self):
+        self.counters["bypassed"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM answers")
+
+    def stats(self) -> dict:
+        hits = self.counters["hits_memory"] + self.counters["hits_disk"]
+        lookups = hits + self.counters["misses"]
+        stats = dict(self.counters, entries_memory=len(self._memory), max_entries=self.max_entries,
+                     ttl_s=self.ttl, hit_ratio=round(hits / lookups, 4) if lookups else 0.0,
+                     kb_version=self._kb_version, persistent=self._db is not None)
+        if self._db is not None:
+            with self._lock:
+                stats["entries_disk"] = self._db.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        return stats
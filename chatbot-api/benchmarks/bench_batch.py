@@ -0,0 +1,98 @@
+"""FAQ refresh: N sequential /chat calls vs one POST /chat/batch.
+
+Runs the API under uvicorn against the local Gemini stub (fixed latency), with
+the answer caches disabled so every question reaches Gemini, and reports the
+throughput of both ways plus the retrieval cost alone (per-question loop vs
+one batched BM25 pass). Also checks that a failing question only fails its own
+item.
+
+Usage:
+    python benchmarks/bench_batch.py --latency 0.2 --concurrency 1 8 16
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from bench_llm_client import GeminiStub  # noqa: E402
+from bench_streaming import free_port  # noqa: E402
+
+EVAL_PATH = os.path.join(ROOT, "benchmarks", "data", "retrieval_eval.tsv")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of /chat/batch vs sequential /chat")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub response time (s)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 16],
+                        help="CHAT_BATCH_CONCURRENCY values")
+    args = parser.parse_args()
+
+    with open(EVAL_PATH, encoding="utf-8") as fh:
+        questions = [line.rstrip("\n").split("\t")[1] for line in fh if line.strip()]
+
+    url = GeminiStub(args.latency).start()
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    os.environ["CHAT_CACHE_ENABLED"] = "0"
+    os.environ["CHAT_SEMANTIC_CACHE"] = "0"
+
+    import uvicorn
+    import main as api
+    api.gemini_client.api_url = url
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(api.app, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    start = time.perf_counter()
+    for question in questions:
+        api.mock_retriever.retrieve(question)
+    loop_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    api.mock_retriever.retrieve_batch(questions)
+    batch_ms = (time.perf_counter() - start) * 1000
+    print(f"Retrieval of {len(questions)} questions: loop {loop_ms:.1f} ms, batched {batch_ms:.1f} ms")
+
+    print(f"{len(questions)} questions, stub latency {args.latency * 1000:.0f} ms")
+    print(f"  {'':<34}{'time s':>9}{'questions/s':>13}")
+    with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=300) as client:
+        start = time.perf_counter()
+        sequential = [client.post("/chat", json={"question": q}).json()["answer"] for q in questions]
+        elapsed = time.perf_counter() - start
+        print(f"  {'sequential /chat':<34}{elapsed:>9.2f}{len(questions) / elapsed:>13.1f}")
+
+        for concurrency in args.concurrency:
+            api.CHAT_BATCH_CONCURRENCY = concurrency
+            start = time.perf_counter()
+            results = client.post("/chat/batch", json=[{"question": q} for q in questions]).json()["results"]
+            elapsed = time.perf_counter() - start
+            assert [r["index"] for r in results] == list(range(len(questions)))
+            assert [r["answer"] for r in results] == sequential
+            label = f"/chat/batch, concurrency {concurrency}"
+            print(f"  {label:<34}{elapsed:>9.2f}{len(questions) / elapsed:>13.1f}")
+
+        # One question failing inside the pipeline
+        build_prompt = api.build_prompt
+
+        def failing_build_prompt(question, *a, **kw):
+            if "visa" in question:
+                raise ValueError("prompt invalide")
+            return build_prompt(question, *a, **kw)
+
+        api.build_prompt = failing_build_prompt
+        results = client.post("/chat/batch", json=[{"question": "salaire Qatar"}, {"question": "visa Emirates"},
+                                                   {"question": "taille Qatar"}]).json()["results"]
+        api.build_prompt = build_prompt
+        print("\nPer-item errors: " + ", ".join(f"{r['index']}: {r['error'] or 'ok'}" for r in results))
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
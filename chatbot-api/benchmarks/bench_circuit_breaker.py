@@ -0,0 +1,131 @@
+"""/chat latency during a Gemini outage, with and without the circuit breaker.
+
+A local stub plays three modes: "hang" (never answers: every call waits for
+the client timeout, 30 s in production, --timeout here), "429" (quota
+exceeded with a Retry-After header) and "ok". Requests use distinct questions
+so neither the caches nor request coalescing hide the upstream calls.
+
+Usage:
+    python benchmarks/bench_circuit_breaker.py --requests 40 --concurrency 8 --timeout 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from bench_llm_client import ANSWER, GeminiStub  # noqa: E402
+from llm_client import CircuitBreaker, GeminiClient  # noqa: E402
+
+
+class OutageStub(GeminiStub):
+    def __init__(self, latency: float):
+        super().__init__(latency)
+        self.mode = "ok"
+        self.retry_after = 1
+        self.calls = 0
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                await reader.readexactly(length)
+                self.calls += 1
+                if self.mode == "hang":
+                    await asyncio.sleep(3600)
+                await asyncio.sleep(self.latency)
+                if self.mode == "429":
+                    body = json.dumps({"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}}).encode()
+                    writer.write(b"HTTP/1.1 429 Too Many Requests\r\nContent-Type: application/json\r\n"
+                                 b"Retry-After: %d\r\nContent-Length: %d\r\n\r\n" % (self.retry_after, len(body)) + body)
+                else:
+                    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                                 b"Content-Length: %d\r\n\r\n" % len(ANSWER) + ANSWER)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+async def load(client, total, concurrency, tag):
+    slots = asyncio.Semaphore(concurrency)
+    timings = []
+
+    async def one(i):
+        async with slots:
+            start = time.perf_counter()
+            response = await client.post("/chat", json={"question": f"{tag} question {i} taille Qatar"})
+            assert response.status_code == 200, response.text
+            timings.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one(i) for i in range(total)))
+    timings.sort()
+    return statistics.median(timings), timings[max(0, int(len(timings) * 0.99) - 1)]
+
+
+async def main_async(args):
+    stub = OutageStub(0.05)
+    url = stub.start()
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    os.environ["CHAT_CACHE_ENABLED"] = "0"
+    os.environ["CHAT_SEMANTIC_CACHE"] = "0"
+    import main as api
+
+    print(f"{args.requests} requests per run, concurrency {args.concurrency}, client timeout {args.timeout:.0f} s")
+    print(f"  {'':<40}{'p50 ms':>10}{'p99 ms':>10}{'Gemini calls':>14}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://api",
+                                 timeout=None) as client:
+        for mode in ("hang", "429"):
+            stub.mode, stub.retry_after = mode, 30
+            breaker = CircuitBreaker(open_seconds=30)
+            # The breaker opens during its first run; the second run shows the open circuit
+            runs = [("no breaker", GeminiClient("bench", url, timeout=args.timeout)),
+                    ("breaker, first requests", GeminiClient("bench", url, timeout=args.timeout, breaker=breaker)),
+                    ("breaker, circuit open", None)]
+            for label, gemini_client in runs:
+                if gemini_client is not None:
+                    await api.gemini_client.aclose()
+                    api.gemini_client = gemini_client
+                calls = stub.calls
+                p50, p99 = await load(client, args.requests, args.concurrency, f"{mode}-{label}")
+                print(f"  {mode + ' outage, ' + label:<40}{p50:>10.0f}{p99:>10.0f}{stub.calls - calls:>14}")
+
+        await api.gemini_client.aclose()
+
+        # Recovery: 429 with Retry-After: 1 s, then Gemini is back
+        breaker = CircuitBreaker(open_seconds=30)
+        api.gemini_client = GeminiClient("bench", url, timeout=args.timeout, breaker=breaker)
+        stub.mode, stub.retry_after = "429", 1
+        await client.post("/chat", json={"question": "recovery 1"})
+        print(f"\nAfter a 429 with Retry-After: 1 -> {breaker.state}, retry in {breaker.retry_in():.1f} s")
+        stub.mode = "ok"
+        await asyncio.sleep(1.1)
+        print(f"1.1 s later -> {breaker.state}")
+        answer = (await client.post("/chat", json={"question": "recovery 2"})).json()["answer"]
+        print(f"Probe answered {answer!r} -> {breaker.state}; stats {breaker.stats()}")
+        await api.gemini_client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Circuit breaker during a Gemini outage")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=2.0, help="Gemini client timeout (s)")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
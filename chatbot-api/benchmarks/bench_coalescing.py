@@ -0,0 +1,116 @@
+"""Burst of identical /chat questions: Gemini calls with and without coalescing.
+
+Sends --burst concurrent requests for the same question (with spelling
+variants that normalize to the same cache key) to the API in-process, against
+a local Gemini stub, and counts upstream calls. Then checks that an upstream
+exception reaches every waiter and that cancelling some waiters keeps the
+shared call alive while cancelling all of them aborts it.
+
+Usage:
+    python benchmarks/bench_coalescing.py --burst 50 --latency 0.3
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from bench_llm_client import GeminiStub  # noqa: E402
+from coalescing import RequestCoalescer  # noqa: E402
+
+VARIANTS = ["Quelle est la taille minimale chez Qatar Airways ?", "quelle est la taille minimale chez qatar airways",
+            "Quelle est la taille minimale chez Qatar Airways?!", "QUELLE EST LA TAILLE MINIMALE CHEZ QATAR AIRWAYS"]
+
+
+async def burst(api, size):
+    calls = 0
+    generate = api.gemini_client.generate
+
+    async def counting_generate(prompt):
+        nonlocal calls
+        calls += 1
+        return await generate(prompt)
+
+    api.gemini_client.generate = counting_generate
+    api.answer_cache.clear()
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(client.post("/chat", json={"question": VARIANTS[i % len(VARIANTS)]})
+                                           for i in range(size)))
+        elapsed = time.perf_counter() - start
+    api.gemini_client.generate = generate
+    assert all(r.status_code == 200 for r in responses), [r.text for r in responses if r.status_code != 200][:1]
+    assert len({r.json()["answer"] for r in responses}) == 1
+    return calls, elapsed
+
+
+async def check_errors_and_cancellation(latency):
+    coalescer = RequestCoalescer()
+
+    async def failing():
+        await asyncio.sleep(latency)
+        raise RuntimeError("quota")
+
+    results = await asyncio.gather(*(coalescer.run("k", failing) for _ in range(5)), return_exceptions=True)
+    print(f"Upstream exception: {sum(isinstance(r, RuntimeError) for r in results)}/5 waiters received it")
+
+    finished = []
+
+    async def slow():
+        await asyncio.sleep(latency)
+        finished.append(True)
+        return "ok"
+
+    waiters = [asyncio.ensure_future(coalescer.run("k", slow)) for _ in range(3)]
+    await asyncio.sleep(latency / 3)
+    waiters[0].cancel()
+    print(f"One of 3 waiters cancelled: others got {await asyncio.gather(*waiters[1:])}")
+
+    waiters = [asyncio.ensure_future(coalescer.run("k", slow)) for _ in range(3)]
+    await asyncio.sleep(latency / 3)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    await asyncio.sleep(latency)
+    print(f"All waiters cancelled: upstream completions {len(finished)} (1 expected), stats {coalescer.stats()}")
+
+
+async def main_async(args):
+    url = GeminiStub(args.latency).start()
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    os.environ["CHAT_SEMANTIC_CACHE"] = "0"
+    import main as api
+    api.gemini_client.api_url = url
+    await api.gemini_client.start()
+
+    print(f"{args.burst} concurrent identical questions, stub latency {args.latency * 1000:.0f} ms")
+    print(f"  {'':<22}{'Gemini calls':>14}{'time s':>9}")
+    coalescer = api.coalescer
+    api.coalescer = None
+    calls, elapsed = await burst(api, args.burst)
+    print(f"  {'without coalescing':<22}{calls:>14}{elapsed:>9.2f}")
+    api.coalescer = coalescer
+    calls, elapsed = await burst(api, args.burst)
+    print(f"  {'with coalescing':<22}{calls:>14}{elapsed:>9.2f}")
+    print(f"  coalescer stats: {coalescer.stats()}\n")
+    await api.gemini_client.aclose()
+
+    await check_errors_and_cancellation(args.latency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gemini calls saved by request coalescing")
+    parser.add_argument("--burst", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.3)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
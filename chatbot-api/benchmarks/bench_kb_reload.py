@@ -0,0 +1,109 @@
+"""cabin_docs.json hot reload: rebuild cost and query latency during reloads.
+
+Writes a synthetic knowledge base to a temporary file, then reports the
+initial build, a reload after editing --edited of the documents (only those
+are re-tokenized), and query latency while another thread keeps reloading
+alternating versions of the file (queries read the current snapshot and never
+wait for a reload).
+
+Usage:
+    python benchmarks/bench_kb_reload.py --docs 10000 100000 --edited 0.01
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from bench_retriever import TOPICS, synthetic_docs, synthetic_questions  # noqa: E402
+from retriever import CabinCrewRetriever  # noqa: E402
+
+
+def write_docs(path, docs):
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(docs, fh)
+
+
+def query_latencies(retriever, questions, duration):
+    timings, versions = [], set()
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        for question in questions:
+            start = time.perf_counter()
+            retriever.retrieve(question)
+            timings.append((time.perf_counter() - start) * 1000)
+            versions.add(retriever.version)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1], timings[-1], len(versions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Knowledge-base hot reload")
+    parser.add_argument("--docs", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--edited", type=float, default=0.01, help="fraction of documents edited")
+    parser.add_argument("--duration", type=float, default=3.0, help="query time per phase (s)")
+    args = parser.parse_args()
+    logging.getLogger("retriever").setLevel(logging.WARNING)
+
+    rng = random.Random(0)
+    vocabulary = TOPICS + [f"w{i}" for i in range(20_000)]
+    questions = synthetic_questions(50, rng, vocabulary)
+
+    for count in args.docs:
+        docs = synthetic_docs(count, rng, vocabulary)
+        edited = [dict(doc) for doc in docs]
+        for doc in rng.sample(edited, max(1, int(count * args.edited))):
+            doc["text"] += " " + rng.choice(TOPICS)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cabin_docs.json")
+            write_docs(path, docs)
+            start = time.perf_counter()
+            retriever = CabinCrewRetriever(json_path=path)
+            build_s = time.perf_counter() - start
+
+            write_docs(path, edited)
+            start = time.perf_counter()
+            assert retriever.reload_if_changed()
+            reload_s = time.perf_counter() - start
+            print(f"{count} documents: initial build {build_s:.2f} s, reload after editing "
+                  f"{retriever.reload_stats['retokenized']} documents {reload_s:.2f} s "
+                  f"(index rebuild {retriever.reload_stats['last_reload_s']:.2f} s)")
+
+            idle = query_latencies(retriever, questions, args.duration)
+
+            stop = threading.Event()
+            reloads = 0
+
+            def reloader():
+                nonlocal reloads
+                versions = [docs, edited]
+                while not stop.is_set():
+                    write_docs(path, versions[reloads % 2])
+                    os.utime(path, ns=(time.time_ns(), time.time_ns() + reloads))
+                    if retriever.reload_if_changed():
+                        reloads += 1
+
+            thread = threading.Thread(target=reloader)
+            thread.start()
+            busy = query_latencies(retriever, questions, args.duration)
+            stop.set()
+            thread.join()
+
+            print(f"  {'':<30}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}{'versions':>10}")
+            print(f"  {'no reload':<30}{idle[0]:>9.2f}{idle[1]:>9.2f}{idle[2]:>9.2f}{idle[3]:>10}")
+            print(f"  {f'reloading continuously ({reloads})':<30}{busy[0]:>9.2f}{busy[1]:>9.2f}"
+                  f"{busy[2]:>9.2f}{busy[3]:>10}")
+
+
+if __name__ == "__main__":
+    main()
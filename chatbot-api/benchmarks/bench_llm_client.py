@@ -0,0 +1,129 @@
+"""Concurrent LLM calls against a local Gemini stub: blocking requests vs GeminiClient.
+
+The stub answers every generateContent call after a fixed latency and counts TCP
+connections. The blocking variant reproduces the previous call_gemini_api (a new
+requests.post from inside a coroutine: the event loop is frozen for the whole call).
+
+Usage:
+    python benchmarks/bench_llm_client.py --latency 0.2 --requests 64 --concurrency 1 8 32 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_client import GeminiClient, build_payload, extract_answer_text  # noqa: E402
+
+ANSWER = json.dumps({"candidates": [{"content": {"parts": [{"text": "Réponse de test"}]}}]}).encode()
+
+
+class GeminiStub:
+    """Minimal HTTP/1.1 keep-alive server running its own event loop in a thread."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.connections = 0
+        self.loop = asyncio.new_event_loop()
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.server = self.loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.ready.set()
+        self.loop.run_forever()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                await reader.readexactly(length)
+                await asyncio.sleep(self.latency)
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: %d\r\nConnection: keep-alive\r\n\r\n" % len(ANSWER) + ANSWER)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def start(self) -> str:
+        self.thread.start()
+        self.ready.wait()
+        return f"http://127.0.0.1:{self.port}/v1/models/stub:generateContent"
+
+
+async def legacy_call(url: str) -> str:
+    # Previous implementation: blocking call inside the coroutine, new connection each time
+    response = requests.post(f"{url}?key=test", headers={"Content-Type": "application/json"},
+                             json=build_payload("question"), timeout=30)
+    return extract_answer_text(response.json())
+
+
+async def run(label, call, total, concurrency, stub):
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with slots:
+            return await call()
+
+    connections = stub.connections
+    start = time.perf_counter()
+    answers = await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    assert all(a == "Réponse de test" for a in answers), answers[:3]
+    print(f"  {label:<28}{concurrency:>6}{total / elapsed:>10.1f}{elapsed:>9.2f}{stub.connections - connections:>8}")
+
+
+async def main_async(args):
+    stub = GeminiStub(args.latency)
+    url = stub.start()
+    print(f"Stub latency {args.latency * 1000:.0f} ms, {args.requests} calls per run")
+    print(f"  {'':<28}{'conc.':>6}{'req/s':>10}{'time s':>9}{'conns':>8}")
+
+    for concurrency in args.concurrency:
+        await run("requests (blocking)", lambda: legacy_call(url), args.requests, concurrency, stub)
+
+    for concurrency in args.concurrency:
+        client = GeminiClient("test", url, max_concurrency=concurrency,
+                              max_connections=concurrency, max_keepalive=concurrency)
+        await client.start()
+        await run("GeminiClient (pooled)", lambda: client.generate("question"), args.requests, concurrency, stub)
+        await client.aclose()
+
+    # Cancellation: the slot and the connection are released immediately
+    client = GeminiClient("test", url, max_concurrency=1)
+    task = asyncio.ensure_future(client.generate("question"))
+    await asyncio.sleep(args.latency / 4)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    start = time.perf_counter()
+    await client.generate("question")
+    print(f"\nCall after a cancelled one: {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"(cancelled={client.cancelled}, in_flight={client.in_flight})")
+    await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test of the Gemini client against a local stub")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub response time (s)")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Ranking quality and latency: overlap count vs BM25.
+
+Quality: top-1 accuracy and MRR@3 on labelled questions about cabin_docs.json
+(benchmarks/data/retrieval_eval.tsv). Latency: synthetic knowledge base, one
+question at a time and as a batch (BM25 scores a batch in one sparse product).
+
+Usage:
+    python benchmarks/bench_ranking.py --docs 100000 --queries 256
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from bench_retriever import legacy_retrieve, synthetic_docs, synthetic_questions, TOPICS  # noqa: E402
+from retriever import RANKINGS, CabinCrewRetriever  # noqa: E402
+
+EVAL_PATH = os.path.join(ROOT, "benchmarks", "data", "retrieval_eval.tsv")
+
+
+def quality(retrieve, samples):
+    hits, reciprocal = 0, 0.0
+    for expected, question in samples:
+        ids = [doc["id"] for doc in retrieve(question)]
+        hits += bool(ids) and ids[0] == expected
+        reciprocal += 1 / (ids.index(expected) + 1) if expected in ids else 0.0
+    return hits / len(samples), reciprocal / len(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ranking: overlap vs BM25")
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=256)
+    args = parser.parse_args()
+
+    with open(EVAL_PATH, encoding="utf-8") as fh:
+        samples = [line.rstrip("\n").split("\t", 1) for line in fh if line.strip()]
+    retriever = CabinCrewRetriever()
+    print(f"Quality on cabin_docs.json ({len(samples)} labelled questions)")
+    print(f"  {'':<30}{'top-1':>8}{'MRR@3':>8}")
+    scorers = [(ranking, lambda q, r=ranking: retriever.retrieve(q, top_k=3, ranking=r)) for ranking in RANKINGS]
+    # Previous scorer: overlap without accent folding, "Qatar_Airways" kept as one token
+    scorers.append(("overlap (previous tokenizer)", lambda q: legacy_retrieve(retriever.docs, q, top_k=3)))
+    for label, retrieve in scorers:
+        top1, mrr = quality(retrieve, samples)
+        print(f"  {label:<30}{top1:>8.1%}{mrr:>8.3f}")
+
+    rng = random.Random(0)
+    vocabulary = TOPICS + [f"w{i}" for i in range(20_000)]
+    docs = synthetic_docs(args.docs, rng, vocabulary)
+    questions = synthetic_questions(args.queries, rng, vocabulary)
+    start = time.perf_counter()
+    retriever = CabinCrewRetriever(docs=docs)
+    print(f"\nLatency on {args.docs} synthetic documents (built in {time.perf_counter() - start:.2f} s, "
+          f"{retriever.bm25.matrix.nnz} non-zeros)")
+    print(f"  {'':<10}{'ms/query':>10}{'ms/query (batch)':>18}")
+    for ranking in RANKINGS:
+        start = time.perf_counter()
+        for question in questions:
+            retriever.retrieve(question, ranking=ranking)
+        single = (time.perf_counter() - start) * 1000 / len(questions)
+        start = time.perf_counter()
+        retriever.retrieve_batch(questions, ranking=ranking)
+        batch = (time.perf_counter() - start) * 1000 / len(questions)
+        print(f"  {ranking:<10}{single:>10.2f}{batch:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
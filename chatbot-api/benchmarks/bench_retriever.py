@@ -0,0 +1,92 @@
+"""Retriever latency: per-query scan of every document vs inverted index.
+
+Builds synthetic knowledge bases (10k and 100k documents by default), checks
+that both implementations return the same documents on accent-free text, then
+reports index build time and per-query latency.
+
+Usage:
+    python benchmarks/bench_retriever.py --docs 10000 100000 --queries 200
+"""
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from retriever import CabinCrewRetriever  # noqa: E402
+
+COMMON = ["de", "la", "le", "et", "les", "des", "en", "un", "the", "of", "and", "to", "is", "min", "max", "cm"]
+TOPICS = ["age", "taille", "height", "reach", "visa", "salaire", "salary", "contrat", "formation", "training",
+          "tatouage", "tattoo", "natation", "swim", "langues", "english", "interview", "grooming", "bmi", "doha"]
+
+
+def legacy_retrieve(docs, question, top_k=3):
+    """Previous implementation: tokenize every document on every query, then sort."""
+    q_tokens = set(re.findall(r"\w+", question.lower()))
+    scores = []
+    for doc in docs:
+        text = (doc.get("text") or "") + " " + (doc.get("source") or "")
+        doc_tokens = set(re.findall(r"\w+", text.lower()))
+        scores.append((len(q_tokens & doc_tokens), doc))
+    scores.sort(key=lambda x: x[0], reverse=True)
+    return [d for _, d in scores[:top_k]]
+
+
+def synthetic_docs(count, rng, vocabulary):
+    docs = []
+    for i in range(count):
+        words = [rng.choice(COMMON) if rng.random() < 0.35 else rng.choice(vocabulary)
+                 for _ in range(rng.randint(30, 120))]
+        docs.append({"id": f"doc_{i}", "source": f"Airline_{i % 200}", "text": " ".join(words)})
+    return docs
+
+
+def synthetic_questions(count, rng, vocabulary):
+    return [" ".join(rng.choice(COMMON + TOPICS) if rng.random() < 0.5 else rng.choice(vocabulary)
+                     for _ in range(rng.randint(4, 10)))
+            for _ in range(count)]
+
+
+def latency_ms(fn, questions):
+    timings = []
+    for question in questions:
+        start = time.perf_counter()
+        fn(question)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), sorted(timings)[int(len(timings) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retriever: full scan vs inverted index")
+    parser.add_argument("--docs", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--legacy-queries", type=int, default=20, help="queries timed on the slow scan")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = TOPICS + [f"w{i}" for i in range(20_000)]
+    questions = synthetic_questions(args.queries, rng, vocabulary)
+
+    for count in args.docs:
+        docs = synthetic_docs(count, rng, vocabulary)
+        start = time.perf_counter()
+        retriever = CabinCrewRetriever(docs=docs, ranking="overlap")
+        build_s = time.perf_counter() - start
+
+        for question in questions[:args.legacy_queries]:
+            assert retriever.retrieve(question) == legacy_retrieve(docs, question), question
+
+        legacy_p50, legacy_p95 = latency_ms(lambda q: legacy_retrieve(docs, q), questions[:args.legacy_queries])
+        index_p50, index_p95 = latency_ms(retriever.retrieve, questions)
+        print(f"{count} documents ({len(retriever.postings)} terms, index built in {build_s:.2f} s)")
+        print(f"  {'':<16}{'p50 ms':>10}{'p95 ms':>10}")
+        print(f"  {'full scan':<16}{legacy_p50:>10.2f}{legacy_p95:>10.2f}")
+        print(f"  {'inverted index':<16}{index_p50:>10.2f}{index_p95:>10.2f}   ({legacy_p50 / index_p50:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
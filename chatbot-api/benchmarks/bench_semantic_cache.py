@@ -0,0 +1,101 @@
+"""Threshold tuning for the semantic cache on labelled paraphrases.
+
+benchmarks/data/paraphrases.tsv groups questions by intent. For every ordered
+pair (cached question, new question) in the same language, a hit on the same
+intent is a useful hit and a hit on another intent is a false hit. The set
+includes near misses on the same airline (min/max age, height/weight,
+age/height, reach/height), which the top document alone cannot tell apart since
+cabin_docs.json holds one document per airline. Reported per threshold with the
+embedding alone, the top document guard, the attribute guard, attributes with
+the top document, and attributes with all the retrieved documents (the cache's
+default, match_docs = top_k), plus the false hits left at the chosen threshold
+and the lookup cost in a full cache.
+
+Usage:
+    python benchmarks/bench_semantic_cache.py
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from language_id import identify_language  # noqa: E402
+from retriever import CabinCrewRetriever  # noqa: E402
+from semantic_cache import SemanticCache, embed_question, question_attributes  # noqa: E402
+
+DATA_PATH = os.path.join(ROOT, "benchmarks", "data", "paraphrases.tsv")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Semantic cache threshold sweep")
+    parser.add_argument("--thresholds", type=float, nargs="+",
+                        default=[0.5, 0.55, 0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9])
+    parser.add_argument("--show", type=float, default=None,
+                        help="list the false hits left at this threshold (default: the cache default)")
+    args = parser.parse_args()
+    default = SemanticCache()
+    show = default.threshold if args.show is None else args.show
+
+    with open(DATA_PATH, encoding="utf-8") as fh:
+        samples = [line.rstrip("\n").split("\t", 1) for line in fh if line.strip()]
+    intents = [intent for intent, _ in samples]
+    questions = [question for _, question in samples]
+    languages = [identify_language(q)["language"] for q in questions]
+    retriever = CabinCrewRetriever()
+    docs = [[d["id"] for d in retriever.retrieve(q)] for q in questions]
+    attributes = [question_attributes(q) for q in questions]
+    vectors = np.stack([embed_question(q) for q in questions])
+    similarities = vectors @ vectors.T
+
+    pairs = [(i, j) for i in range(len(samples)) for j in range(len(samples))
+             if i != j and languages[i] == languages[j]]
+    same = sum(intents[i] == intents[j] for i, j in pairs)
+    print(f"{len(samples)} questions, {len({*intents})} intents, {len(pairs)} ordered pairs "
+          f"({same} same intent)")
+    guards = [("embedding only", 0, False), ("top document", 1, False),
+              ("attributes", 0, True), ("attributes + top doc", 1, True),
+              (f"attributes + top {default.match_docs}", default.match_docs, True)]
+
+    def hit(i, j, threshold, match_docs, match_attributes):
+        return (similarities[i, j] >= threshold and docs[i][:match_docs] == docs[j][:match_docs]
+                and (not match_attributes or attributes[i] == attributes[j]))
+
+    print(f"{'':>10}" + "".join(f"{label:>24}" for label, _, _ in guards))
+    print(f"{'threshold':>10}" + f"{'useful':>12}{'false':>12}" * len(guards))
+    for threshold in args.thresholds:
+        row = f"{threshold:>10.2f}"
+        for _, match_docs, match_attributes in guards:
+            useful = false = 0
+            for i, j in pairs:
+                if not hit(i, j, threshold, match_docs, match_attributes):
+                    continue
+                if intents[i] == intents[j]:
+                    useful += 1
+                else:
+                    false += 1
+            row += f"{useful / same:>12.1%}{false:>12}"
+        print(row)
+
+    false_hits = [(i, j) for i, j in pairs
+                  if intents[i] != intents[j] and hit(i, j, show, default.match_docs, True)]
+    print(f"\nFalse hits at {show:.2f} (attributes + top {default.match_docs} documents): {len(false_hits)}")
+    for i, j in false_hits:
+        print(f"  {similarities[i, j]:.2f}  {questions[i]!r} -> {questions[j]!r}")
+
+    cache = SemanticCache(max_entries=2048)
+    for k in range(2048):
+        cache.add(f"{questions[k % len(questions)]} {k}", "fr", True, False, "m", {"x"}, {"answer": ""})
+    start = time.perf_counter()
+    for question in questions:
+        cache.lookup(question, "fr", True, False, "m", {"y"})
+    per_lookup = (time.perf_counter() - start) * 1000 / len(questions)
+    print(f"\nLookup in a full cache of {cache.max_entries} entries: {per_lookup:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
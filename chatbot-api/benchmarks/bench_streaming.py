@@ -0,0 +1,158 @@
+"""Time to first token: /chat (complete answer) vs /chat/stream (server-sent events).
+
+Runs the API with uvicorn against a local Gemini stub that streams an answer of
+--chunks fragments: the first one after --prefill seconds, then one every
+--chunk-delay seconds (generateContent answers once the whole text is ready).
+Also checks the mid-stream fallback when the stub drops the connection.
+
+Usage:
+    python benchmarks/bench_streaming.py --prefill 0.4 --chunks 40 --chunk-delay 0.04 --runs 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+class StreamingGeminiStub:
+    """HTTP/1.1 server for generateContent and streamGenerateContent?alt=sse."""
+
+    def __init__(self, prefill: float, chunks: int, chunk_delay: float):
+        self.prefill = prefill
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+        self.break_after = None  # drop the connection after this many chunks
+        self.loop = asyncio.new_event_loop()
+        self.ready = threading.Event()
+
+    def start(self) -> str:
+        threading.Thread(target=self._run, daemon=True).start()
+        self.ready.wait()
+        return f"http://127.0.0.1:{self.port}/v1/models/stub:generateContent"
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        server = self.loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+        self.port = server.sockets[0].getsockname()[1]
+        self.ready.set()
+        self.loop.run_forever()
+
+    @staticmethod
+    def _chunk(text):
+        return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}]}
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                await reader.readexactly(length)
+                words = [f"mot{i} " for i in range(self.chunks)]
+                await asyncio.sleep(self.prefill)
+                if b":streamGenerateContent" not in head.split(b"\r\n")[0]:
+                    await asyncio.sleep(self.chunk_delay * (self.chunks - 1))
+                    body = json.dumps(self._chunk("".join(words))).encode()
+                    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                                 b"Content-Length: %d\r\n\r\n" % len(body) + body)
+                    await writer.drain()
+                    continue
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                             b"Transfer-Encoding: chunked\r\n\r\n")
+                for i, word in enumerate(words):
+                    if i:
+                        await asyncio.sleep(self.chunk_delay)
+                    if self.break_after is not None and i == self.break_after:
+                        writer.close()
+                        return
+                    event = b"data: " + json.dumps(self._chunk(word)).encode() + b"\r\n\r\n"
+                    writer.write(b"%x\r\n%s\r\n" % (len(event), event))
+                    await writer.drain()
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_chat(client, question):
+    start = time.perf_counter()
+    response = client.post("/chat", json={"question": question, "no_cache": True})
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+def time_stream(client, question):
+    """(time to sources, time to first token, time to done, events by type)."""
+    start = time.perf_counter()
+    marks, counts, event = {}, {}, None
+    with client.stream("POST", "/chat/stream", json={"question": question, "no_cache": True}) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if line.startswith("event:"):
+                event = line[6:].strip()
+                counts[event] = counts.get(event, 0) + 1
+                marks.setdefault(event, time.perf_counter() - start)
+    return marks.get("sources"), marks.get("token"), marks.get("done"), counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to first token of /chat/stream vs /chat")
+    parser.add_argument("--prefill", type=float, default=0.4, help="stub delay before the first fragment (s)")
+    parser.add_argument("--chunks", type=int, default=40)
+    parser.add_argument("--chunk-delay", type=float, default=0.04)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    stub = StreamingGeminiStub(args.prefill, args.chunks, args.chunk_delay)
+    url = stub.start()
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    os.environ["CHAT_SEMANTIC_CACHE"] = "0"
+
+    import uvicorn
+    import main as api
+    api.gemini_client.api_url = url
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(api.app, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    question = "Quelle est la taille minimale pour Qatar Airways ?"
+    with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+        full = [time_chat(client, question) for _ in range(args.runs)]
+        streamed = [time_stream(client, question) for _ in range(args.runs)]
+        print(f"Stub: first fragment after {args.prefill * 1000:.0f} ms, {args.chunks} fragments "
+              f"every {args.chunk_delay * 1000:.0f} ms ({args.runs} runs, medians)")
+        print(f"  /chat complete answer          {statistics.median(full) * 1000:>8.0f} ms")
+        print(f"  /chat/stream sources event     {statistics.median(s[0] for s in streamed) * 1000:>8.0f} ms")
+        print(f"  /chat/stream first token       {statistics.median(s[1] for s in streamed) * 1000:>8.0f} ms")
+        print(f"  /chat/stream done              {statistics.median(s[2] for s in streamed) * 1000:>8.0f} ms")
+
+        stub.break_after = args.chunks // 2
+        _, _, _, counts = time_stream(client, question)
+        print(f"\nConnection dropped mid-stream: events {counts}")
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
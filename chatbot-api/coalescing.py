@@ -0,0 +1,63 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class _InFlight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class RequestCoalescer:
+    """Single upstream call per key for concurrent identical requests.
+
+    The first caller for a key starts factory(); callers arriving while it runs
+    wait on the same task and receive the same result or exception. A caller
+    that is cancelled (client disconnected) only stops waiting: the upstream
+    call is cancelled when its last waiter goes away. Nothing is kept once the
+    call is finished (caching is the answer cache's job).
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, _InFlight] = {}
+        self.counters = {"upstream_calls": 0, "calls_saved": 0, "errors": 0, "cancelled_upstream": 0}
+
+    async def run(self, key: str, factory: Callable[[], Awaitable]):
+        call = self._in_flight.get(key)
+        if call is None:
+            call = _InFlight(asyncio.ensure_future(factory()))
+            self._in_flight[key] = call
+            call.task.add_done_callback(lambda task: self._finished(key, call))
+            self.counters["upstream_calls"] += 1
+        else:
+            self.counters["calls_saved"] += 1
+            logger.info("Question identique en cours de traitement: réponse partagée (%d en attente)",
+                        call.waiters + 1)
+
+        call.waiters += 1
+        try:
+            # shield: cancelling one waiter must not cancel the shared call
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+                self.counters["cancelled_upstream"] += 1
+                if self._in_flight.get(key) is call:
+                    del self._in_flight[key]
+
+    def _finished(self, key: str, call: _InFlight):
+        if self._in_flight.get(key) is call:
+            del self._in_flight[key]
+        if not call.task.cancelled() and call.task.exception() is not None:
+            self.counters["errors"] += 1
+
+    def stats(self) -> dict:
+        requests = self.counters["upstream_calls"] + self.counters["calls_saved"]
+        return dict(self.counters, in_flight=len(self._in_flight),
+                    saved_ratio=round(self.counters["calls_saved"] / requests, 4) if requests else 0.0)
@@ -0,0 +1,203 @@
+"""
+Module d'identification de la langue (français, anglais, arabe) par n-grammes de caractères
+Utilisé par cv_parser (OCR, structuration du texte) et chatbot-api, qui en
+garde une copie identique (chatbot-api/language_id.py, réécrite avec celle-ci
+par benchmarks/build_language_profiles.py) : bibliothèque standard uniquement.
+
+Chaque mot est entouré d'espaces puis découpé en trigrammes ; le score d'une
+langue est la somme des poids de ses trigrammes dans une table précompilée
+(trigrammes les plus fréquents par langue, poids de Zipf selon le rang).
+Coût linéaire en la longueur du texte : une recherche de dictionnaire par
+trigramme, et les mots déjà vus sont mis en cache.
+
+    from src.language_id import identify_language
+    identify_language("Quel est l'âge minimum ?")
+    # {'language': 'fr', 'confidence': 0.99, 'scores': {...}, 'shares': {...}}
+
+La table est régénérée à partir de benchmarks/data/language_id par
+benchmarks/build_language_profiles.py
+"""
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+
+LANGUAGES = ('fr', 'en', 'ar')
+NGRAM = 3
+# Poids d'un trigramme de rang r : -log(r + ZIPF_OFFSET)
+ZIPF_OFFSET = 10
+# Pénalité supplémentaire d'un trigramme absent du profil d'une langue
+UNSEEN_PENALTY = 1.0
+# Nombre de trigrammes au-delà duquel la confiance n'augmente plus
+EVIDENCE_GRAMS = 24
+
+_WORD_RE = re.compile(r"[^\W\d_]+")
+
+# >>> table générée par benchmarks/build_language_profiles.py (ne pas modifier à la main)
+PROFILE_SIZE = 300
+_PROFILES = {
+    'fr': (
+        'es  dede et  etle  leentlesnt  coiontione re  unatiageourdeson lletre d '
+        ' l er  la se voce comresune ca enellis ns onsquers te  au re à ersestge '
+        ' po pr quangcouencil ncese  du ma pa soairantir itéla omppagquisonues ch'
+        ' esdu en gerie ienierlanpouserstetestraté ur ure di in me na sa vi éqass'
+        'checonervessgesgueiceiremenngunnentronnontponransseue uipun venée équés '
+        ' ce ex pe ré tragnaisandautavodanel espillineit nteongoyaparpasrvist tat'
+        'terts uelvicvoléri an av bo do hô il je lo no si st étabiablaccailaleau '
+        'blecalcascesciademeauemaemeforgnihôtiatiniiquivelailonmesmpanatndenelnie'
+        'ommpriprord rierisritsabspouisuiturius ut uveux voyyagôte ac ai ap da dé'
+        ' el em fa fo ge mi mo sé taal ansappartat ateaucauxavaavibinca cabcurdis'
+        'ecoeilembendercettexpez faugangraialicaifiileingintipaipeisiituix je lie'
+        'litls manmarmatmermmenesngenglnouoinoirol ondormousoutpe perratravrciren'
+        'rocrt rtiréssagsavsecsensitssassiséc'
+    ),
+    'en': (
+        ' th antheandhe nd ng ing in toes atied in iontioto  a  rety ighon re  of'
+        'ghtle nt of  ca ha whabice encenter ew is ncets  cr fl lo woal avecreht '
+        'minrestrawor ai ar be fi is st yoareat comersfliforineireityliglinorkree'
+        'rewve you at co ex fo fr ma pa sa trageairan assatebleen estmenor quirs '
+        'terth  ho se we wiattbincabee ellemeengequereessiniithlitnatnteonsourrea'
+        'reqrk ss ssest uirvelwit do du em jo la le li me na sh siam angantar cat'
+        'eamendervetyfrege genhanhathavhericeintivekinlesllolonls manmernalne nge'
+        'ortou ow pasravrinrt rviry sensersh stetteustverwha ab al av ba ch cu de'
+        ' di ev gr he kn ne pr sp teablafeaidailainallancanyappay be bilcalch che'
+        'cy dandurearecoeigel epterieveexpfetficfirgergesgreguahouhy iatiblic ica'
+        'id ienileiliillirlishitiknoks lanld leall lowly ncyndandlnedngunisnitnow'
+        'ns ny omeonaondookpanperprord recrgerierlisafsalshosibsitstastrststattea'
+        'tedtentestinuaguatuniur wee ac ad ag'
+    ),
+    'ar': (
+        ' الالمات ية رة ين الت وا منالطمن وال فيفي لى العان لة مل ال الأعملفة  عل'
+        'اء اقمالسطاقعلىقم لعمما يرا أن لل معالإالردة راترانطيرفريمة يف  طا طي ما'
+        ' مس وتأن افرالبالخالشبالحة را عة لطانا هاد هو وماحةادةارااللام انيرحلركة'
+        'رينسافشركضيفكة لرحلطوللغمسامضينيةهل ون يضايم  إل با تق شه عن لم مت مر هل'
+        ' وس يجإلىئرةائرادئار استافةاقةالاالجالحالدالضالقالوبيةبيعتعلتقاتقبتقدثنا'
+        'جب خدمداردمةديمرف سباستقسلاشهاصورطائطبيطواعرفغاتفر قباقة قديقصولاتلاملان'
+        'لبيلتصلشرلغالمدلمسلمقلمنلمهلمولي ليةمتامع مقصناءهو ورةولةوليوم يا يجبيرة'
+        ' أث أس أع أو إج اس بط بي ثا حا ست طب عش عض فر مض مق ها هي ور يتأثنأدنأعر'
+        'أولؤولإنجئيساة ارئارجارياصلاعيالفالكالنامةاملباتباحبادبرةبطلبيضبينتب تة '
+        'تجاتحقتراتسعتماتن جليحد حلاحلةخارخبرخلادئ درةدنىدى ذا رئ رئيراحربيرج ري '
+        'ريقزيةسؤوستةسفرسن سياشر صيرضاءضمنضو ضياطلاطلوظيفعامعشرعضوعلمعليعن عي عين'
+        'غربفاتفرافينقالقصيكالكيفلأدلأولإسلإنلاءلاقلاللتطلتعلتكلتولحدلخدلدالسبلسف'
+        'لسللضيلفرللاللملمتلمضلمطلمعلمغلمكلمل'
+    ),
+}
+# <<< fin de la table générée
+
+
+def _is_arabic(char: str) -> bool:
+    return '\u0600' <= char <= '\u06ff' or '\u0750' <= char <= '\u077f'
+
+
+def _build_table() -> Tuple[Dict[str, Tuple[float, ...]], Tuple[float, ...], Tuple[float, ...]]:
+    unseen = -math.log(PROFILE_SIZE + ZIPF_OFFSET) - UNSEEN_PENALTY
+    ranks: Dict[str, list] = {}
+    for index, lang in enumerate(LANGUAGES):
+        profile = _PROFILES.get(lang, '')
+        for rank in range(len(profile) // NGRAM):
+            gram = profile[rank * NGRAM:(rank + 1) * NGRAM]
+            ranks.setdefault(gram, [unseen] * len(LANGUAGES))[index] = -math.log(rank + 1 + ZIPF_OFFSET)
+    table = {gram: tuple(weights) for gram, weights in ranks.items()}
+    # Trigrammes inconnus : l'écriture (arabe ou latine) départage encore les langues
+    ar = LANGUAGES.index('ar')
+    unseen_arabic = tuple(unseen if i == ar else unseen - 4 * UNSEEN_PENALTY for i in range(len(LANGUAGES)))
+    unseen_latin = tuple(unseen - 4 * UNSEEN_PENALTY if i == ar else unseen for i in range(len(LANGUAGES)))
+    return table, unseen_arabic, unseen_latin
+
+
+_TABLE, _UNSEEN_ARABIC, _UNSEEN_LATIN = _build_table()
+
+
+@lru_cache(maxsize=65536)
+def _word_scores(word: str) -> Tuple[float, float, float, int]:
+    """Somme des poids (fr, en, ar) des trigrammes d'un mot en minuscules, et leur nombre"""
+    padded = f" {word} "
+    fr = en = ar = 0.0
+    count = len(padded) - NGRAM + 1
+    for i in range(count):
+        weights = _TABLE.get(padded[i:i + NGRAM])
+        if weights is None:
+            weights = _UNSEEN_ARABIC if _is_arabic(padded[i + 1]) else _UNSEEN_LATIN
+        fr += weights[0]
+        en += weights[1]
+        ar += weights[2]
+    return fr, en, ar, count
+
+
+def identify_language(text: str, default: str = 'fr') -> Dict:
+    """
+    Identifie la langue dominante du texte
+    Retourne language, confidence (probabilité a posteriori, bornée par
+    EVIDENCE_GRAMS pour les textes courts), scores (probabilité par langue)
+    et shares (part des lettres dont le mot est attribué à chaque langue,
+    utile pour repérer un document bilingue)
+    """
+    totals = [0.0, 0.0, 0.0]
+    letters = [0, 0, 0]
+    grams = 0
+    for word in _WORD_RE.findall(text.lower()) if text else ():
+        fr, en, ar, count = _word_scores(word)
+        totals[0] += fr
+        totals[1] += en
+        totals[2] += ar
+        grams += count
+        best = 0 if fr >= en and fr >= ar else (1 if en >= ar else 2)
+        letters[best] += len(word)
+
+    if not grams:
+        return {'language': default, 'confidence': 0.0,
+                'scores': {lang: 0.0 for lang in LANGUAGES},
+                'shares': {lang: 0.0 for lang in LANGUAGES}}
+
+    # Log-vraisemblance moyenne ramenée à au plus EVIDENCE_GRAMS observations
+    scale = min(grams, EVIDENCE_GRAMS) / grams
+    top = max(totals)
+    exps = [math.exp((total - top) * scale) for total in totals]
+    norm = sum(exps)
+    scores = {lang: e / norm for lang, e in zip(LANGUAGES, exps)}
+    language = max(scores, key=scores.get)
+    total_letters = sum(letters)
+    return {
+        'language': language,
+        'confidence': round(scores[language], 4),
+        'scores': {lang: round(p, 4) for lang, p in scores.items()},
+        'shares': {lang: round(n / total_letters, 4) for lang, n in zip(LANGUAGES, letters)},
+    }
+
+
+# ==============================================================
+# CONSTRUCTION DE LA TABLE
+# ==============================================================
+def build_profiles(texts: Dict[str, Iterable[str]], size: int = 300) -> Dict[str, str]:
+    """Trigrammes les plus fréquents de chaque langue, concaténés par rang décroissant"""
+    profiles = {}
+    for lang, lines in texts.items():
+        counts = Counter()
+        for line in lines:
+            for word in _WORD_RE.findall(line.lower()):
+                padded = f" {word} "
+                counts.update(padded[i:i + NGRAM] for i in range(len(padded) - NGRAM + 1))
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:size]
+        profiles[lang] = ''.join(gram for gram, _ in ranked)
+    return profiles
+
+
+def format_profiles(profiles: Dict[str, str], size: int, grams_per_line: int = 24) -> str:
+    """Source Python de la table (bloc remplacé par build_language_profiles.py)"""
+    lines = [f"PROFILE_SIZE = {size}", "_PROFILES = {"]
+    for lang in LANGUAGES:
+        profile = profiles.get(lang, '')
+        step = grams_per_line * NGRAM
+        lines.append(f"    '{lang}': (")
+        for start in range(0, len(profile), step):
+            lines.append(f"        {profile[start:start + step]!r}")
+        lines.append("    ),")
+    lines.append("}")
+    return '\n'.join(lines)
+
+
+def primary_language(text: str, default: Optional[str] = 'fr') -> str:
+    """Raccourci : code de la langue dominante ('fr', 'en' ou 'ar')"""
+    return identify_language(text, default=default)['language']
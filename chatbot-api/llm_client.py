@@ -0,0 +1,414 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Callable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+GEMINI_PRO_FALLBACK_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent"
+
+
+class GeminiError(Exception):
+    """Gemini call failed (HTTP status, timeout, unreadable stream); the message starts with "❌"."""
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Retry-After header (delay in seconds or HTTP date) -> seconds, or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when - (time.time() if now is None else now))
+
+
+class CircuitBreaker:
+    """Stops calling Gemini while it is rate-limited or down.
+
+    closed: calls go through; the outcome of the last `window` calls is kept and
+    the circuit opens when at least min_calls are known and failure_ratio of them
+    failed, or immediately on a 429. open: calls are refused (the caller serves
+    its local fallback at once) for open_seconds, or for the Retry-After delay
+    when Gemini sent one (capped at max_open_seconds). half_open: up to `probes`
+    calls are let through; a success closes the circuit, a failure reopens it.
+    """
+
+    def __init__(self, failure_ratio: float = 0.5, min_calls: int = 5, window: int = 20,
+                 open_seconds: float = 30.0, max_open_seconds: float = 600.0, probes: int = 1,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_ratio = failure_ratio
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.probes = probes
+        self.clock = clock
+        self._outcomes = deque(maxlen=window)  # True = success
+        self._state = "closed"
+        self._open_until = 0.0
+        self._probes_in_flight = 0
+        self.counters = {"opened": 0, "rejected": 0, "rate_limited": 0, "failures": 0, "probes": 0}
+
+    @property
+    def state(self) -> str:
+        if self._state == "open" and self.clock() >= self._open_until:
+            self._state = "half_open"
+            self._probes_in_flight = 0
+            logger.info("Circuit Gemini semi-ouvert: requête de test autorisée")
+        return self._state
+
+    def retry_in(self) -> float:
+        return max(0.0, self._open_until - self.clock()) if self.state == "open" else 0.0
+
+    def allow(self) -> bool:
+        """Whether a call may be made now (a half-open probe takes a slot until its outcome is recorded)."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and self._probes_in_flight < self.probes:
+            self._probes_in_flight += 1
+            self.counters["probes"] += 1
+            return True
+        self.counters["rejected"] += 1
+        return False
+
+    def record_success(self):
+        if self._state == "half_open":
+            logger.info("Circuit Gemini refermé")
+            self._state = "closed"
+            self._outcomes.clear()
+        self._outcomes.append(True)
+
+    def record_failure(self, rate_limited: bool = False, retry_after: Optional[float] = None):
+        self.counters["failures"] += 1
+        if rate_limited:
+            self.counters["rate_limited"] += 1
+        self._outcomes.append(False)
+        failures = self._outcomes.count(False)
+        if (self._state == "half_open" or rate_limited
+                or (len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_ratio)):
+            self._open(retry_after)
+
+    def release(self):
+        """The call was cancelled without an outcome: free its probe slot."""
+        if self._state == "half_open" and self._probes_in_flight:
+            self._probes_in_flight -= 1
+
+    def _open(self, retry_after: Optional[float]):
+        delay = min(retry_after if retry_after is not None else self.open_seconds, self.max_open_seconds)
+        if self._state != "open":
+            self.counters["opened"] += 1
+            logger.warning("Circuit Gemini ouvert pour %.0f s: réponses de secours locales", delay)
+        self._state = "open"
+        self._open_until = max(self._open_until, self.clock() + delay)
+        self._outcomes.clear()
+
+    def stats(self) -> dict:
+        return dict(self.counters, state=self.state, retry_in_s=round(self.retry_in(), 1),
+                    recent_failures=self._outcomes.count(False), recent_calls=len(self._outcomes))
+
+
+def stream_url(api_url: str) -> str:
+    """...:generateContent -> ...:streamGenerateContent (server-sent events with alt=sse)."""
+    return api_url.replace(":generateContent", ":streamGenerateContent")
+
+
+def chunk_text(chunk) -> str:
+    """Text of one streamed chunk ("" for chunks carrying only finishReason / usage metadata)."""
+    try:
+        parts = chunk["candidates"][0]["content"]["parts"]
+    except (KeyError, IndexError, TypeError):
+        return ""
+    return "".join(part.get("text", "") for part in parts if isinstance(part, dict))
+
+
+def build_payload(prompt: str) -> dict:
+    return {
+        "contents": [{
+            "parts": [{"text": prompt}]
+        }],
+        "generationConfig": {
+            "temperature": 0.1,
+            "topK": 40,
+            "topP": 0.8,
+            "maxOutputTokens": 1024,
+        },
+        "safetySettings": [
+            {
+                "category": "HARM_CATEGORY_HARASSMENT",
+                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+            },
+            {
+                "category": "HARM_CATEGORY_HATE_SPEECH",
+                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+            }
+        ]
+    }
+
+
+def extract_answer_text(result) -> str:
+    """Return the first textual content found in a Gemini / Generative Language response,
+    or an error string starting with "❌" when the shape is not recognised."""
+
+    def extract_text_from_candidate(cand: dict):
+        # Common new v1 shape: cand["content"]["parts"][0]["text"]
+        try:
+            content = cand.get("content")
+            if isinstance(content, dict):
+                parts = content.get("parts")
+                if isinstance(parts, list) and len(parts) > 0:
+                    first = parts[0]
+                    # either a dict with 'text' or a string
+                    if isinstance(first, dict) and "text" in first:
+                        return first["text"]
+                    if isinstance(first, str):
+                        return first
+            # Older/alternate shape: cand.get('content') may be a string
+            if isinstance(content, str):
+                return content
+        except Exception:
+            pass
+        # Fallback: try top-level text-like keys
+        for key in ("text", "output", "message", "answer"):
+            v = cand.get(key)
+            if isinstance(v, str):
+                return v
+        return None
+
+    # 1) 'candidates' list (common)
+    if isinstance(result, dict) and "candidates" in result and isinstance(result["candidates"], list) and len(result["candidates"]) > 0:
+        text = extract_text_from_candidate(result["candidates"][0])
+        if text:
+            return text
+
+    # 2) Some responses include an 'output' or 'outputs' field
+    if isinstance(result, dict):
+        out = result.get("output") or result.get("outputs")
+        if isinstance(out, list) and len(out) > 0:
+            first = out[0]
+            if isinstance(first, dict):
+                # shape: first['content'][0]['text']
+                c = first.get("content")
+                if isinstance(c, list) and len(c) > 0:
+                    el = c[0]
+                    if isinstance(el, dict) and "text" in el:
+                        return el["text"]
+                    if isinstance(el, str):
+                        return el
+                # or: first.get('text')
+                if "text" in first and isinstance(first["text"], str):
+                    return first["text"]
+
+    # 3) Some APIs return a direct 'text' or 'response' field
+    if isinstance(result, dict):
+        for top_key in ("text", "response", "answer", "message"):
+            if top_key in result and isinstance(result[top_key], str):
+                return result[top_key]
+
+    # If we couldn't find a textual result, log the raw result for debugging and return an informative error
+    logger.warning("Réponse API Gemini inattendue / non parsable. Clés présentes: %s", list(result.keys()) if isinstance(result, dict) else type(result))
+    logger.debug("Réponse brute Gemini: %s", result)
+    return f"❌ Erreur API: format inattendu de la réponse (clés: {','.join(list(result.keys())) if isinstance(result, dict) else str(type(result))})"
+
+
+class GeminiClient:
+    """Non-blocking Gemini client sharing one pooled HTTP/1.1 keep-alive connection pool.
+
+    At most max_concurrency calls are in flight (extra callers wait for a slot);
+    cancelling the awaiting task (e.g. the chat client disconnected) aborts the
+    request and returns its connection to the pool.
+    """
+
+    def __init__(self, api_key: Optional[str], api_url: str, timeout: float = 30.0,
+                 connect_timeout: float = 5.0, max_connections: int = 20,
+                 max_keepalive: int = 10, keepalive_expiry: float = 30.0,
+                 max_concurrency: int = 16, transport: Optional[httpx.AsyncBaseTransport] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_keepalive,
+                                   keepalive_expiry=keepalive_expiry)
+        self.max_concurrency = max_concurrency
+        self.breaker = breaker
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.cancelled = 0
+
+    @classmethod
+    def from_env(cls, api_key: Optional[str], api_url: str, **kwargs) -> "GeminiClient":
+        """GEMINI_TIMEOUT, GEMINI_CONNECT_TIMEOUT, GEMINI_MAX_CONNECTIONS,
+        GEMINI_MAX_KEEPALIVE, GEMINI_KEEPALIVE_EXPIRY, GEMINI_MAX_CONCURRENCY, and the
+        circuit breaker: GEMINI_BREAKER (1), GEMINI_BREAKER_FAILURE_RATIO (0.5),
+        GEMINI_BREAKER_MIN_CALLS (5), GEMINI_BREAKER_WINDOW (20), GEMINI_BREAKER_OPEN_SECONDS (30),
+        GEMINI_BREAKER_PROBES (1)."""
+        options = {
+            "timeout": float(os.getenv("GEMINI_TIMEOUT", "30")),
+            "connect_timeout": float(os.getenv("GEMINI_CONNECT_TIMEOUT", "5")),
+            "max_connections": int(os.getenv("GEMINI_MAX_CONNECTIONS", "20")),
+            "max_keepalive": int(os.getenv("GEMINI_MAX_KEEPALIVE", "10")),
+            "keepalive_expiry": float(os.getenv("GEMINI_KEEPALIVE_EXPIRY", "30")),
+            "max_concurrency": int(os.getenv("GEMINI_MAX_CONCURRENCY", "16")),
+        }
+        if os.getenv("GEMINI_BREAKER", "1") == "1":
+            options["breaker"] = CircuitBreaker(
+                failure_ratio=float(os.getenv("GEMINI_BREAKER_FAILURE_RATIO", "0.5")),
+                min_calls=int(os.getenv("GEMINI_BREAKER_MIN_CALLS", "5")),
+                window=int(os.getenv("GEMINI_BREAKER_WINDOW", "20")),
+                open_seconds=float(os.getenv("GEMINI_BREAKER_OPEN_SECONDS", "30")),
+                probes=int(os.getenv("GEMINI_BREAKER_PROBES", "1")))
+        options.update(kwargs)
+        return cls(api_key, api_url, **options)
+
+    async def start(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits,
+                                             transport=self._transport,
+                                             headers={"Content-Type": "application/json"})
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _post(self, url: str, payload: dict) -> httpx.Response:
+        return await self._client.post(url, params={"key": self.api_key}, json=payload)
+
+    async def generate(self, prompt: str) -> str:
+        """Answer text, or an error message starting with "❌" (the caller then
+        falls back to the retrieved documents)."""
+        if not self.api_key:
+            return "❌ ERREUR: Clé API Gemini manquante. Vérifie ton fichier .env"
+        if self.breaker is not None and self.breaker.state == "open":
+            return f"❌ Gemini indisponible (circuit ouvert, nouvel essai dans {self.breaker.retry_in():.0f} s)"
+        await self.start()
+        payload = build_payload(prompt)
+
+        async with self._slots:
+            # Only ask the breaker once a slot is held: a half-open probe slot taken
+            # before waiting would leak if the call were cancelled in the queue.
+            if self.breaker is not None and not self.breaker.allow():
+                return f"❌ Gemini indisponible (circuit ouvert, nouvel essai dans {self.breaker.retry_in():.0f} s)"
+            self.in_flight += 1
+            try:
+                logger.info("Appel de Gemini (%d en cours)", self.in_flight)
+                response = await self._post(self.api_url, payload)
+                logger.info("Statut HTTP Gemini: %s", response.status_code)
+
+                # Quota dépassé: inutile d'essayer un autre modèle avec la même clé
+                if response.status_code != 200 and response.status_code != 429:
+                    # Essayons avec le modèle Gemini Pro standard si Gemini 2 échoue
+                    if "flash-exp" in self.api_url:
+                        logger.info("Gemini 2.0 Flash non disponible, tentative avec Gemini Pro...")
+                        response = await self._post(GEMINI_PRO_FALLBACK_URL, payload)
+
+                if response.status_code != 200:
+                    self._record_failure(response)
+                    return f"❌ Erreur API ({response.status_code}): {response.text}"
+
+                answer = extract_answer_text(response.json())
+                if answer.startswith("❌"):
+                    self._record_failure()
+                elif self.breaker is not None:
+                    self.breaker.record_success()
+                return answer
+
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                if self.breaker is not None:
+                    self.breaker.release()
+                logger.info("Appel Gemini annulé (client déconnecté)")
+                raise
+            except httpx.TimeoutException as e:
+                self._record_failure()
+                return f"❌ Erreur API: délai dépassé ({type(e).__name__})"
+            except Exception as e:
+                self._record_failure()
+                return f"❌ Erreur API: {str(e)}"
+            finally:
+                self.in_flight -= 1
+
+    def _record_failure(self, response: Optional[httpx.Response] = None):
+        if self.breaker is None:
+            return
+        if response is not None and response.status_code == 429:
+            self.breaker.record_failure(rate_limited=True,
+                                        retry_after=parse_retry_after(response.headers.get("retry-after")))
+        else:
+            self.breaker.record_failure()
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield answer text fragments as Gemini generates them (streamGenerateContent, SSE).
+
+        Raises GeminiError on failure, possibly after some fragments were yielded.
+        Closing the generator (client gone) aborts the request.
+        """
+        if not self.api_key:
+            raise GeminiError("❌ ERREUR: Clé API Gemini manquante. Vérifie ton fichier .env")
+        if self.breaker is not None and self.breaker.state == "open":
+            raise GeminiError(f"❌ Gemini indisponible (circuit ouvert, nouvel essai dans {self.breaker.retry_in():.0f} s)")
+        await self.start()
+        payload = build_payload(prompt)
+
+        async with self._slots:
+            if self.breaker is not None and not self.breaker.allow():
+                raise GeminiError(f"❌ Gemini indisponible (circuit ouvert, nouvel essai dans {self.breaker.retry_in():.0f} s)")
+            self.in_flight += 1
+            try:
+                logger.info("Appel de Gemini en streaming (%d en cours)", self.in_flight)
+                async with self._client.stream("POST", stream_url(self.api_url), json=payload,
+                                               params={"key": self.api_key, "alt": "sse"}) as response:
+                    if response.status_code != 200:
+                        body = (await response.aread()).decode("utf-8", "replace")
+                        self._record_failure(response)
+                        raise GeminiError(f"❌ Erreur API ({response.status_code}): {body}")
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        try:
+                            chunk = json.loads(line[5:])
+                        except ValueError:
+                            self._record_failure()
+                            raise GeminiError("❌ Erreur API: flux illisible")
+                        if isinstance(chunk, dict) and "error" in chunk:
+                            self._record_failure()
+                            raise GeminiError(f"❌ Erreur API: {chunk['error']}")
+                        text = chunk_text(chunk)
+                        if text:
+                            yield text
+                if self.breaker is not None:
+                    self.breaker.record_success()
+            except (asyncio.CancelledError, GeneratorExit):
+                self.cancelled += 1
+                if self.breaker is not None:
+                    self.breaker.release()
+                logger.info("Streaming Gemini interrompu (client déconnecté)")
+                raise
+            except httpx.TimeoutException as e:
+                self._record_failure()
+                raise GeminiError(f"❌ Erreur API: délai dépassé ({type(e).__name__})")
+            except httpx.HTTPError as e:
+                self._record_failure()
+                raise GeminiError(f"❌ Erreur API: {str(e)}")
+            finally:
+                self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {"in_flight": self.in_flight, "cancelled": self.cancelled,
+                "max_concurrency": self.max_concurrency,
+                "max_connections": self.limits.max_connections,
+                "breaker": self.breaker.stats() if self.breaker is not None else None}
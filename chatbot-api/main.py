@@ -1,14 +1,25 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import requests
+import asyncio
+import json
 import os
 import logging
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import re
+import time
 from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
 
+from answer_cache import AnswerCache
+from coalescing import RequestCoalescer
+from language_id import identify_language
+from llm_client import GeminiClient, GeminiError
+from retriever import CabinCrewRetriever
+from semantic_cache import SemanticCache
+
 # Charge le .env
 load_dotenv()
 
@@ -94,73 +105,86 @@ class ChatRequest(BaseModel):
     language: Optional[str] = None  # 'fr' or 'en' or None for auto-detect
     include_sources: Optional[bool] = True
     brief: Optional[bool] = False
+    no_cache: Optional[bool] = False  # bypass the answer cache (fresh Gemini call, result stored)
 
 class ChatResponse(BaseModel):
     answer: str
     sources: List[str]
 
+class ChatBatchItem(BaseModel):
+    index: int
+    answer: Optional[str] = None
+    sources: List[str] = []
+    cache: Optional[str] = None  # X-Cache status of this question
+    error: Optional[str] = None
+
+class ChatBatchResponse(BaseModel):
+    results: List[ChatBatchItem]
+
 # Model selection: prefer GEMINI_MODEL_NAME env var (resource name like "models/gemini-2.5-pro")
 # If not set, default to a commonly available model returned by ListModels above.
 GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL_NAME", "models/gemini-2.5-flash")
 # Construct the v1 endpoint for generateContent using the model resource name
 GEMINI_API_URL = f"https://generativelanguage.googleapis.com/v1/{GEMINI_MODEL_NAME}:generateContent"
 
-# Base de connaissances cabine (chargée depuis cabin_docs.json)
-class CabinCrewRetriever:
-    def __init__(self, json_path: str = None):
-        import json
-        self.docs = []
-        if json_path is None:
-            json_path = os.path.join(os.path.dirname(__file__), "cabin_docs.json")
+# Client HTTP asynchrone partagé (pool de connexions keep-alive, concurrence bornée)
+gemini_client = GeminiClient.from_env(GEMINI_API_KEY, GEMINI_API_URL)
+
+
+@app.on_event("startup")
+async def start_gemini_client():
+    await gemini_client.start()
+
+
+@app.on_event("shutdown")
+async def stop_gemini_client():
+    await gemini_client.aclose()
+
+mock_retriever = CabinCrewRetriever.from_env()
+# Surveillance de cabin_docs.json: rechargé hors du chemin des requêtes (0 pour désactiver)
+KB_RELOAD_INTERVAL = float(os.getenv("KB_RELOAD_INTERVAL", "5"))
+KB_ADMIN_TOKEN = os.getenv("KB_ADMIN_TOKEN")
+
+
+async def watch_knowledge_base():
+    while True:
+        await asyncio.sleep(KB_RELOAD_INTERVAL)
         try:
-            with open(json_path, "r", encoding="utf-8") as fh:
-                self.docs = json.load(fh)
-        except FileNotFoundError:
-            logger.warning("cabin_docs.json non trouvé; utilisation d'un jeu de données vide.")
-            self.docs = []
+            await asyncio.to_thread(mock_retriever.reload_if_changed)
         except Exception as e:
-            logger.warning("Erreur lecture cabin_docs.json: %s", str(e))
-            self.docs = []
+            logger.error(f"Surveillance de cabin_docs.json: {str(e)}")
 
-    def retrieve(self, question: str, top_k: int = 3) -> List[dict]:
-        """Simple in-memory retrieval by token overlap. Returns top_k docs with highest overlap.
 
-        This is intentionally simple so it works offline without external embedding services.
-        """
-        logger.info(f"Recherche de documents cabine pour: {question}")
-        q_tokens = set(re.findall(r"\w+", question.lower()))
-        scores = []
-        for doc in self.docs:
-            text = (doc.get("text") or "") + " " + (doc.get("source") or "")
-            doc_tokens = set(re.findall(r"\w+", text.lower()))
-            overlap = len(q_tokens & doc_tokens)
-            scores.append((overlap, doc))
+@app.on_event("startup")
+async def start_kb_watcher():
+    if KB_RELOAD_INTERVAL > 0:
+        app.state.kb_watcher = asyncio.create_task(watch_knowledge_base())
 
-        # sort by overlap desc, tie-breaker: original order
-        scores.sort(key=lambda x: x[0], reverse=True)
-        # If all scores are zero, fall back to returning first top_k docs
-        if scores and scores[0][0] == 0:
-            selected = [d for _, d in scores[:top_k]] if scores else []
-            if not selected and self.docs:
-                return self.docs[:top_k]
-            return selected
 
-        return [d for _, d in scores[:top_k]]
+@app.on_event("shutdown")
+async def stop_kb_watcher():
+    watcher = getattr(app.state, "kb_watcher", None)
+    if watcher is not None:
+        watcher.cancel()
 
+# Cache des réponses (LRU + TTL en mémoire, SQLite optionnel), clé incluant la version
+# de la base de connaissances servie par le retriever (vidé quand elle change)
+answer_cache = AnswerCache.from_env()
+# Cache sémantique: réutilise la réponse d'une question reformulée (mêmes documents retrouvés)
+semantic_cache = SemanticCache.from_env()
+# Questions identiques simultanées: un seul appel Gemini partagé (CHAT_COALESCE=0 pour désactiver)
+coalescer = RequestCoalescer() if os.getenv("CHAT_COALESCE", "1") == "1" else None
 
-mock_retriever = CabinCrewRetriever()
+# /chat/batch: taille maximale d'un lot et nombre de questions traitées en parallèle
+CHAT_BATCH_MAX_ITEMS = int(os.getenv("CHAT_BATCH_MAX_ITEMS", "100"))
+CHAT_BATCH_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", "8"))
 
 def detect_language(text: str) -> str:
-    """Very small heuristic to detect French vs English. Returns 'fr' or 'en'."""
-    if not text:
-        return 'fr'
-    t = text.lower()
-    # French indicators
-    fr_indicators = ['quoi', 'quelle', 'quelles', 'quel', 'comment', 'pourquoi', 'bonjour', 'salut', 'est-ce', 'à', 'â', 'é', 'è', 'ê', 'ù']
-    en_indicators = ['what', 'which', 'how', 'why', 'hello', 'hi', 'the', 'is', 'are']
-    fr_score = sum(1 for w in fr_indicators if w in t)
-    en_score = sum(1 for w in en_indicators if w in t)
-    return 'fr' if fr_score >= en_score else 'en'
+    """Detect French vs English with the shared n-gram identifier. Returns 'fr' or 'en'.
+
+    Arabic (or empty) questions fall back to the French prompt.
+    """
+    return 'en' if identify_language(text, default='fr')['language'] == 'en' else 'fr'
 
 
 def build_prompt(question: str, retrieved_docs: List[dict], language: str = 'fr', include_sources: bool = True, brief: bool = False) -> str:
@@ -218,129 +242,26 @@ INSTRUCTIONS: {brief_instr} Privilégie les informations récupérées ci-dessus
 
     return prompt
 
-def call_gemini_api(prompt: str) -> str:
-    if not GEMINI_API_KEY:
-        return "❌ ERREUR: Clé API Gemini manquante. Vérifie ton fichier .env"
-    
-    headers = {"Content-Type": "application/json"}
-    
-    payload = {
-        "contents": [{
-            "parts": [{"text": prompt}]
-        }],
-        "generationConfig": {
-            "temperature": 0.1,
-            "topK": 40,
-            "topP": 0.8,
-            "maxOutputTokens": 1024,
-        },
-        "safetySettings": [
-            {
-                "category": "HARM_CATEGORY_HARASSMENT",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            },
-            {
-                "category": "HARM_CATEGORY_HATE_SPEECH", 
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            }
-        ]
-    }
-    
+async def call_gemini_api(prompt: str) -> str:
+    return await gemini_client.generate(prompt)
+
+
+async def run_unless_disconnected(request: Request, coro, poll_interval: float = 0.25):
+    """Await coro, cancelling it if the HTTP client goes away in the meantime."""
+    task = asyncio.ensure_future(coro)
     try:
-        print(f"🔧 Appel de Gemini 2.0 Flash...")
-        response = requests.post(
-            f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        
-        print(f"🔧 Statut HTTP: {response.status_code}")
-        
-        if response.status_code != 200:
-            # Essayons avec le modèle Gemini Pro standard si Gemini 2 échoue
-            if "flash-exp" in GEMINI_API_URL:
-                print("🔄 Gemini 2.0 Flash non disponible, tentative avec Gemini Pro...")
-                fallback_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent"
-                response = requests.post(
-                    f"{fallback_url}?key={GEMINI_API_KEY}",
-                    headers=headers,
-                    json=payload,
-                    timeout=30
-                )
-                
-            if response.status_code != 200:
-                return f"❌ Erreur API ({response.status_code}): {response.text}"
-        
-        result = response.json()
-
-        # Try several common response shapes from Gemini / Generative Language APIs.
-        # Be permissive: return the first textual content we can find.
-        def extract_text_from_candidate(cand: dict):
-            # Common new v1 shape: cand["content"]["parts"][0]["text"]
-            try:
-                content = cand.get("content")
-                if isinstance(content, dict):
-                    parts = content.get("parts")
-                    if isinstance(parts, list) and len(parts) > 0:
-                        first = parts[0]
-                        # either a dict with 'text' or a string
-                        if isinstance(first, dict) and "text" in first:
-                            return first["text"]
-                        if isinstance(first, str):
-                            return first
-                # Older/alternate shape: cand.get('content') may be a string
-                if isinstance(content, str):
-                    return content
-            except Exception:
-                pass
-            # Fallback: try top-level text-like keys
-            for key in ("text", "output", "message", "answer"):
-                v = cand.get(key)
-                if isinstance(v, str):
-                    return v
-            return None
-
-        # 1) 'candidates' list (common)
-        if isinstance(result, dict) and "candidates" in result and isinstance(result["candidates"], list) and len(result["candidates"]) > 0:
-            text = extract_text_from_candidate(result["candidates"][0])
-            if text:
-                return text
-
-        # 2) Some responses include an 'output' or 'outputs' field
-        if isinstance(result, dict):
-            # check 'output' list
-            out = result.get("output") or result.get("outputs")
-            if isinstance(out, list) and len(out) > 0:
-                # try to extract text from first output element
-                first = out[0]
-                if isinstance(first, dict):
-                    # sometimes it's {'content': [{'type':'output_text','text': '...'}]}
-                    # try several nested shapes
-                    # shape: first['content'][0]['text']
-                    c = first.get("content")
-                    if isinstance(c, list) and len(c) > 0:
-                        el = c[0]
-                        if isinstance(el, dict) and "text" in el:
-                            return el["text"]
-                        if isinstance(el, str):
-                            return el
-                    # or: first.get('text')
-                    if "text" in first and isinstance(first["text"], str):
-                        return first["text"]
-
-        # 3) Some APIs return a direct 'text' or 'response' field
-        for top_key in ("text", "response", "answer", "message"):
-            if top_key in result and isinstance(result[top_key], str):
-                return result[top_key]
-
-        # If we couldn't find a textual result, log the raw result for debugging and return an informative error
-        logger.warning("Réponse API Gemini inattendue / non parsable. Clés présentes: %s", list(result.keys()) if isinstance(result, dict) else type(result))
-        logger.debug("Réponse brute Gemini: %s", result)
-        return f"❌ Erreur API: format inattendu de la réponse (clés: {','.join(list(result.keys())) if isinstance(result, dict) else str(type(result))})"
-            
-    except Exception as e:
-        return f"❌ Erreur API: {str(e)}"
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                logger.info("Client déconnecté, appel LLM annulé")
+                raise HTTPException(status_code=499, detail="Client déconnecté")
+    finally:
+        # Also cancel when this handler itself is cancelled (server shutdown)
+        if not task.done():
+            task.cancel()
 
 
 def sanitize_answer(answer: str, include_sources: bool) -> str:
@@ -437,6 +358,82 @@ def fallback_answer_from_docs(question: str, retrieved_docs: List[dict], languag
         return f"{header_en}\n\nQuestion: {question}\n\n{body}\n\nNote: Verify with the airline for official guidance."
     return f"{header_fr}\n\nQuestion: {question}\n\n{body}\n\nNote: Vérifiez auprès de la compagnie pour des informations officielles."
 
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest, http_request: Request):
+    """Same answer as /chat, as server-sent events while Gemini generates it.
+
+    Events: "sources" (sent first, before the LLM call), "token" (text fragments),
+    "fallback" (Gemini failed: answer built from the documents, replaces the
+    fragments already shown) and "done" (final post-processed answer: sanitized
+    when include_sources is false, shortened when brief, to replace the fragments).
+    """
+    logger.info(f"Question (stream): {request.question}")
+    lang = request.language.lower() if request.language and request.language.lower() in ('fr', 'en') \
+        else detect_language(request.question)
+    include_sources, brief = bool(request.include_sources), bool(request.brief)
+    bypass_cache = request.no_cache or "no-cache" in http_request.headers.get("cache-control", "")
+    version = mock_retriever.version
+    if semantic_cache is not None:
+        semantic_cache.set_kb_version(version)
+
+    cache_key, cached = None, None
+    if answer_cache is not None:
+        answer_cache.set_kb_version(version)
+        cache_key = AnswerCache.make_key(request.question, lang, include_sources, brief, version, GEMINI_MODEL_NAME)
+        if bypass_cache:
+            answer_cache.record_bypass()
+        else:
+            cached = answer_cache.get(cache_key)
+
+    retrieved_docs = mock_retriever.retrieve(request.question)
+    sources = list(set([doc["source"] for doc in retrieved_docs])) if include_sources else []
+    semantic_params = (lang, include_sources, brief, GEMINI_MODEL_NAME, [doc.get("id") for doc in retrieved_docs])
+    if cached is None and semantic_cache is not None and not bypass_cache:
+        similar = semantic_cache.lookup(request.question, *semantic_params)
+        # Les vérifications d'audit ne concernent que /chat
+        if similar is not None and not similar["shadow"]:
+            cached = similar["value"]
+
+    async def events():
+        start = time.perf_counter()
+        yield sse_event("sources", {"sources": sources, "language": lang})
+        if cached is not None:
+            yield sse_event("done", {"answer": cached["answer"], "sources": cached["sources"], "cached": True})
+            return
+
+        prompt = build_prompt(request.question, retrieved_docs, language=lang, include_sources=include_sources, brief=brief)
+        fragments = []
+        try:
+            async for fragment in gemini_client.stream(prompt):
+                if not fragments:
+                    logger.info("Premier fragment Gemini après %.0f ms", (time.perf_counter() - start) * 1000)
+                fragments.append(fragment)
+                yield sse_event("token", {"text": fragment})
+        except GeminiError as e:
+            logger.warning(f"Streaming Gemini en échec après {len(fragments)} fragments: {e}")
+            answer = fallback_answer_from_docs(request.question, retrieved_docs, language=lang,
+                                               include_sources=include_sources, brief=brief)
+            yield sse_event("fallback", {"answer": answer})
+            yield sse_event("done", {"answer": answer, "sources": sources, "cached": False})
+            return
+
+        answer = sanitize_answer("".join(fragments), include_sources)
+        if brief:
+            answer = reduce_answer_to_brief(answer, max_sentences=1)
+        result = ChatResponse(answer=answer, sources=sources).model_dump()
+        if cache_key is not None:
+            answer_cache.put(cache_key, result, model=GEMINI_MODEL_NAME)
+        if semantic_cache is not None:
+            semantic_cache.add(request.question, *semantic_params, result)
+        yield sse_event("done", dict(result, cached=False))
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
 @app.get("/")
 async def root():
     return {
@@ -451,62 +448,192 @@ async def health_check():
     return {
         "status": "healthy", 
         "api_configured": bool(GEMINI_API_KEY),
-        "service": "aeronautics-chatbot-gemini2"
+        "service": "aeronautics-chatbot-gemini2",
+        "llm": gemini_client.stats(),
+        "knowledge_base": mock_retriever.stats(),
+        "cache": answer_cache.stats() if answer_cache else None,
+        "semantic_cache": semantic_cache.stats() if semantic_cache else None,
+        "coalescing": coalescer.stats() if coalescer else None
     }
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest):
-    try:
-        logger.info(f"Question: {request.question}")
-        
-        # 1. Récupère les documents
-        retrieved_docs = mock_retriever.retrieve(request.question)
-        
-        # 2. Determine language and construct the prompt
-        if request.language and request.language.lower() in ('fr', 'en'):
-            lang = request.language.lower()
-        else:
-            lang = detect_language(request.question)
-
-        prompt = build_prompt(request.question, retrieved_docs, language=lang, include_sources=bool(request.include_sources), brief=bool(request.brief))
-        print(f"📝 Prompt construit ({len(prompt)} caractères)")
-
-        # 3. Appelle Gemini
-        answer = call_gemini_api(prompt)
-
-        # 3.5 Fallback if Gemini failed (e.g., 429 quota)
-        if isinstance(answer, str) and answer.strip().startswith("❌"):
-            answer = fallback_answer_from_docs(
-                request.question,
-                retrieved_docs,
-                language=lang,
-                include_sources=bool(request.include_sources),
-                brief=bool(request.brief)
-            )
-        else:
-            # Sanitize answer if user requested no sources
-            answer = sanitize_answer(answer, bool(request.include_sources))
-            # If the client requested a brief answer, enforce a short reply server-side
-            if bool(request.brief):
-                answer = reduce_answer_to_brief(answer, max_sentences=1)
-
-        # 4. Extrait les sources (only return sources when requested)
-        if bool(request.include_sources):
-            sources = list(set([doc["source"] for doc in retrieved_docs]))
-        else:
-            sources = []
+@app.post("/admin/reload-kb")
+async def reload_knowledge_base(http_request: Request):
+    """Reload cabin_docs.json now instead of waiting for the watcher (X-Admin-Token
+    required when KB_ADMIN_TOKEN is set)."""
+    if KB_ADMIN_TOKEN and http_request.headers.get("x-admin-token") != KB_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Jeton d'administration invalide")
+    reloaded = await asyncio.to_thread(mock_retriever.reload_if_changed)
+    return dict(mock_retriever.stats(), reloaded=reloaded)
+
+@app.get("/cache/stats")
+async def cache_stats():
+    if answer_cache is None:
+        return {"enabled": False}
+    return dict(answer_cache.stats(), enabled=True, coalescing=coalescer.stats() if coalescer else None)
+
+@app.get("/cache/semantic/audit")
+async def semantic_cache_audit(limit: int = 50):
+    """Recent semantic hits (new question, cached question, similarity, shadow agreement)
+    to review false hits before lowering CHAT_SEMANTIC_THRESHOLD."""
+    if semantic_cache is None:
+        return {"enabled": False}
+    hits = list(semantic_cache.audit_log)[-limit:]
+    return {"enabled": True, "stats": semantic_cache.stats(), "hits": hits[::-1]}
+
+async def answer_question(request: ChatRequest, bypass_cache: bool = False,
+                          retrieved_docs: Optional[List[dict]] = None,
+                          http_request: Optional[Request] = None) -> Tuple[ChatResponse, Optional[str]]:
+    """Answer one question: caches, retrieval, Gemini (coalesced), fallback.
+
+    Returns the response and the cache status for the X-Cache header. retrieved_docs
+    may be precomputed (batch retrieval); http_request, when given, cancels the
+    Gemini call if the client disconnects.
+    """
+    logger.info(f"Question: {request.question}")
+    cache_status = None
 
-        logger.info(f"✅ Réponse générée avec {len(sources)} sources")
+    # 1. Determine language
+    if request.language and request.language.lower() in ('fr', 'en'):
+        lang = request.language.lower()
+    else:
+        lang = detect_language(request.question)
+
+    # 2. Cache des réponses (contourné par no_cache ou "Cache-Control: no-cache")
+    cache_key = None
+    bypass_cache = bypass_cache or bool(request.no_cache)
+    version = mock_retriever.version
+    if semantic_cache is not None:
+        semantic_cache.set_kb_version(version)
+    if answer_cache is not None:
+        answer_cache.set_kb_version(version)
+        cache_key = AnswerCache.make_key(request.question, lang, bool(request.include_sources),
+                                         bool(request.brief), version, GEMINI_MODEL_NAME)
+        if bypass_cache:
+            answer_cache.record_bypass()
+            cache_status = "BYPASS"
+        else:
+            cached = answer_cache.get(cache_key)
+            if cached is not None:
+                return ChatResponse(**cached), "HIT"
+            cache_status = "MISS"
 
-        return ChatResponse(
-            answer=answer,
-            sources=sources
+    # 3. Récupère les documents et construit le prompt
+    if retrieved_docs is None:
+        retrieved_docs = mock_retriever.retrieve(request.question)
+    doc_ids = [doc.get("id") for doc in retrieved_docs]
+    semantic_params = (lang, bool(request.include_sources), bool(request.brief), GEMINI_MODEL_NAME, doc_ids)
+
+    shadow = None
+    if semantic_cache is not None and not bypass_cache:
+        similar = semantic_cache.lookup(request.question, *semantic_params)
+        if similar is not None and not similar["shadow"]:
+            logger.info("Cache sémantique: %r ~ %r (%.2f)", request.question, similar["question"],
+                        similar["similarity"])
+            if cache_key is not None:
+                answer_cache.put(cache_key, similar["value"], model=GEMINI_MODEL_NAME)
+            return ChatResponse(**similar["value"]), "SEMANTIC-HIT"
+        # Audit: une fraction des réponses sémantiques est recalculée et comparée
+        shadow = similar
+        if shadow is not None:
+            cache_status = "SEMANTIC-AUDIT"
+
+    prompt = build_prompt(request.question, retrieved_docs, language=lang, include_sources=bool(request.include_sources), brief=bool(request.brief))
+    print(f"📝 Prompt construit ({len(prompt)} caractères)")
+
+    # 4. Appelle Gemini (sans bloquer la boucle; annulé si le client se déconnecte).
+    #    Les requêtes simultanées de même clé partagent le même appel.
+    if coalescer is not None:
+        coalesce_key = cache_key or AnswerCache.make_key(request.question, lang, bool(request.include_sources),
+                                                         bool(request.brief), version, GEMINI_MODEL_NAME)
+        upstream = coalescer.run(coalesce_key, lambda: call_gemini_api(prompt))
+    else:
+        upstream = call_gemini_api(prompt)
+    if http_request is not None:
+        answer = await run_unless_disconnected(http_request, upstream)
+    else:
+        answer = await upstream
+
+    # 4.5 Fallback if Gemini failed (e.g., 429 quota)
+    llm_failed = isinstance(answer, str) and answer.strip().startswith("❌")
+    if llm_failed:
+        answer = fallback_answer_from_docs(
+            request.question,
+            retrieved_docs,
+            language=lang,
+            include_sources=bool(request.include_sources),
+            brief=bool(request.brief)
         )
-        
+    else:
+        # Sanitize answer if user requested no sources
+        answer = sanitize_answer(answer, bool(request.include_sources))
+        # If the client requested a brief answer, enforce a short reply server-side
+        if bool(request.brief):
+            answer = reduce_answer_to_brief(answer, max_sentences=1)
+
+    # 5. Extrait les sources (only return sources when requested)
+    if bool(request.include_sources):
+        sources = list(set([doc["source"] for doc in retrieved_docs]))
+    else:
+        sources = []
+
+    logger.info(f"✅ Réponse générée avec {len(sources)} sources")
+
+    result = ChatResponse(
+        answer=answer,
+        sources=sources
+    )
+    # Les réponses de secours (quota, erreur API) ne sont pas mises en cache
+    if cache_key is not None and not llm_failed:
+        answer_cache.put(cache_key, result.model_dump(), model=GEMINI_MODEL_NAME)
+    if semantic_cache is not None and not llm_failed:
+        if shadow is not None:
+            semantic_cache.audit_shadow(request.question, shadow["value"]["answer"], answer)
+        else:
+            semantic_cache.add(request.question, *semantic_params, result.model_dump())
+    return result, cache_status
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat_endpoint(request: ChatRequest, http_request: Request, response: Response):
+    try:
+        bypass_cache = "no-cache" in http_request.headers.get("cache-control", "")
+        result, cache_status = await answer_question(request, bypass_cache=bypass_cache, http_request=http_request)
+        if cache_status is not None:
+            response.headers["X-Cache"] = cache_status
+        return result
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erreur endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Erreur interne: {str(e)}")
 
+@app.post("/chat/batch", response_model=ChatBatchResponse)
+async def chat_batch_endpoint(requests_: List[ChatRequest], http_request: Request):
+    """Answer a list of questions: one batched retrieval pass, then at most
+    CHAT_BATCH_CONCURRENCY questions answered at once. Results keep the request
+    order; a failing item carries its error without failing the others."""
+    if len(requests_) > CHAT_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Trop de questions (max {CHAT_BATCH_MAX_ITEMS})")
+    bypass_cache = "no-cache" in http_request.headers.get("cache-control", "")
+    all_docs = mock_retriever.retrieve_batch([item.question for item in requests_])
+    slots = asyncio.Semaphore(CHAT_BATCH_CONCURRENCY)
+
+    async def answer_item(index: int, item: ChatRequest) -> ChatBatchItem:
+        async with slots:
+            try:
+                result, cache_status = await answer_question(item, bypass_cache=bypass_cache,
+                                                             retrieved_docs=all_docs[index])
+                return ChatBatchItem(index=index, answer=result.answer, sources=result.sources, cache=cache_status)
+            except Exception as e:
+                logger.error(f"Erreur question {index} du lot: {str(e)}")
+                return ChatBatchItem(index=index, error=f"Erreur interne: {str(e)}")
+
+    start = time.perf_counter()
+    results = await run_unless_disconnected(
+        http_request, asyncio.gather(*(answer_item(i, item) for i, item in enumerate(requests_))))
+    logger.info("Lot de %d questions traité en %.2f s", len(requests_), time.perf_counter() - start)
+    return ChatBatchResponse(results=results)
+
 # Endpoint de test
 @app.get("/test")
 async def test_endpoint():
@@ -0,0 +1,344 @@
+import hashlib
+import heapq
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from itertools import chain
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+# Letters and digits; "_" separates words too ("Qatar_Airways" -> "qatar", "airways")
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+# Accent-folded FR/EN stopwords ignored by BM25 (the overlap scorer keeps every term)
+STOPWORDS = {
+    "fr": set("""
+        a au aux avec ce ces dans de des du elle en est et etre eux il ils je la le les leur lui ma
+        mais me meme mes moi mon ne nos notre nous on ou par pas pour qu que qui sa se ses son sur ta
+        te tes toi ton tu un une vos votre vous c d j l m n s t y ete etait sont quel quelle quels
+        quelles comment combien pourquoi faut peut peux puis dois doit chez quoi si plus
+        min max env
+    """.split()),
+    "en": set("""
+        a an and are as at be been but by can could do does for from had has have how i if in into
+        is it its me my no not of on or our so such than that the their them then there these they
+        this to was we were what when where which who why will with would you your should must any
+        min max
+    """.split()),
+}
+
+RANKINGS = ("bm25", "overlap")
+# Documents placed in the prompt context
+TOP_K = 3
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Lowercase, accent-folded word tokens ("Sécurité" -> "securite")."""
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return _TOKEN_RE.findall(folded)
+
+
+def stopwords_for(languages: Iterable[str]) -> set:
+    """Union of the stopword lists for e.g. ["fr", "en"] (unknown codes are ignored)."""
+    words = set()
+    for lang in languages:
+        words |= STOPWORDS.get(lang.strip().lower(), set())
+    return words
+
+
+class BM25Index:
+    """Okapi BM25 over a sparse document-term matrix.
+
+    Document weights idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl)) are
+    precomputed in a CSC matrix (documents x terms), so scoring one query or a batch
+    is a single sparse product that only reads the columns of the query terms.
+    """
+
+    def __init__(self, tokenized_docs: List[List[str]], k1: float = 1.5, b: float = 0.75,
+                 vocabulary: Optional[Dict[str, int]] = None,
+                 term_counts: Optional[List[Tuple[List[int], List[int]]]] = None):
+        """Either tokenized_docs, or term_counts: per document the (term ids, counts)
+        pairs in `vocabulary` (reused across reloads for unchanged documents)."""
+        self.k1 = k1
+        self.b = b
+        if term_counts is None:
+            vocabulary = {}
+            term_counts = [encode_term_counts(tokens, vocabulary) for tokens in tokenized_docs]
+        self.vocabulary = vocabulary
+
+        n_docs, n_terms = len(term_counts), len(vocabulary)
+        sizes = np.fromiter((len(ids) for ids, _ in term_counts), dtype=np.int64, count=n_docs)
+        rows = np.repeat(np.arange(n_docs, dtype=np.int64), sizes)
+        cols = np.fromiter(chain.from_iterable(ids for ids, _ in term_counts), dtype=np.int64, count=int(sizes.sum()))
+        tf = np.fromiter(chain.from_iterable(counts for _, counts in term_counts), dtype=np.float32,
+                         count=int(sizes.sum()))
+        lengths = np.bincount(rows, weights=tf, minlength=n_docs).astype(np.float32)
+        df = np.bincount(cols, minlength=n_terms).astype(np.float32)
+        self.idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avgdl = float(lengths.mean()) if n_docs and lengths.any() else 1.0
+        norm = k1 * (1 - b + b * lengths[rows] / avgdl)
+        weights = self.idf[cols] * tf * (k1 + 1) / (tf + norm)
+        self.matrix = sparse.csc_matrix((weights, (rows, cols)), shape=(n_docs, n_terms), dtype=np.float32)
+
+    @property
+    def n_docs(self) -> int:
+        return self.matrix.shape[0]
+
+    def query_matrix(self, queries: List[List[str]]) -> sparse.csc_matrix:
+        """Terms x queries indicator matrix (each distinct known term counts once)."""
+        rows, cols = [], []
+        for query_id, tokens in enumerate(queries):
+            for term in set(tokens):
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    rows.append(column)
+                    cols.append(query_id)
+        data = np.ones(len(rows), dtype=np.float32)
+        return sparse.csc_matrix((data, (rows, cols)), shape=(self.matrix.shape[1], len(queries)))
+
+    def score_batch(self, queries: List[List[str]]) -> np.ndarray:
+        """Scores of every document for every query, shape (queries, documents)."""
+        if not queries:
+            return np.zeros((0, self.n_docs), dtype=np.float32)
+        return (self.matrix @ self.query_matrix(queries)).T.toarray()
+
+    def score(self, tokens: List[str]) -> np.ndarray:
+        return self.score_batch([tokens])[0]
+
+
+def encode_term_counts(tokens: List[str], vocabulary: Dict[str, int]) -> Tuple[List[int], List[int]]:
+    """(term ids, counts) of a token list; new terms are added to vocabulary."""
+    counts = Counter(tokens)
+    return [vocabulary.setdefault(term, len(vocabulary)) for term in counts], list(counts.values())
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> List[int]:
+    """Best positive scores first, ties in document order."""
+    candidates = np.flatnonzero(scores > 0)
+    if len(candidates) > top_k:
+        # Keep every candidate tied with the k-th score so the tie-break stays stable
+        kth = np.partition(scores[candidates], len(candidates) - top_k)[len(candidates) - top_k]
+        candidates = candidates[scores[candidates] >= kth]
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order[:top_k]].tolist()
+
+
+def content_version(raw: bytes) -> str:
+    """Knowledge-base version: sha256 prefix of the cabin_docs.json bytes."""
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+class IndexSnapshot(NamedTuple):
+    """Everything a query reads. Never modified once built: a reload builds a new
+    snapshot and swaps the reference, so a query keeps a consistent index."""
+    docs: List[dict]
+    postings: Dict[str, List[int]]
+    bm25: BM25Index
+    version: str
+
+
+# Base de connaissances cabine (chargée depuis cabin_docs.json)
+class CabinCrewRetriever:
+    def __init__(self, json_path: str = None, docs: Optional[List[dict]] = None,
+                 ranking: str = "bm25", stopwords: Optional[Iterable[str]] = None,
+                 k1: float = 1.5, b: float = 0.75):
+        """ranking: "bm25" (default) or "overlap" (count of shared terms);
+        stopwords: terms ignored by BM25, defaults to the FR + EN lists.
+
+        Loaded from json_path (default cabin_docs.json) unless docs is given;
+        reload_if_changed() then picks up edits of the file.
+        """
+        if ranking not in RANKINGS:
+            raise ValueError(f"ranking must be one of {RANKINGS}, got {ranking!r}")
+        self.ranking = ranking
+        self.stopwords = set(stopwords) if stopwords is not None else stopwords_for(["fr", "en"])
+        self.k1 = k1
+        self.b = b
+        self.json_path = json_path or os.path.join(os.path.dirname(__file__), "cabin_docs.json")
+        self._vocabulary: Dict[str, int] = {}  # grows only, so cached term ids stay valid
+        self._encoded_docs: Dict[Tuple, Tuple] = {}
+        self._signature = None
+        self._reload_lock = threading.Lock()
+        self.reload_stats = {"reloads": 0, "failed": 0, "last_reload_s": None, "retokenized": 0,
+                             "last_error": None}
+        if docs is None:
+            self._reload_file(initial=True)
+        else:
+            docs = list(docs)
+            self.load(docs, version=content_version(json.dumps(docs, sort_keys=True).encode("utf-8")))
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "CabinCrewRetriever":
+        """RETRIEVER_RANKING (bm25|overlap) and RETRIEVER_STOPWORDS (e.g. "fr,en", or "none")."""
+        options = {"ranking": os.getenv("RETRIEVER_RANKING", "bm25").strip().lower()}
+        languages = os.getenv("RETRIEVER_STOPWORDS")
+        if languages is not None:
+            options["stopwords"] = stopwords_for(languages.split(","))
+        options.update(kwargs)
+        return cls(**options)
+
+    # Current index, read once per query (see IndexSnapshot)
+    @property
+    def docs(self) -> List[dict]:
+        return self._snapshot.docs
+
+    @property
+    def postings(self) -> Dict[str, List[int]]:
+        return self._snapshot.postings
+
+    @property
+    def bm25(self) -> BM25Index:
+        return self._snapshot.bm25
+
+    @property
+    def version(self) -> str:
+        """Knowledge-base version of the index serving queries (key for the answer caches)."""
+        return self._snapshot.version
+
+    def load(self, docs: Iterable[dict], version: str = "docs"):
+        """Build the postings lists (term -> doc ids) for the overlap scorer and the
+        BM25 matrix (stopwords removed), then swap them in.
+
+        Documents already seen by a previous load (same id, text and source) reuse
+        their encoded terms: only new or edited documents are tokenized, the rest
+        of the build is vectorized.
+        """
+        docs = list(docs)
+        previous = self._encoded_docs
+        encoded_docs: Dict[Tuple, Tuple] = {}
+        encoded = []
+        for doc in docs:
+            key = (doc.get("id"), doc.get("text"), doc.get("source"))
+            entry = previous.get(key) or encoded_docs.get(key)
+            if entry is None:
+                tokens = normalize_tokens((doc.get("text") or "") + " " + (doc.get("source") or ""))
+                entry = ([self._vocabulary.setdefault(term, len(self._vocabulary)) for term in set(tokens)],
+                         encode_term_counts([t for t in tokens if t not in self.stopwords], self._vocabulary))
+            encoded_docs[key] = entry
+            encoded.append(entry)
+        vocabulary = dict(self._vocabulary)
+        bm25 = BM25Index([], k1=self.k1, b=self.b, vocabulary=vocabulary,
+                         term_counts=[term_counts for _, term_counts in encoded])
+        snapshot = IndexSnapshot(docs, self._build_postings([term_ids for term_ids, _ in encoded], vocabulary),
+                                 bm25, version)
+        self.reload_stats["retokenized"] = len(docs) - sum(key in previous for key in encoded_docs)
+        self._encoded_docs = encoded_docs
+        self._snapshot = snapshot  # atomic swap: queries in progress keep the previous snapshot
+
+    @staticmethod
+    def _build_postings(doc_terms: List[List[int]], vocabulary: Dict[str, int]) -> Dict[str, List[int]]:
+        sizes = np.fromiter((len(ids) for ids in doc_terms), dtype=np.int64, count=len(doc_terms))
+        terms = np.fromiter(chain.from_iterable(doc_terms), dtype=np.int64, count=int(sizes.sum()))
+        doc_ids = np.repeat(np.arange(len(doc_terms), dtype=np.int64), sizes)
+        order = np.argsort(terms, kind="stable")  # doc ids stay sorted within a term
+        terms, doc_ids = terms[order], doc_ids[order]
+        present, starts = np.unique(terms, return_index=True)
+        names = {term_id: term for term, term_id in vocabulary.items()}
+        return {names[term_id]: ids.tolist()
+                for term_id, ids in zip(present.tolist(), np.split(doc_ids, starts[1:]))}
+
+    def _reload_file(self, initial: bool = False) -> bool:
+        signature = None
+        try:
+            st = os.stat(self.json_path)
+            signature = (st.st_size, st.st_mtime_ns)
+            if not initial and signature == self._signature:
+                return False
+            with open(self.json_path, "rb") as fh:
+                raw = fh.read()
+            version = content_version(raw)
+            if not initial and version == self.version:
+                self._signature = signature
+                return False
+            docs = json.loads(raw.decode("utf-8"))
+            if not isinstance(docs, list):
+                raise ValueError("une liste de documents est attendue")
+        except Exception as e:
+            if initial:
+                if isinstance(e, FileNotFoundError):
+                    logger.warning("cabin_docs.json non trouvé; utilisation d'un jeu de données vide.")
+                else:
+                    logger.warning("Erreur lecture cabin_docs.json: %s", str(e))
+                self.load([], version="empty")
+            else:
+                # Fichier en cours d'écriture ou invalide: l'index actuel reste en service
+                # (nouvel essai à la prochaine modification du fichier)
+                self._signature = signature
+                self.reload_stats["failed"] += 1
+                self.reload_stats["last_error"] = str(e)
+                logger.warning("Rechargement de cabin_docs.json ignoré: %s", str(e))
+            return False
+        start = time.perf_counter()
+        self.load(docs, version=version)
+        self._signature = signature
+        if not initial:
+            self.reload_stats["reloads"] += 1
+            self.reload_stats["last_reload_s"] = round(time.perf_counter() - start, 4)
+            self.reload_stats["last_error"] = None
+            logger.info("cabin_docs.json rechargé: %d documents (version %s, %d retokenisés)",
+                        len(docs), version, self.reload_stats["retokenized"])
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """Reload cabin_docs.json if its size/mtime and content changed (blocking:
+        run it outside the event loop). An unreadable file keeps the current index."""
+        with self._reload_lock:
+            return self._reload_file()
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return dict(self.reload_stats, version=snapshot.version, documents=len(snapshot.docs),
+                    terms=len(snapshot.postings))
+
+    @staticmethod
+    def _fill(snapshot: IndexSnapshot, selected: List[int], top_k: int) -> List[dict]:
+        # Fewer matches than top_k: complete with the first documents of the knowledge base
+        if len(selected) < top_k:
+            chosen = set(selected)
+            selected = selected + [doc_id for doc_id in range(min(len(snapshot.docs), top_k + len(chosen)))
+                                   if doc_id not in chosen][:top_k - len(selected)]
+        return [snapshot.docs[doc_id] for doc_id in selected]
+
+    @staticmethod
+    def _overlap_top_k(snapshot: IndexSnapshot, question: str, top_k: int) -> List[int]:
+        overlap: Dict[int, int] = defaultdict(int)
+        for term in set(normalize_tokens(question)):
+            for doc_id in snapshot.postings.get(term, ()):
+                overlap[doc_id] += 1
+        best = heapq.nsmallest(top_k, overlap.items(), key=lambda item: (-item[1], item[0]))
+        return [doc_id for doc_id, _ in best]
+
+    def _bm25_tokens(self, question: str) -> List[str]:
+        return [t for t in normalize_tokens(question) if t not in self.stopwords]
+
+    def retrieve(self, question: str, top_k: int = TOP_K, ranking: Optional[str] = None) -> List[dict]:
+        """Returns the top_k documents for the question (ties keep the original order).
+
+        BM25 only reads the matrix columns of the question terms; the overlap scorer
+        only visits documents sharing at least one term with the question.
+        """
+        logger.info(f"Recherche de documents cabine pour: {question}")
+        snapshot = self._snapshot
+        if (ranking or self.ranking) == "overlap":
+            return self._fill(snapshot, self._overlap_top_k(snapshot, question, top_k), top_k)
+        scores = snapshot.bm25.score(self._bm25_tokens(question))
+        return self._fill(snapshot, top_k_indices(scores, top_k), top_k)
+
+    def retrieve_batch(self, questions: List[str], top_k: int = TOP_K,
+                       ranking: Optional[str] = None) -> List[List[dict]]:
+        """retrieve() for several questions; BM25 scores them in one sparse product."""
+        snapshot = self._snapshot
+        if (ranking or self.ranking) == "overlap":
+            return [self._fill(snapshot, self._overlap_top_k(snapshot, q, top_k), top_k) for q in questions]
+        scores = snapshot.bm25.score_batch([self._bm25_tokens(q) for q in questions])
+        return [self._fill(snapshot, top_k_indices(row, top_k), top_k) for row in scores]
@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from retriever import STOPWORDS, TOP_K, normalize_tokens
+
+logger = logging.getLogger(__name__)
+
+VOCABULARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "semantic_vocabulary.json")
+
+
+def load_vocabulary(path: str = VOCABULARY_PATH) -> Tuple[set, Dict[str, set]]:
+    """Domain stopwords and attribute words from semantic_vocabulary.json, kept next to
+    cabin_docs.json and edited with it (words are lowercase and accent-folded).
+
+    domain_stopwords: words that do not change the meaning of a crew-recruitment
+    question, i.e. the job itself and the qualifiers around a requirement
+    ("taille minimum" ~ "taille requise").
+    attributes: what a question asks about. Two questions can score high on the
+    embedding and share the same documents (cabin_docs.json holds one document per
+    airline) while asking for a different field ("Emirates min age" / "Emirates max
+    age", "Qatar height" / "Qatar weight"): a cached answer is reused only when both
+    questions mention the same attributes.
+    """
+    with open(path, encoding="utf-8") as fh:
+        vocabulary = json.load(fh)
+    return (set(vocabulary["domain_stopwords"]),
+            {attribute: set(words) for attribute, words in vocabulary["attributes"].items()})
+
+
+DOMAIN_STOPWORDS, ATTRIBUTE_WORDS = load_vocabulary()
+SEMANTIC_STOPWORDS = (STOPWORDS["fr"] | STOPWORDS["en"] | DOMAIN_STOPWORDS) - {"min", "max"}
+_WORD_ATTRIBUTES = {word: attribute for attribute, words in ATTRIBUTE_WORDS.items() for word in words}
+
+
+def embed_question(question: str, dim: int = 4096, stopwords: Optional[set] = None) -> np.ndarray:
+    """Offline question embedding: signed feature hashing of the content words and of
+    their character 3/4-grams (accent-folded), L2-normalized."""
+    stopwords = SEMANTIC_STOPWORDS if stopwords is None else stopwords
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in normalize_tokens(question):
+        if word in stopwords:
+            continue
+        padded = f" {word} "
+        features = [("w", word, 1.0)]
+        features += [("c", padded[i:i + n], 0.5) for n in (3, 4) for i in range(len(padded) - n + 1)]
+        for kind, feature, weight in features:
+            h = zlib.crc32(f"{kind}:{feature}".encode("utf-8"))
+            vector[h % dim] += weight if h & 0x80000000 else -weight
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+def question_attributes(question: str) -> frozenset:
+    """Attributes a question asks about, e.g. {"age", "max"} for "âge limite Emirates"."""
+    return frozenset(_WORD_ATTRIBUTES[word] for word in normalize_tokens(question) if word in _WORD_ATTRIBUTES)
+
+
+class SemanticCache:
+    """Answers reused across paraphrases of the same question.
+
+    Question vectors live in one preallocated NumPy matrix; a lookup is a single
+    matrix-vector product. A cached answer is returned only when the cosine
+    similarity reaches the threshold AND the request parameters, knowledge-base
+    version and model are identical AND both questions ask about the same
+    attributes (see semantic_vocabulary.json) AND the first match_docs retrieved
+    documents are the same (0 disables the check; the default, the retrieval top_k,
+    requires the whole prompt context).
+
+    Auditing: every semantic hit is logged (both questions and the similarity),
+    and audit_rate of the hits are answered fresh instead ("shadow" calls) so the
+    agreement between cached and fresh answers can be measured.
+    """
+
+    def __init__(self, threshold: float = 0.75, max_entries: int = 2048, ttl: float = 6 * 3600,
+                 dim: int = 4096, match_docs: int = TOP_K, audit_rate: float = 0.0, audit_size: int = 500):
+        self.threshold = threshold
+        self.match_docs = match_docs
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.dim = dim
+        self.audit_rate = audit_rate
+        self._vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self._entries: List[Optional[dict]] = [None] * max_entries
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._size = 0
+        self._lock = threading.Lock()
+        self._kb_version = None
+        self.audit_log = deque(maxlen=audit_size)
+        self.counters = {"hits": 0, "misses": 0, "stores": 0, "evicted": 0,
+                         "rejected_params": 0, "rejected_attributes": 0, "rejected_docs": 0, "shadow_checks": 0,
+                         "shadow_disagreements": 0}
+
+    @classmethod
+    def from_env(cls) -> Optional["SemanticCache"]:
+        """CHAT_SEMANTIC_CACHE (1), CHAT_SEMANTIC_THRESHOLD (0.75), CHAT_SEMANTIC_MAX_ENTRIES (2048),
+        CHAT_SEMANTIC_MATCH_DOCS (3, the retrieval top_k), CHAT_CACHE_TTL seconds,
+        CHAT_SEMANTIC_AUDIT_RATE (0: fraction of hits re-asked to Gemini)."""
+        if os.getenv("CHAT_SEMANTIC_CACHE", "1") != "1":
+            return None
+        return cls(threshold=float(os.getenv("CHAT_SEMANTIC_THRESHOLD", "0.75")),
+                   max_entries=int(os.getenv("CHAT_SEMANTIC_MAX_ENTRIES", "2048")),
+                   match_docs=int(os.getenv("CHAT_SEMANTIC_MATCH_DOCS", str(TOP_K))),
+                   ttl=float(os.getenv("CHAT_CACHE_TTL", str(6 * 3600))),
+                   audit_rate=float(os.getenv("CHAT_SEMANTIC_AUDIT_RATE", "0")))
+
+    def set_kb_version(self, kb_version: str):
+        if kb_version == self._kb_version:
+            return
+        with self._lock:
+            self._entries = [None] * self.max_entries
+            self._last_used[:] = 0
+            self._size = 0
+            self._kb_version = kb_version
+
+    @staticmethod
+    def _params(language: str, include_sources: bool, brief: bool, model: str) -> Tuple:
+        return (language, bool(include_sources), bool(brief), model)
+
+    def lookup(self, question: str, language: str, include_sources: bool, brief: bool,
+               model: str, doc_ids: Iterable[str]) -> Optional[dict]:
+        """Best cached entry for a paraphrase of question, or None.
+
+        Returns {"value", "question", "similarity", "shadow"}; when shadow is True the
+        caller should answer fresh and report it with audit_shadow().
+        """
+        vector = embed_question(question, self.dim)
+        params = self._params(language, include_sources, brief, model)
+        attributes = question_attributes(question)
+        docs = tuple(doc_ids)[:self.match_docs]
+        now = time.time()
+        with self._lock:
+            if not self._size or not vector.any():
+                self.counters["misses"] += 1
+                return None
+            similarities = self._vectors[:self._size] @ vector
+            candidates = np.flatnonzero(similarities >= self.threshold)
+            for index in candidates[np.argsort(-similarities[candidates])]:
+                entry = self._entries[index]
+                if entry is None or entry["expires_at"] <= now:
+                    continue
+                if entry["params"] != params:
+                    self.counters["rejected_params"] += 1
+                    continue
+                if entry["attributes"] != attributes:
+                    # Same airline and wording, another field (min/max age, height/weight)
+                    self.counters["rejected_attributes"] += 1
+                    continue
+                if entry["docs"] != docs:
+                    # Same wording, different documents (e.g. another airline): not the same question
+                    self.counters["rejected_docs"] += 1
+                    continue
+                self._last_used[index] = now
+                self.counters["hits"] += 1
+                similarity = float(similarities[index])
+                shadow = self.audit_rate > 0 and random.random() < self.audit_rate
+                self.audit_log.append({"time": now, "question": question, "cached_question": entry["question"],
+                                       "similarity": round(similarity, 4), "shadow": shadow})
+                return {"value": entry["value"], "question": entry["question"],
+                        "similarity": similarity, "shadow": shadow}
+            self.counters["misses"] += 1
+            return None
+
+    def add(self, question: str, language: str, include_sources: bool, brief: bool,
+            model: str, doc_ids: Iterable[str], value: dict):
+        vector = embed_question(question, self.dim)
+        if not vector.any():
+            return
+        now = time.time()
+        with self._lock:
+            if self._size < self.max_entries:
+                index = self._size
+                self._size += 1
+            else:
+                # Full: replace the least recently used entry
+                index = int(np.argmin(self._last_used))
+                self.counters["evicted"] += 1
+            self._vectors[index] = vector
+            self._last_used[index] = now
+            self._entries[index] = {"question": question, "value": value, "docs": tuple(doc_ids)[:self.match_docs],
+                                    "params": self._params(language, include_sources, brief, model),
+                                    "attributes": question_attributes(question),
+                                    "expires_at": now + self.ttl}
+            self.counters["stores"] += 1
+
+    def audit_shadow(self, question: str, cached_answer: str, fresh_answer: str, min_agreement: float = 0.3):
+        """Compare a cached answer with the fresh one (word Jaccard); a low agreement
+        is counted as a probable false hit."""
+        cached_words, fresh_words = set(normalize_tokens(cached_answer)), set(normalize_tokens(fresh_answer))
+        union = cached_words | fresh_words
+        agreement = len(cached_words & fresh_words) / len(union) if union else 1.0
+        with self._lock:
+            self.counters["shadow_checks"] += 1
+            if agreement < min_agreement:
+                self.counters["shadow_disagreements"] += 1
+                logger.warning("Cache sémantique: réponse probablement erronée pour %r (accord %.2f)",
+                               question, agreement)
+            for record in reversed(self.audit_log):
+                if record["question"] == question and record["shadow"]:
+                    record["agreement"] = round(agreement, 4)
+                    break
+
+    def stats(self) -> dict:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return dict(self.counters, entries=self._size, max_entries=self.max_entries,
+                    threshold=self.threshold, match_docs=self.match_docs, audit_rate=self.audit_rate,
+                    hit_ratio=round(self.counters["hits"] / lookups, 4) if lookups else 0.0)
@@ -0,0 +1,68 @@
+import answer_cache
+from answer_cache import AnswerCache
+
+MODEL = "models/gemini-2.5-flash"
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _key(question, kb_version="v1"):
+    return AnswerCache.make_key(question, "fr", True, False, kb_version, MODEL)
+
+
+def test_ttl_expiry(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(answer_cache.time, "time", clock)
+    cache = AnswerCache(ttl=60)
+    cache.set_kb_version("v1")
+    cache.put(_key("taille Qatar"), {"answer": "162 cm"})
+
+    clock.now += 59
+    assert cache.get(_key("taille Qatar")) == {"answer": "162 cm"}
+    clock.now += 2
+    assert cache.get(_key("taille Qatar")) is None
+    assert cache.counters["expired"] == 1
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = AnswerCache(max_entries=2)
+    cache.set_kb_version("v1")
+    cache.put(_key("a"), {"answer": "a"})
+    cache.put(_key("b"), {"answer": "b"})
+    assert cache.get(_key("a")) is not None  # "b" is now the least recently used
+    cache.put(_key("c"), {"answer": "c"})
+
+    assert cache.get(_key("b")) is None
+    assert cache.get(_key("a")) == {"answer": "a"}
+    assert cache.get(_key("c")) == {"answer": "c"}
+    assert cache.counters["evicted"] == 1
+
+
+def test_key_normalization_and_parameters():
+    assert _key("Âge minimum chez Qatar ?") == _key("age   minimum chez QATAR")
+    assert _key("age minimum") != _key("age minimum", kb_version="v2")
+    assert _key("age minimum") != AnswerCache.make_key("age minimum", "fr", True, True, "v1", MODEL)
+
+
+def test_knowledge_base_change_invalidates_memory_and_disk(tmp_path):
+    path = str(tmp_path / "answers.db")
+    cache = AnswerCache(sqlite_path=path)
+    cache.set_kb_version("v1")
+    cache.put(_key("taille Qatar"), {"answer": "162 cm"}, model=MODEL)
+
+    # The SQLite tier is read back by a new instance (restart)
+    restarted = AnswerCache(sqlite_path=path)
+    restarted.set_kb_version("v1")
+    assert restarted.get(_key("taille Qatar")) == {"answer": "162 cm"}
+    assert restarted.counters["hits_disk"] == 1
+
+    restarted.set_kb_version("v2")
+    assert restarted.stats()["entries_memory"] == 0
+    assert restarted.stats()["entries_disk"] == 0
+    assert restarted.get(_key("taille Qatar")) is None
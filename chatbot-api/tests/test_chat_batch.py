@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+QUESTIONS = [
+    "Quelle est la taille minimum pour Qatar Airways ?",
+    "Quel âge faut-il avoir chez Emirates ?",
+    "panne",
+    "Faut-il parler japonais chez ANA ?",
+    "Quel est le salaire chez Qatar Airways ?",
+]
+
+
+class FakeGemini:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def __call__(self, prompt):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            question = next(q for q in QUESTIONS if f"QUESTION: {q}\n" in prompt)
+            # Later questions finish first
+            await asyncio.sleep(0.01 * (len(QUESTIONS) - QUESTIONS.index(question)))
+            if question == "panne":
+                raise RuntimeError("Gemini injoignable")
+            return f"Réponse à {question}"
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    fake = FakeGemini()
+    monkeypatch.setattr(main, "call_gemini_api", fake)
+    monkeypatch.setattr(main, "answer_cache", None)
+    monkeypatch.setattr(main, "semantic_cache", None)
+    monkeypatch.setattr(main, "coalescer", None)
+    monkeypatch.setattr(main, "CHAT_BATCH_CONCURRENCY", 2)
+    return fake
+
+
+def test_results_keep_the_request_order_and_errors_stay_per_item(gemini):
+    response = TestClient(main.app).post("/chat/batch", json=[{"question": q} for q in QUESTIONS])
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+    assert [item["index"] for item in results] == list(range(len(QUESTIONS)))
+    for question, item in zip(QUESTIONS, results):
+        if question == "panne":
+            assert item["answer"] is None and "Gemini injoignable" in item["error"]
+        else:
+            assert item["answer"] == f"Réponse à {question}" and item["error"] is None
+            assert item["sources"]
+    assert gemini.peak == 2
+
+
+def test_oversized_batch_is_rejected(gemini, monkeypatch):
+    monkeypatch.setattr(main, "CHAT_BATCH_MAX_ITEMS", 3)
+    response = TestClient(main.app).post("/chat/batch", json=[{"question": q} for q in QUESTIONS])
+    assert response.status_code == 413
+    assert gemini.peak == 0
@@ -0,0 +1,60 @@
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from llm_client import GeminiClient
+
+QUESTION = "Quelle est la taille minimum pour Qatar Airways ?"
+
+
+def _gemini(status_code, fragments=()):
+    body = b"".join(
+        f"data: {json.dumps({'candidates': [{'content': {'parts': [{'text': text}]}}]})}\r\n\r\n".encode()
+        for text in fragments)
+
+    def handler(request):
+        return httpx.Response(status_code, content=body if status_code == 200 else b"quota")
+
+    return GeminiClient("key", main.GEMINI_API_URL, transport=httpx.MockTransport(handler))
+
+
+def _events(response):
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture
+def chat(monkeypatch):
+    monkeypatch.setattr(main, "answer_cache", None)
+    monkeypatch.setattr(main, "semantic_cache", None)
+    return TestClient(main.app)
+
+
+def test_sources_then_tokens_then_done(chat, monkeypatch):
+    monkeypatch.setattr(main, "gemini_client", _gemini(200, ["La taille minimum ", "est de 162 cm. ", "Source: Qatar"]))
+    response = chat.post("/chat/stream", json={"question": QUESTION, "include_sources": False})
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _events(response)
+    assert [name for name, _ in events] == ["sources", "token", "token", "token", "done"]
+    assert events[0][1] == {"sources": [], "language": "fr"}
+    assert "".join(data["text"] for name, data in events if name == "token") == \
+        "La taille minimum est de 162 cm. Source: Qatar"
+    # Final answer post-processed like /chat (sources removed on request)
+    assert "Source" not in events[-1][1]["answer"] and events[-1][1]["cached"] is False
+
+
+def test_failed_stream_sends_the_document_fallback(chat, monkeypatch):
+    monkeypatch.setattr(main, "gemini_client", _gemini(429))
+    events = _events(chat.post("/chat/stream", json={"question": QUESTION}))
+
+    assert [name for name, _ in events] == ["sources", "fallback", "done"]
+    assert events[0][1]["sources"]
+    assert events[1][1]["answer"] == events[2][1]["answer"]
+    assert events[2][1]["sources"] == events[0][1]["sources"]
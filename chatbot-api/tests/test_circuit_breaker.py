@@ -0,0 +1,172 @@
+import asyncio
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from llm_client import CircuitBreaker, GeminiClient, parse_retry_after
+
+API_URL = "https://gemini.test/v1beta/models/gemini-2.5-flash:generateContent"
+OK_BODY = {"candidates": [{"content": {"parts": [{"text": "162 cm"}]}}]}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_opens_on_failure_ratio_then_probes_and_closes(clock):
+    breaker = CircuitBreaker(failure_ratio=0.5, min_calls=4, window=10, open_seconds=30, clock=clock)
+    for outcome in (True, False, True):
+        assert breaker.allow()
+        if outcome:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+    assert breaker.state == "closed"  # 1 failure out of 3 calls, min_calls not reached
+
+    breaker.record_failure()  # 2/4 failures
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.retry_in() == pytest.approx(30)
+
+    clock.now += 30
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()  # a single probe at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.stats()["opened"] == 1 and breaker.stats()["rejected"] == 2
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(open_seconds=10, clock=clock)
+    breaker.record_failure(rate_limited=True)
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.retry_in() == pytest.approx(10)
+
+
+def test_cancelled_probe_frees_its_slot(clock):
+    breaker = CircuitBreaker(open_seconds=10, clock=clock)
+    breaker.record_failure(rate_limited=True)
+    clock.now += 10
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_rate_limit_opens_for_retry_after_capped(clock):
+    breaker = CircuitBreaker(open_seconds=30, max_open_seconds=600, clock=clock)
+    breaker.record_failure(rate_limited=True, retry_after=120)
+    assert breaker.state == "open"
+    assert breaker.retry_in() == pytest.approx(120)
+
+    capped = CircuitBreaker(max_open_seconds=600, clock=clock)
+    capped.record_failure(rate_limited=True, retry_after=86400)
+    assert capped.retry_in() == pytest.approx(600)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("-5") == 0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("bientôt") is None
+    now = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    http_date = format_datetime(datetime(2026, 1, 1, 12, 1, 30, tzinfo=timezone.utc), usegmt=True)
+    assert parse_retry_after(http_date, now=now.timestamp()) == pytest.approx(90)
+
+
+def test_client_serves_fallback_while_rate_limited(clock):
+    calls = []
+    responses = [httpx.Response(429, headers={"Retry-After": "60"}, text="quota"),
+                 httpx.Response(200, json=OK_BODY)]
+
+    def handler(request):
+        calls.append(request.url.host)
+        return responses.pop(0)
+
+    breaker = CircuitBreaker(clock=clock)
+    client = GeminiClient("key", API_URL, transport=httpx.MockTransport(handler), breaker=breaker)
+
+    async def scenario():
+        try:
+            assert (await client.generate("q")).startswith("❌ Erreur API (429)")
+            # Circuit open: answered at once, without calling Gemini
+            assert "circuit ouvert" in await client.generate("q")
+            assert len(calls) == 1
+
+            clock.now += 60
+            assert await client.generate("q") == "162 cm"
+            assert breaker.state == "closed"
+            assert len(calls) == 2
+        finally:
+            await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_call_cancelled_while_queued_keeps_the_probe_slot(clock):
+    release = asyncio.Event()
+
+    async def handler(request):
+        await release.wait()
+        return httpx.Response(200, json=OK_BODY)
+
+    breaker = CircuitBreaker(open_seconds=10, clock=clock)
+    client = GeminiClient("key", API_URL, transport=httpx.MockTransport(handler), breaker=breaker,
+                          max_concurrency=1)
+
+    async def scenario():
+        try:
+            holder = asyncio.create_task(client.generate("q"))
+            await asyncio.sleep(0.01)
+            assert client.in_flight == 1
+
+            breaker.record_failure(rate_limited=True)
+            clock.now += 10
+            queued = asyncio.create_task(client.generate("q"))
+            await asyncio.sleep(0.01)
+            queued.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await queued
+
+            assert breaker.state == "half_open"
+            assert breaker.allow()  # the cancelled call never held the probe slot
+            breaker.release()
+            release.set()
+            assert await holder == "162 cm"
+        finally:
+            await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_unreadable_answer_is_a_failure(clock):
+    def handler(request):
+        return httpx.Response(200, json={"unexpected": True})
+
+    breaker = CircuitBreaker(open_seconds=10, clock=clock)
+    breaker.record_failure(rate_limited=True)
+    clock.now += 10
+    client = GeminiClient("key", API_URL, transport=httpx.MockTransport(handler), breaker=breaker)
+
+    async def scenario():
+        try:
+            assert (await client.generate("q")).startswith("❌")
+            assert breaker.state == "open"
+        finally:
+            await client.aclose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from coalescing import RequestCoalescer
+
+
+class Upstream:
+    def __init__(self):
+        self.calls = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+        self.error = None
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return {"answer": "162 cm"}
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_concurrent_callers_share_one_call():
+    async def scenario():
+        coalescer, upstream = RequestCoalescer(), Upstream()
+        waiters = [asyncio.create_task(coalescer.run("q", upstream)) for _ in range(10)]
+        await _settle()
+        upstream.release.set()
+        assert await asyncio.gather(*waiters) == [{"answer": "162 cm"}] * 10
+        assert upstream.calls == 1
+        assert coalescer.stats()["calls_saved"] == 9 and coalescer.stats()["in_flight"] == 0
+
+        # Finished calls are not kept: the next caller starts a new one
+        assert await coalescer.run("q", upstream) == {"answer": "162 cm"}
+        assert upstream.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_error_is_shared_by_every_waiter():
+    async def scenario():
+        coalescer, upstream = RequestCoalescer(), Upstream()
+        upstream.error = RuntimeError("Gemini 500")
+        waiters = [asyncio.create_task(coalescer.run("q", upstream)) for _ in range(3)]
+        await _settle()
+        upstream.release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert coalescer.counters["errors"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_call():
+    async def scenario():
+        coalescer, upstream = RequestCoalescer(), Upstream()
+        leaving = asyncio.create_task(coalescer.run("q", upstream))
+        staying = asyncio.create_task(coalescer.run("q", upstream))
+        await _settle()
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+
+        upstream.release.set()
+        assert await staying == {"answer": "162 cm"}
+        assert upstream.cancelled == 0
+        assert coalescer.counters["cancelled_upstream"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_upstream_is_cancelled_when_the_last_waiter_leaves():
+    async def scenario():
+        coalescer, upstream = RequestCoalescer(), Upstream()
+        waiters = [asyncio.create_task(coalescer.run("q", upstream)) for _ in range(2)]
+        await _settle()
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await _settle()
+        assert upstream.cancelled == 1
+        assert coalescer.counters["cancelled_upstream"] == 1
+        assert coalescer.stats()["in_flight"] == 0
+
+        # A new caller for the same key gets a fresh call, not the cancelled one
+        upstream.release.set()
+        assert await coalescer.run("q", upstream) == {"answer": "162 cm"}
+        assert upstream.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_different_keys_are_not_coalesced():
+    async def scenario():
+        coalescer, upstream = RequestCoalescer(), Upstream()
+        upstream.release.set()
+        await asyncio.gather(coalescer.run("a", upstream), coalescer.run("b", upstream))
+        assert upstream.calls == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,24 @@
+import os
+
+import pytest
+
+from language_id import identify_language
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CV_PARSER_MODULE = os.path.join(ROOT, "..", "cv_parser", "src", "language_id.py")
+
+
+@pytest.mark.skipif(not os.path.exists(CV_PARSER_MODULE), reason="cv_parser not checked out (image build)")
+def test_copy_matches_cv_parser_module():
+    # Both are rewritten by cv_parser/benchmarks/build_language_profiles.py
+    with open(CV_PARSER_MODULE, encoding="utf-8") as f, \
+            open(os.path.join(ROOT, "language_id.py"), encoding="utf-8") as g:
+        assert f.read() == g.read()
+
+
+@pytest.mark.parametrize("question, language", [
+    ("Quelle est la taille minimale chez Qatar Airways ?", "fr"),
+    ("What is the minimum height for Qatar Airways?", "en"),
+])
+def test_identifies_question_language(question, language):
+    assert identify_language(question)["language"] == language
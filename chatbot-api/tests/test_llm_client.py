@@ -0,0 +1,160 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from llm_client import GeminiClient, GeminiError
+
+API_URL = "https://gemini.test/v1beta/models/gemini-2.5-flash:generateContent"
+OK_BODY = {"candidates": [{"content": {"parts": [{"text": "162 cm"}]}}]}
+
+
+def test_concurrent_calls_are_capped():
+    active, peak = 0, 0
+
+    async def handler(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        return httpx.Response(200, json=OK_BODY)
+
+    client = GeminiClient("key", API_URL, transport=httpx.MockTransport(handler), max_concurrency=2)
+
+    async def scenario():
+        try:
+            answers = await asyncio.gather(*(client.generate("q") for _ in range(6)))
+        finally:
+            await client.aclose()
+        assert answers == ["162 cm"] * 6
+
+    asyncio.run(scenario())
+    assert peak == 2
+    assert client.in_flight == 0
+
+
+def test_cancelled_call_aborts_the_upstream_request():
+    started, aborted = asyncio.Event(), []
+
+    async def handler(request):
+        started.set()
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            aborted.append(request.url.params["key"])
+            raise
+        return httpx.Response(200, json=OK_BODY)
+
+    client = GeminiClient("key", API_URL, transport=httpx.MockTransport(handler), max_concurrency=1)
+
+    async def scenario():
+        try:
+            call = asyncio.create_task(client.generate("q"))
+            await started.wait()
+            call.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await call
+            # The slot is free again for the next caller
+            started.clear()
+            assert client.in_flight == 0
+            follow_up = asyncio.create_task(client.generate("q"))
+            await asyncio.wait_for(started.wait(), 1)
+            follow_up.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await follow_up
+        finally:
+            await client.aclose()
+
+    asyncio.run(scenario())
+    assert aborted == ["key", "key"]
+    assert client.cancelled == 2
+
+
+def test_missing_key_is_reported_without_calling_gemini():
+    def handler(request):
+        raise AssertionError("no request expected")
+
+    client = GeminiClient(None, API_URL, transport=httpx.MockTransport(handler))
+    assert asyncio.run(client.generate("q")).startswith("❌ ERREUR: Clé API Gemini manquante")
+
+
+def _sse_chunk(text):
+    return f"data: {json.dumps({'candidates': [{'content': {'parts': [{'text': text}]}}]})}\r\n\r\n".encode()
+
+
+class FragmentStream(httpx.AsyncByteStream):
+    """streamGenerateContent body; records when the client closes it."""
+
+    def __init__(self, fragments):
+        self.fragments = fragments
+        self.closed = False
+
+    async def __aiter__(self):
+        for fragment in self.fragments:
+            yield _sse_chunk(fragment) if isinstance(fragment, str) else fragment
+            await asyncio.sleep(0)
+
+    async def aclose(self):
+        self.closed = True
+
+
+def _stream_client(body, status_code=200):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(status_code, stream=body, headers={"content-type": "text/event-stream"})
+
+    return GeminiClient("key", API_URL, transport=httpx.MockTransport(handler)), requests
+
+
+def test_stream_yields_fragments_in_order():
+    body = FragmentStream(["Taille ", "minimum : ", "162 cm"])
+    client, requests = _stream_client(body)
+
+    async def scenario():
+        try:
+            return [fragment async for fragment in client.stream("q")]
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(scenario()) == ["Taille ", "minimum : ", "162 cm"]
+    assert requests[0].url.path.endswith(":streamGenerateContent")
+    assert requests[0].url.params["alt"] == "sse"
+    assert body.closed
+
+
+def test_closing_the_stream_closes_the_upstream_response():
+    body = FragmentStream(["Taille ", "minimum : ", "162 cm"])
+    client, _ = _stream_client(body)
+
+    async def scenario():
+        try:
+            fragments = client.stream("q")
+            assert await fragments.__anext__() == "Taille "
+            await fragments.aclose()  # chat client gone
+            assert body.closed
+            assert client.in_flight == 0 and client.cancelled == 1
+        finally:
+            await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_stream_error_raises_after_the_fragments_already_sent():
+    body = FragmentStream(["Taille ", b'data: {"error": {"code": 503}}\r\n\r\n'])
+    client, _ = _stream_client(body)
+    received = []
+
+    async def scenario():
+        try:
+            async for fragment in client.stream("q"):
+                received.append(fragment)
+        finally:
+            await client.aclose()
+
+    with pytest.raises(GeminiError, match="503"):
+        asyncio.run(scenario())
+    assert received == ["Taille "]
@@ -0,0 +1,51 @@
+import pytest
+
+from retriever import CabinCrewRetriever
+
+DOCS = [
+    {"id": "formation", "source": "Guide",
+     "text": "La formation est obligatoire pour tout le personnel, quelle que soit la base."},
+    {"id": "emirates_taille", "source": "Emirates", "text": "Taille minimum 160 cm, allonge 212 cm."},
+    {"id": "qatar_taille", "source": "Qatar_Airways", "text": "Taille minimum 158 cm. Salaire 1100 EUR."},
+    {"id": "ana_langue", "source": "ANA", "text": "Japonais courant requis."},
+]
+
+QUESTION = "Quelle est la taille minimum pour Emirates ?"
+
+
+def _ids(docs):
+    return [doc["id"] for doc in docs]
+
+
+@pytest.fixture
+def retriever():
+    return CabinCrewRetriever(docs=DOCS)
+
+
+def test_bm25_ignores_stopwords_that_the_overlap_scorer_counts(retriever):
+    # "quelle", "est", "la", "pour": 4 terms shared with the general guide
+    assert _ids(retriever.retrieve(QUESTION, ranking="overlap"))[0] == "formation"
+    assert _ids(retriever.retrieve(QUESTION)) == ["emirates_taille", "qatar_taille", "formation"]
+
+
+def test_bm25_weights_rare_terms_higher(retriever):
+    # "taille" appears in two documents, "salaire" in only one
+    assert _ids(retriever.retrieve("taille salaire", top_k=2)) == ["qatar_taille", "emirates_taille"]
+    assert _ids(retriever.retrieve("japonais taille", top_k=1)) == ["ana_langue"]
+
+
+def test_batch_matches_single_queries(retriever):
+    questions = [QUESTION, "japonais", "salaire Qatar"]
+    for ranking in ("bm25", "overlap"):
+        assert retriever.retrieve_batch(questions, ranking=ranking) == \
+            [retriever.retrieve(q, ranking=ranking) for q in questions]
+
+
+def test_unmatched_question_falls_back_to_the_first_documents(retriever):
+    assert _ids(retriever.retrieve("parachute", top_k=2)) == ["formation", "emirates_taille"]
+    assert _ids(retriever.retrieve("parachute", top_k=2, ranking="overlap")) == ["formation", "emirates_taille"]
+
+
+def test_unknown_ranking_is_rejected():
+    with pytest.raises(ValueError):
+        CabinCrewRetriever(docs=DOCS, ranking="tfidf")
@@ -0,0 +1,85 @@
+import itertools
+import json
+import os
+
+import pytest
+
+from retriever import CabinCrewRetriever
+
+DOCS = [
+    {"id": "qatar_general", "source": "Qatar_Airways", "text": "Height (female): min 162 cm. Salaire 1100 EUR."},
+    {"id": "emirates_general", "source": "Emirates", "text": "Age: minimum 21 ans. Arm reach 212 cm."},
+    {"id": "ana_general", "source": "ANA", "text": "Japonais courant requis. Tatouages interdits."},
+]
+
+
+_MTIMES = itertools.count(1_700_000_000)
+
+
+def _write(path, content):
+    """Write the file and move its mtime forward (the signature is size + mtime)."""
+    path.write_text(content if isinstance(content, str) else json.dumps(content), encoding="utf-8")
+    stamp = next(_MTIMES)
+    os.utime(path, (stamp, stamp))
+
+
+@pytest.fixture
+def kb(tmp_path):
+    path = tmp_path / "cabin_docs.json"
+    _write(path, DOCS)
+    return path, CabinCrewRetriever(json_path=str(path))
+
+
+def test_edit_is_picked_up_incrementally(kb):
+    path, retriever = kb
+    before = retriever.version
+    docs = [dict(doc) for doc in DOCS]
+    docs[2]["text"] += " Natation 25 m obligatoire."
+    _write(path, docs)
+
+    assert retriever.reload_if_changed() is True
+    assert retriever.version != before
+    assert retriever.reload_stats["retokenized"] == 1
+    assert retriever.retrieve("natation obligatoire", top_k=1)[0]["id"] == "ana_general"
+
+
+@pytest.mark.parametrize("content", ['[{"id": "qatar_general", "text": "tronq', '{"id": "pas une liste"}', ""])
+def test_invalid_file_keeps_the_current_index(kb, content):
+    path, retriever = kb
+    version = retriever.version
+    snapshot_docs = retriever.docs
+    _write(path, content)
+
+    assert retriever.reload_if_changed() is False
+    assert retriever.version == version
+    assert retriever.docs is snapshot_docs
+    assert retriever.retrieve("taille Qatar", top_k=1)[0]["id"] == "qatar_general"
+    assert retriever.reload_stats["failed"] == 1
+    assert retriever.reload_stats["last_error"]
+
+    # Same broken file on the next poll: not retried, not counted again
+    assert retriever.reload_if_changed() is False
+    assert retriever.reload_stats["failed"] == 1
+
+    # Once the file is valid again it is loaded
+    _write(path, DOCS[:2])
+    assert retriever.reload_if_changed() is True
+    assert len(retriever.docs) == 2
+    assert retriever.reload_stats["last_error"] is None
+
+
+def test_touched_file_with_same_content_is_not_reloaded(kb):
+    path, retriever = kb
+    version = retriever.version
+    _write(path, DOCS)
+    assert retriever.reload_if_changed() is False
+    assert retriever.version == version
+    assert retriever.reload_stats["reloads"] == 0
+
+
+def test_queries_in_progress_keep_their_snapshot(kb):
+    path, retriever = kb
+    snapshot = retriever._snapshot
+    _write(path, DOCS[:1])
+    assert retriever.reload_if_changed() is True
+    assert len(snapshot.docs) == 3 and len(retriever.docs) == 1
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from semantic_cache import SemanticCache, load_vocabulary, question_attributes
+
+PARAMS = ("fr", True, False, "models/gemini-2.5-flash")
+
+
+def _cache_with(question, doc_ids=("emirates_general",)):
+    cache = SemanticCache()
+    cache.set_kb_version("v1")
+    cache.add(question, *PARAMS, list(doc_ids), {"answer": question})
+    return cache
+
+
+def test_paraphrase_reuses_answer():
+    cache = _cache_with("Quel est l'âge minimum pour Emirates ?")
+    hit = cache.lookup("age minimum emirates hotesse", *PARAMS, ["emirates_general"])
+    assert hit is not None
+    assert hit["value"] == {"answer": "Quel est l'âge minimum pour Emirates ?"}
+    assert hit["similarity"] >= cache.threshold
+
+
+@pytest.mark.parametrize("cached, asked, doc_id", [
+    ("Emirates min age", "Emirates max age", "emirates_general"),
+    ("Quel est l'âge minimum pour Emirates ?", "âge maximum Emirates", "emirates_general"),
+    ("Qatar weight requirement", "Qatar height requirement", "qatar_general"),
+    ("Qatar minimum age", "Qatar minimum height", "qatar_general"),
+    ("taille requise Qatar Airways", "allonge requise Qatar Airways", "qatar_general"),
+    ("ANA niveau de japonais requis", "ANA niveau d'anglais requis", "ana_general"),
+])
+def test_near_miss_on_same_document_is_rejected(cached, asked, doc_id):
+    cache = _cache_with(cached, [doc_id])
+    assert cache.lookup(asked, *PARAMS, [doc_id]) is None
+    assert cache.stats()["hits"] == 0
+
+
+def test_near_miss_is_rejected_by_attributes_not_by_similarity():
+    # 0.76 similarity and the same top document: only the attributes differ
+    cache = _cache_with("Emirates min age")
+    cache.lookup("Emirates max age", *PARAMS, ["emirates_general"])
+    assert cache.counters["rejected_attributes"] == 1
+
+
+def test_question_attributes():
+    assert question_attributes("âge limite Emirates") == {"age", "max"}
+    assert question_attributes("how old do you need to be for emirates cabin crew") == {"age"}
+    assert question_attributes("il faut mesurer combien pour Qatar ?") == {"height"}
+    assert question_attributes("Qatar Airways BMI requirement") == {"weight"}
+
+
+def test_other_airline_or_parameters_are_rejected():
+    cache = _cache_with("taille minimum Emirates")
+    assert cache.lookup("taille minimum Qatar", *PARAMS, ["qatar_general"]) is None
+    assert cache.lookup("taille minimum Emirates", "en", True, False, PARAMS[3], ["emirates_general"]) is None
+    assert cache.lookup("taille minimum Emirates", *PARAMS, ["emirates_general"]) is not None
+
+
+def test_default_requires_the_whole_retrieved_context():
+    context = ["emirates_general", "qatar_general", "ana_general"]
+    cache = _cache_with("taille minimum Emirates", context)
+    assert cache.match_docs == 3
+    assert cache.lookup("taille minimum Emirates", *PARAMS, context[:2] + ["cathay_general"]) is None
+    assert cache.counters["rejected_docs"] == 1
+    assert cache.lookup("taille minimum Emirates", *PARAMS, context) is not None
+
+
+def test_load_vocabulary(tmp_path):
+    path = tmp_path / "semantic_vocabulary.json"
+    path.write_text(json.dumps({"domain_stopwords": ["pnc"], "attributes": {"age": ["age", "old"]}}),
+                    encoding="utf-8")
+    assert load_vocabulary(str(path)) == ({"pnc"}, {"age": {"age", "old"}})
+
+
+def test_knowledge_base_change_clears_entries():
+    cache = _cache_with("taille minimum Emirates")
+    cache.set_kb_version("v2")
+    assert cache.lookup("taille minimum Emirates", *PARAMS, ["emirates_general"]) is None
+    assert cache.stats()["entries"] == 0
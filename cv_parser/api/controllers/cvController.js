@@ -22,16 +22,19 @@ async function analyzeCV(req, res) {
     }
 
     const inputPath = req.file.path; // ex: /app/input/filename.pdf
+    // Upload candidat = voie interactive ; les retraitements en masse passent priority=bulk
+    const priority = req.body && req.body.priority === 'bulk' ? 'bulk' : 'interactive';
 
     const resp = await fetch(`${PY_SERVICE_URL}/analyze`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ input_path: inputPath, output_dir: OUTPUT_DIR, quiet: true })
+      body: JSON.stringify({ input_path: inputPath, output_dir: OUTPUT_DIR, quiet: true, priority })
     });
 
     const data = await resp.json();
     if (!data.ok) {
-      return res.status(500).json({ ok: false, error: 'Analyse échouée côté service Python', details: data });
+      const status = resp.status === 429 ? 429 : 500;
+      return res.status(status).json({ ok: false, error: 'Analyse échouée côté service Python', details: data });
     }
 
     const outputFile = data.output_file || null;
@@ -23,16 +23,25 @@ const storage = multer.diskStorage({
   }
 });
 
-// Filtrage des fichiers (seulement PDF et images)
+// Filtrage des fichiers (PDF, images et CV texte lus sans OCR)
+const textTypes = {
+  '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+  '.odt': 'application/vnd.oasis.opendocument.text',
+  '.html': 'text/html',
+  '.htm': 'text/html',
+  '.txt': 'text/plain'
+};
+
 const fileFilter = (req, file, cb) => {
   const allowedTypes = /pdf|jpeg|jpg|png/;
-  const extname = allowedTypes.test(path.extname(file.originalname).toLowerCase());
+  const ext = path.extname(file.originalname).toLowerCase();
+  const extname = allowedTypes.test(ext);
   const mimetype = allowedTypes.test(file.mimetype);
 
-  if (mimetype && extname) {
+  if ((mimetype && extname) || (textTypes[ext] && textTypes[ext] === file.mimetype)) {
     return cb(null, true);
   } else {
-    cb(new Error('Seuls les fichiers PDF, JPEG, JPG et PNG sont acceptés'));
+    cb(new Error('Seuls les fichiers PDF, JPEG, JPG, PNG, DOCX, ODT, HTML et TXT sont acceptés'));
   }
 };
 
@@ -0,0 +1,117 @@
+"""
+Identification de la langue : anciennes heuristiques par mots-clés vs trigrammes
+(src/language_id.py) sur le jeu d'évaluation benchmarks/data/language_id/eval.tsv
+(questions du chatbot et lignes de CV, fr/en/ar) : précision et temps par appel,
+sur les phrases courtes et sur un CV complet
+
+Usage:
+    python benchmarks/bench_language_id.py --repeat 200
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.language_id import _word_scores, identify_language  # noqa: E402
+from src.text_processor import BilingualTextProcessor  # noqa: E402
+
+
+EVAL_PATH = os.path.join(ROOT, 'benchmarks', 'data', 'language_id', 'eval.tsv')
+
+
+# Anciennes implémentations (avant language_id), pour comparaison
+def legacy_chatbot(text: str) -> str:
+    t = text.lower()
+    fr_indicators = ['quoi', 'quelle', 'quelles', 'quel', 'comment', 'pourquoi', 'bonjour', 'salut', 'est-ce', 'à', 'â', 'é', 'è', 'ê', 'ù']
+    en_indicators = ['what', 'which', 'how', 'why', 'hello', 'hi', 'the', 'is', 'are']
+    fr_score = sum(1 for w in fr_indicators if w in t)
+    en_score = sum(1 for w in en_indicators if w in t)
+    return 'fr' if fr_score >= en_score else 'en'
+
+
+def legacy_ocr_engine(text: str) -> str:
+    fr_keywords = ['profil', 'expérience', 'formation', 'compétences',
+                   'langues', 'centres d\'intérêt', 'chez', 'rue', 'boulevard']
+    en_keywords = ['profile', 'experience', 'education', 'skills',
+                   'languages', 'interests', 'at', 'street', 'avenue']
+    t = text.lower()
+    fr_score = sum(1 for k in fr_keywords if k in t)
+    en_score = sum(1 for k in en_keywords if k in t)
+    return 'fr' if fr_score >= en_score else 'en'
+
+
+def legacy_text_processor(keywords):
+    def detect(text: str) -> str:
+        t = text.lower()
+        counts = {}
+        for lang in ('fr', 'en'):
+            counts[lang] = sum(len(re.findall(r'\b' + re.escape(k) + r'\b', t))
+                               for section in keywords.values() for k in section[lang])
+        if counts['fr'] > counts['en'] * 1.2:
+            return 'fr'
+        if counts['en'] > counts['fr'] * 1.2:
+            return 'en'
+        return 'mixed'
+    return detect
+
+
+def timed_us(fn, texts, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - start) * 1e6 / (repeat * len(texts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Identification de la langue : mots-clés vs trigrammes")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(EVAL_PATH, encoding='utf-8') as f:
+        samples = [line.rstrip('\n').split('\t', 1) for line in f if line.strip()]
+    texts = [text for _, text in samples]
+    by_lang = {}
+    for lang, text in samples:
+        by_lang.setdefault(lang, []).append(text)
+    documents = ['\n'.join(lines * 6) for lines in by_lang.values()]
+
+    def new(text):
+        return identify_language(text)['language']
+
+    def new_cold(text):
+        _word_scores.cache_clear()
+        return identify_language(text)['language']
+
+    candidates = [
+        ('chatbot (mots-clés)', legacy_chatbot),
+        ('OCR engine (mots-clés)', legacy_ocr_engine),
+        ('text processor (regex)', legacy_text_processor(BilingualTextProcessor().section_keywords)),
+        ('trigrammes (cache froid)', new_cold),
+        ('trigrammes', new),
+    ]
+
+    print(f"{len(samples)} phrases ({', '.join(f'{k}={len(v)}' for k, v in by_lang.items())}), "
+          f"{len(documents)} documents de ~{sum(map(len, documents)) // len(documents)} caractères")
+    print(f"{'':<28}{'précision':>10}{'fr/en':>8}{'us/phrase':>11}{'us/document':>13}")
+    for label, fn in candidates:
+        correct = sum(fn(text) == lang for lang, text in samples)
+        latin = [(lang, text) for lang, text in samples if lang != 'ar']
+        correct_latin = sum(fn(text) == lang for lang, text in latin)
+        print(f"{label:<28}{correct / len(samples):>10.1%}{correct_latin / len(latin):>8.1%}"
+              f"{timed_us(fn, texts, args.repeat):>11.1f}"
+              f"{timed_us(fn, documents, max(1, args.repeat // 10)):>13.1f}")
+
+    print("\nErreurs restantes (trigrammes):")
+    for lang, text in samples:
+        result = identify_language(text)
+        if result['language'] != lang:
+            print(f"  {lang} -> {result['language']} ({result['confidence']:.2f}) {text}")
+
+
+if __name__ == '__main__':
+    main()
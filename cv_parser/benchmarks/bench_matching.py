@@ -0,0 +1,80 @@
+"""
+Benchmark du matching vectorisé candidats ↔ offres
+
+Usage:
+    python benchmarks/bench_matching.py --candidates 100000 --jobs 50
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.job_matcher import CandidateJobMatcher
+
+
+SKILLS = [
+    "Service à bord", "Sécurité des passagers", "Communication", "Hospitalité",
+    "Gestion de stress", "Multilingue", "Gestion des urgences", "Présentation soignée",
+    "Travail en équipe", "Empathie", "Ponctualité", "Orientation client",
+    "Python", "Sql", "Excel", "Agile",
+]
+LANGUES = ["Français", "Anglais", "Arabe", "Espagnol", "Allemand", "Italien"]
+DIPLOMES = ["Baccalauréat", "BTS Tourisme", "Licence Langues", "Master Management", "Certification CCA"]
+POSTES = ["Hôtesse de l'air", "Steward", "Agent d'escale", "Responsable accueil", "Assistant commercial"]
+
+
+def synthetic_cv(rng: random.Random) -> dict:
+    return {
+        'competences': rng.sample(SKILLS, rng.randint(2, 8)),
+        'langues': [{'langue': l, 'niveau': 'Courant'} for l in rng.sample(LANGUES, rng.randint(1, 3))],
+        'formations': [{'diplome': d} for d in rng.sample(DIPLOMES, rng.randint(1, 2))],
+        'experiences': [{'poste': p} for p in rng.sample(POSTES, rng.randint(0, 3))],
+    }
+
+
+def synthetic_job(rng: random.Random) -> dict:
+    return {
+        'skills': rng.sample(SKILLS, rng.randint(3, 6)),
+        'languages': rng.sample(LANGUES, rng.randint(1, 2)),
+        'education': rng.sample(DIPLOMES, 1),
+        'experience': rng.sample(POSTES, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du matching vectorisé")
+    parser.add_argument("--candidates", type=int, default=100000)
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    cvs = [synthetic_cv(rng) for _ in range(args.candidates)]
+    jobs = [synthetic_job(rng) for _ in range(args.jobs)]
+
+    matcher = CandidateJobMatcher()
+    start = time.perf_counter()
+    matcher.fit_candidates(cvs)
+    encode_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher.top_k(jobs[0], k=args.top_k)
+    single_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher.top_k(jobs, k=args.top_k)
+    batch_s = time.perf_counter() - start
+
+    print(f"Candidats: {args.candidates}  Features: {len(matcher.vocabulary)}  "
+          f"nnz: {matcher.candidate_matrix.nnz}")
+    print(f"Encodage           : {encode_s * 1000:.0f} ms")
+    print(f"1 offre, top-{args.top_k}     : {single_s * 1000:.1f} ms")
+    print(f"{args.jobs} offres, top-{args.top_k}   : {batch_s * 1000:.1f} ms "
+          f"({batch_s * 1000 / args.jobs:.2f} ms/offre)")
+
+
+if __name__ == "__main__":
+    main()
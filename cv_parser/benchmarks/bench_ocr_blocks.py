@@ -0,0 +1,79 @@
+"""
+Comparaison liste de dictionnaires / OCRBlocks sur des pages denses synthétiques :
+taille et temps de sérialisation (pickle, comme entre processus), filtrage
+par confiance et assemblage du texte (clean_ocr_text)
+
+Usage:
+    python benchmarks/bench_ocr_blocks.py --blocks 2000 --pages 50
+"""
+import argparse
+import os
+import pickle
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ocr_blocks import OCRBlocks  # noqa: E402
+from src.text_processor import BilingualTextProcessor  # noqa: E402
+
+
+WORDS = ['Chef', 'de', 'cabine', 'Royal', 'Air', 'Maroc', 'sécurité', 'passagers', 'anglais', '2019']
+
+
+def synthetic_page(blocks: int, rng: random.Random) -> list:
+    raw = []
+    for _ in range(blocks):
+        x, y = rng.randint(0, 2400), rng.randint(0, 3400)
+        w, h = rng.randint(30, 400), rng.randint(18, 30)
+        text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+        raw.append(([[x, y], [x + w, y], [x + w, y + h], [x, y + h]], text, rng.random()))
+    return raw
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coût des blocs OCR : dictionnaires vs OCRBlocks")
+    parser.add_argument("--blocks", type=int, default=2000, help="blocs par page")
+    parser.add_argument("--pages", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    processor = BilingualTextProcessor()
+    raws = [synthetic_page(args.blocks, rng) for _ in range(args.pages)]
+    as_dicts = [[{'bbox': b, 'text': t, 'confidence': round(c, 3), 'word_count': len(t.split())}
+                 for b, t, c in raw] for raw in raws]
+    as_blocks = [OCRBlocks.from_easyocr(raw) for raw in raws]
+
+    rows = [
+        ('pickle (Ko/page)',
+         sum(len(pickle.dumps(d)) for d in as_dicts) / 1024 / args.pages,
+         sum(len(pickle.dumps(b)) for b in as_blocks) / 1024 / args.pages),
+        ('pickle aller-retour (ms)',
+         timed(lambda: [pickle.loads(pickle.dumps(d)) for d in as_dicts], 3),
+         timed(lambda: [pickle.loads(pickle.dumps(b)) for b in as_blocks], 3)),
+        ('filtre confiance >= 0.6 (ms)',
+         timed(lambda: [[r for r in d if r['confidence'] >= 0.6] for d in as_dicts], 3),
+         timed(lambda: [b.filter(b.confidences >= np.float32(0.6)) for b in as_blocks], 3)),
+        ('clean_ocr_text (ms)',
+         timed(lambda: [processor.clean_ocr_text(d) for d in as_dicts], 3),
+         timed(lambda: [processor.clean_ocr_text(b) for b in as_blocks], 3)),
+    ]
+
+    print(f"{args.pages} pages x {args.blocks} blocs")
+    print(f"{'':<30}{'dicts':>12}{'OCRBlocks':>12}{'gain':>8}")
+    for label, legacy, columnar in rows:
+        print(f"{label:<30}{legacy:>12.1f}{columnar:>12.1f}{legacy / columnar:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
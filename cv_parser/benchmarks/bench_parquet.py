@@ -0,0 +1,116 @@
+"""
+Agrégats sur le corpus : JSON un par un vs jeu de données Parquet
+
+Génère des CV synthétiques, mesure la lecture des *_analyzed.json un par un
+(sur un échantillon, extrapolée au corpus) puis l'écriture Parquet et les
+trois requêtes d'analyse (compétences, langues, expériences).
+
+Usage:
+    python benchmarks/bench_parquet.py --rows 1000000 --json-sample 2000
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.json_exporter import BilingualJSONExporter  # noqa: E402
+from src.parquet_exporter import (CVParquetExporter, experience_distribution,  # noqa: E402
+                                  language_mix, read_cv_dataset, skill_frequencies)
+
+
+SKILLS = ['Sécurité et sauvetage', 'Premiers secours', 'Service client', 'Gestion du stress',
+          'Travail en équipe', 'Communication', 'Service à bord', 'Vente à bord', 'Leadership',
+          'Ponctualité', 'Gestion des conflits', 'Sens de l\'accueil']
+LANGUAGES = ['Français', 'Anglais', 'Arabe', 'Espagnol', 'Allemand', 'Italien']
+COMPANIES = ['Royal Air Maroc', 'Air Arabia', 'Emirates', 'Qatar Airways', 'Air France', 'Transavia']
+
+
+def synthetic_cv(rng: random.Random, index: int) -> dict:
+    return {
+        'nom_complet': f"Candidat {index}",
+        'intitule_poste': rng.choice(['Hôtesse de l\'air', 'Steward', 'Chef de cabine']),
+        'contact': {'telephone': '', 'email': f"candidat{index}@example.com", 'adresse': ''},
+        'profil': 'Personnel navigant commercial.',
+        'experiences': [{'poste': 'PNC', 'entreprise': rng.choice(COMPANIES),
+                         'periode': f"{2010 + i} - {2012 + i}", 'details': ['Service à bord']}
+                        for i in range(rng.randint(0, 5))],
+        'formations': [{'diplome': 'CCA'}],
+        'competences': rng.sample(SKILLS, rng.randint(2, 6)),
+        'langues': [{'langue': l, 'niveau': 'Courant'} for l in rng.sample(LANGUAGES, rng.randint(1, 3))],
+        'centres_interet': ['Voyages'],
+    }
+
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<40}{elapsed:>9.2f} s")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Requêtes d'analyse : JSON vs Parquet")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="CV dans le jeu Parquet")
+    parser.add_argument("--json-sample", type=int, default=2000, help="fichiers JSON mesurés")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_dir = os.path.join(tmp, 'json')
+        exporter = BilingualJSONExporter(json_dir)
+        for i in range(args.json_sample):
+            cv = synthetic_cv(rng, i)
+            cv['metadata'] = {'detected_language': rng.choice(['fr', 'en'])}
+            exporter.export_cv_data(cv, f"cv_{i}_analyzed.json")
+
+        print(f"JSON un par un ({args.json_sample} fichiers, extrapolé à {args.rows})")
+
+        def json_queries():
+            skills, langs, exps = Counter(), Counter(), Counter()
+            for path in glob.glob(os.path.join(json_dir, '*_analyzed.json')):
+                with open(path, encoding='utf-8') as f:
+                    cv = json.load(f)['cv_data']
+                skills.update(s.lower() for s in cv['competences'])
+                langs.update(l['langue'] for l in cv['langues'])
+                exps[len(cv['experiences'])] += 1
+            return skills
+
+        _, json_time = timed("3 agrégats", json_queries)
+        print(f"  {'estimation pour le corpus':<40}{json_time * args.rows / args.json_sample:>9.1f} s")
+
+        dataset_dir = os.path.join(tmp, 'parquet')
+        parquet = CVParquetExporter(dataset_dir)
+        print(f"\nParquet ({args.rows} CV)")
+        timed("reprise incrémentale des JSON", lambda: parquet.export_json_dir(json_dir))
+        template = parquet.to_row({'metadata': {'detected_language': 'fr'}, 'cv_data': synthetic_cv(rng, 0)})
+
+        def write_rows():
+            for i in range(args.json_sample, args.rows):
+                row = dict(template, cv_id=f"synthetic-{i}", **{
+                    key: value for key, value in parquet.to_row(synthetic_cv(rng, i)).items()
+                    if key in ('experiences', 'competences', 'langues')
+                })
+                row['detected_language'] = 'fr' if i % 3 else 'en'
+                parquet.append_rows([row])
+            parquet.flush()
+
+        timed("écriture (conversion incluse)", write_rows)
+        table, _ = timed("lecture colonnes (dernières versions)", lambda: read_cv_dataset(
+            dataset_dir, columns=['competences', 'langues', 'experiences']))
+        timed("fréquence des compétences", lambda: skill_frequencies(table, top=10))
+        timed("répartition des langues", lambda: language_mix(table))
+        timed("distribution des expériences", lambda: experience_distribution(table))
+        print(f"  {table.num_rows} CV, {parquet.files_written} fichier(s) Parquet")
+        print(f"  top compétences: {skill_frequencies(table, top=3)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Comparaison du débit : boucle série (moteur OCR chaud) vs pipeline par étapes
+
+Usage:
+    python benchmarks/bench_pipeline.py ./input --ocr-workers 1
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description="Débit série vs pipeline")
+    parser.add_argument("input_dir")
+    parser.add_argument("--ocr-workers", type=int, default=1)
+    args = parser.parse_args()
+
+    files = sorted(
+        f for ext in ('pdf', 'png', 'jpg', 'jpeg')
+        for f in glob.glob(os.path.join(args.input_dir, f'*.{ext}'))
+    )
+    if not files:
+        print("Aucun fichier à traiter")
+        sys.exit(1)
+    main.setup_logging(os.path.join(tempfile.gettempdir(), 'bench_pipeline.log'))
+
+    from src.ocr_engine import MultilingualOCREngine
+
+    # Série : même moteur chaud pour tous les documents (chargement exclu)
+    engine = MultilingualOCREngine().warm_up()
+    with tempfile.TemporaryDirectory() as out:
+        start = time.perf_counter()
+        for path in files:
+            main.analyze_cv(path, out, verbose=False, ocr_engine=engine)
+        serial = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as out:
+        from src.pipeline import StagedPipeline
+        pipeline = StagedPipeline(ocr_workers=args.ocr_workers)
+        stats = pipeline.run(files, lambda item: None)
+
+    print(f"\nDocuments              : {len(files)}")
+    print(f"Série                  : {serial:.2f}s ({len(files) * 60 / serial:.1f} CV/min)")
+    print(f"Pipeline               : {stats['wall_s']:.2f}s ({stats['throughput_per_minute']:.1f} CV/min, "
+          f"chargement des modèles inclus)")
+    print(f"Gain                   : x{serial / stats['wall_s']:.2f}")
+    for stage, stage_stats in stats['stages'].items():
+        print(f"  {stage:<14} {stage_stats['workers']} worker(s)  utilisation {stage_stats['utilization']:.0%}")
+
+
+if __name__ == "__main__":
+    main_bench()
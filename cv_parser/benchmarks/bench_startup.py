@@ -0,0 +1,51 @@
+"""
+Mesure du temps de démarrage de la CLI (objectif: main.py --help < 200 ms)
+
+Usage:
+    python benchmarks/bench_startup.py --runs 10 --target-ms 200
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDS = {
+    'main.py --help': [sys.executable, 'main.py', '--help'],
+    'main.py (sans argument)': [sys.executable, 'main.py'],
+    'import main': [sys.executable, '-c', 'import main'],
+}
+
+
+def measure(cmd, runs: int) -> list:
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps de démarrage de la CLI cv_parser")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--target-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    failed = False
+    for label, cmd in COMMANDS.items():
+        durations = measure(cmd, args.runs)
+        median = statistics.median(durations)
+        status = "OK" if median <= args.target_ms else "TROP LENT"
+        failed |= median > args.target_ms
+        print(f"{label:<26} médiane {median:6.1f} ms  max {max(durations):6.1f} ms  [{status}]")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Débit de l'extraction directe des CV texte (DOCX, ODT, HTML, TXT), sans OCR
+
+Les documents sont générés synthétiquement (zip + XML de la bibliothèque
+standard) dans un répertoire temporaire puis chargés par CVTextLoader.
+
+Usage:
+    python benchmarks/bench_text_loaders.py --docs 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.text_loaders import CVTextLoader  # noqa: E402
+
+
+SECTIONS = [
+    ('PROFIL', ["Hôtesse de l'air trilingue, 6 ans d'expérience en long-courrier."]),
+    ('EXPÉRIENCE PROFESSIONNELLE', [
+        "2019 - 2024 Chef de cabine, Royal Air Maroc, Casablanca",
+        "2017 - 2019 Hôtesse de l'air, Air Arabia, Sharjah",
+    ]),
+    ('FORMATION', ["2016 CCA - Certificat de membre d'équipage de cabine", "2015 Licence en tourisme"]),
+    ('COMPÉTENCES', ["Sécurité et sauvetage", "Premiers secours", "Service client premium"]),
+    ('LANGUES', ["Français - courant", "Anglais - courant", "Arabe - langue maternelle"]),
+]
+
+W = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+
+def _docx(path, name):
+    body = [f'<w:p><w:pPr><w:pStyle w:val="Title"/></w:pPr><w:r><w:t>{escape(name)}</w:t></w:r></w:p>']
+    for title, items in SECTIONS:
+        body.append(f'<w:p><w:pPr><w:pStyle w:val="Heading1"/></w:pPr><w:r><w:t>{escape(title)}</w:t></w:r></w:p>')
+        for item in items:
+            body.append('<w:p><w:pPr><w:numPr><w:ilvl w:val="0"/></w:numPr></w:pPr>'
+                        f'<w:r><w:t>{escape(item)}</w:t></w:r></w:p>')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('word/document.xml',
+                         f'<w:document xmlns:w="{W}"><w:body>{"".join(body)}</w:body></w:document>')
+
+
+def _odt(path, name):
+    body = [f'<text:h text:outline-level="1">{escape(name)}</text:h>']
+    for title, items in SECTIONS:
+        body.append(f'<text:h text:outline-level="2">{escape(title)}</text:h><text:list>')
+        body.extend(f'<text:list-item><text:p>{escape(item)}</text:p></text:list-item>' for item in items)
+        body.append('</text:list>')
+    content = ('<office:document-content '
+               'xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+               'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0">'
+               f'<office:body><office:text>{"".join(body)}</office:text></office:body>'
+               '</office:document-content>')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('content.xml', content)
+
+
+def _html(path, name):
+    body = [f'<h1>{escape(name)}</h1>']
+    for title, items in SECTIONS:
+        body.append(f'<h2>{escape(title)}</h2><ul>')
+        body.extend(f'<li>{escape(item)}</li>' for item in items)
+        body.append('</ul>')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f'<html><head><style>h2{{color:navy}}</style></head><body>{"".join(body)}</body></html>')
+
+
+def _txt(path, name):
+    lines = [name, '']
+    for title, items in SECTIONS:
+        lines.extend([title] + items + [''])
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+
+
+WRITERS = {'docx': _docx, 'odt': _odt, 'html': _html, 'txt': _txt}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit des chargeurs texte (sans OCR)")
+    parser.add_argument("--docs", type=int, default=200, help="documents par format")
+    args = parser.parse_args()
+
+    loader = CVTextLoader()
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'format':<8}{'docs':>6}{'total (s)':>12}{'ms/doc':>10}{'docs/s':>10}")
+        for fmt, writer in WRITERS.items():
+            paths = []
+            for i in range(args.docs):
+                path = os.path.join(tmp, f"cv_{i}.{fmt}")
+                writer(path, f"Candidate Numero {i}")
+                paths.append(path)
+
+            start = time.perf_counter()
+            for path in paths:
+                result = loader.load_text(path)
+            elapsed = time.perf_counter() - start
+            # Le texte brut n'a pas de titres balisés : seule la mise en page est conservée
+            expected = 0 if fmt == 'txt' else len(SECTIONS) + 1
+            assert len(result['headings']) == expected, result['headings']
+            print(f"{fmt:<8}{args.docs:>6}{elapsed:>12.3f}{elapsed * 1000 / args.docs:>10.2f}"
+                  f"{args.docs / elapsed:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Régénère la table de trigrammes de src/language_id.py à partir des textes
+d'entraînement benchmarks/data/language_id/train_<langue>.txt, puis recopie
+le module dans chatbot-api/language_id.py
+
+Usage:
+    python benchmarks/build_language_profiles.py --size 300
+"""
+import argparse
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src import language_id  # noqa: E402
+
+
+DATA_DIR = os.path.join(ROOT, 'benchmarks', 'data', 'language_id')
+MODULE_PATH = os.path.join(ROOT, 'src', 'language_id.py')
+# Copie embarquée par l'image chatbot-api (service construit séparément)
+CHATBOT_COPY_PATH = os.path.join(ROOT, '..', 'chatbot-api', 'language_id.py')
+BLOCK_RE = re.compile(r"(# >>> table générée[^\n]*\n).*?(\n# <<< fin de la table générée)", re.S)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Table de trigrammes de language_id")
+    parser.add_argument("--size", type=int, default=300, help="trigrammes conservés par langue")
+    args = parser.parse_args()
+
+    texts = {}
+    for lang in language_id.LANGUAGES:
+        with open(os.path.join(DATA_DIR, f"train_{lang}.txt"), encoding='utf-8') as f:
+            texts[lang] = f.read().splitlines()
+    profiles = language_id.build_profiles(texts, size=args.size)
+
+    with open(MODULE_PATH, encoding='utf-8') as f:
+        source = f.read()
+    table = language_id.format_profiles(profiles, args.size)
+    source, replaced = BLOCK_RE.subn(lambda m: m.group(1) + table + m.group(2), source)
+    if not replaced:
+        sys.exit(f"Bloc de table introuvable dans {MODULE_PATH}")
+    for path in (MODULE_PATH, CHATBOT_COPY_PATH):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(source)
+
+    for lang, profile in profiles.items():
+        print(f"{lang}: {len(profile) // language_id.NGRAM} trigrammes")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,7 +6,8 @@ import argparse
 import sys
 import os
 import logging
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, List, TYPE_CHECKING
 
 # Fix pour l'encodage Windows
 if sys.platform == 'win32':
@@ -14,67 +15,171 @@ if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('cv_processor.log', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
-# Import des modules bilingues
-from src.document_loader import CVDocumentLoader
-from src.image_preprocessor import CVImagePreprocessor
-from src.ocr_engine import MultilingualOCREngine
-from src.text_processor import BilingualTextProcessor
-from src.cv_parser import BilingualCVParser
-from src.json_exporter import BilingualJSONExporter
-
-
-def analyze_cv(cv_file_path: str, output_dir: str = './output', verbose: bool = True) -> Dict[str, Any]:
+from src.resource_limits import ResourceLimits, ResourceLimitError, EXIT_RESOURCE_LIMIT
+
+# Les modules du pipeline (easyocr/torch, cv2, fitz, numpy) sont importés à la
+# première utilisation : --help, les erreurs d'arguments et les services qui
+# importent ce module ne paient pas leur coût de chargement.
+if TYPE_CHECKING:
+    from src.ocr_engine import MultilingualOCREngine
+    from src.page_dedup import PageDedupIndex
+
+
+def setup_logging(log_file: str = 'cv_processor.log'):
+    """Configuration du logging (fichier ouvert à la première écriture)"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file, encoding='utf-8', delay=True),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
+
+def warm_up() -> Dict[str, float]:
     """
-    Analyse un CV (PDF/image) et extrait les données structurées en français et anglais
+    Pré-charge les modules lourds et les modèles OCR (à appeler au démarrage
+    d'un service, hors du chemin critique). Retourne les durées en secondes.
     """
+    timings = {}
+    start = time.perf_counter()
+    from src.document_loader import CVDocumentLoader  # noqa: F401
+    from src.image_preprocessor import CVImagePreprocessor  # noqa: F401
+    from src.ocr_engine import MultilingualOCREngine
+    timings['imports'] = time.perf_counter() - start
+
+    from src import model_store
+    timings['model_verify'] = model_store.verify()['seconds']
+
+    start = time.perf_counter()
+    engine = MultilingualOCREngine()
+    engine.warm_up()
+    timings['model_load'] = time.perf_counter() - start
+    return timings
+
+
+def analyze_cv(cv_file_path: str, output_dir: str = './output', verbose: bool = True,
+               dedup_index: 'PageDedupIndex' = None,
+               ocr_engine: 'MultilingualOCREngine' = None,
+               coarse_to_fine: bool = False) -> Dict[str, Any]:
+    """
+    Analyse un CV (PDF/image, ou DOCX/ODT/HTML/TXT sans OCR) et extrait les données
+    structurées en français et anglais
+    Si dedup_index est fourni, un quasi-doublon déjà analysé réutilise l'OCR mémorisé
+    ocr_engine permet de réutiliser un moteur déjà chargé (workers chauds)
+    coarse_to_fine active l'OCR adaptatif (basse résolution + relecture ciblée)
+    """
+    from src.document_loader import CVDocumentLoader
+    from src.image_preprocessor import CVImagePreprocessor
+    from src.ocr_engine import MultilingualOCREngine
+    from src.text_processor import BilingualTextProcessor
+    from src.cv_parser import BilingualCVParser
+    from src.json_exporter import BilingualJSONExporter
+    from src import metrics
+
     logger = logging.getLogger('analyze_cv')
+    started = time.perf_counter()
+    doc_format = os.path.splitext(cv_file_path)[1].lower().lstrip('.') or 'inconnu'
     
     # Initialisation des composants bilingues
-    loader = CVDocumentLoader()
-    preprocessor = CVImagePreprocessor()
-    ocr_engine = MultilingualOCREngine()
+    limits = ResourceLimits.from_env()
+    loader = CVDocumentLoader(limits)
     text_processor = BilingualTextProcessor()
     cv_parser = BilingualCVParser()
     exporter = BilingualJSONExporter(output_dir)
     
     try:
-        # 1. Chargement du document
-        if verbose:
-            print("Chargement du document...")
-        logger.info(f"Chargement du document: {cv_file_path}")
-        document = loader.load_document(cv_file_path)
-        if not document:
-            logger.error("Le document est vide ou n'a pas pu être chargé")
-            raise RuntimeError("Le document est vide ou n'a pas pu être chargé.")
-        
-        if verbose:
-            print(f"   OK {len(document)} page(s) chargee(s)")
-        logger.info(f"Document chargé: {len(document)} page(s)")
-        
-        # 2. Prétraitement des images
-        if verbose:
-            print("Pretraitement des images...")
-        logger.info("Prétraitement des images en cours...")
-        processed_images: List = [preprocessor.preprocess_image(img) for img in document]
-        if verbose:
-            print(f"   OK {len(processed_images)} image(s) pretraitee(s)")
-        logger.info(f"Images prétraitées: {len(processed_images)}")
-        
-        # 3. Extraction OCR avec détection de langue
-        if verbose:
-            print("Extraction OCR et detection de langue...")
-        logger.info("Extraction OCR en cours...")
-        ocr_data = ocr_engine.extract_text_with_language(processed_images[0])
+        ocr_data = None
+        signature = None
+        text_document = loader.is_text_document(cv_file_path)
+        if text_document:
+            # CV né numérique : texte extrait directement, ni rendu ni OCR
+            if verbose:
+                print("Extraction directe du texte (sans OCR)...")
+            logger.info(f"Extraction directe du texte: {cv_file_path}")
+            document_text = loader.load_text(cv_file_path)
+            ocr_data = {
+                'ocr_results': [],
+                # Le lecteur EasyOCR n'est pas chargé (propriété paresseuse)
+                'language_info': (ocr_engine or MultilingualOCREngine()).detect_language(document_text['text']),
+                'full_text': document_text['text'],
+                'total_words': len(document_text['text'].split()),
+                'total_blocks': len(document_text['lines']),
+            }
+            metrics.inc('cv_ocr_fallback_total', kind='direct_text')
+
+        # 0. Recherche d'un quasi-doublon sur un rendu basse résolution
+        elif dedup_index is not None:
+            signature = dedup_index.signature(loader.load_preview(cv_file_path), cv_file_path)
+            ocr_data = dedup_index.lookup(signature)
+            if ocr_data is not None:
+                metrics.inc('cv_ocr_fallback_total', kind='dedup_hit')
+                dedup = ocr_data['dedup']
+                if verbose:
+                    print(f"Doublon detecte ({dedup['source']}, contenu {dedup['match']}): OCR reutilise")
+                logger.info(f"Doublon de {dedup['source']} (contenu {dedup['match']}, "
+                            f"écart {dedup['content_diff']}), OCR réutilisé")
+
+        if ocr_data is None:
+            preprocessor = CVImagePreprocessor()
+            if ocr_engine is None:
+                ocr_engine = MultilingualOCREngine()
+
+            if coarse_to_fine:
+                from src.adaptive_ocr import CoarseToFineOCR
+
+                # 1-3. OCR adaptatif : passe basse résolution puis relecture ciblée
+                if verbose:
+                    print("Extraction OCR adaptative (basse resolution + relecture ciblee)...")
+                logger.info("Extraction OCR adaptative en cours...")
+                ocr_data = CoarseToFineOCR(ocr_engine, loader, preprocessor).extract(cv_file_path)
+                reocr = ocr_data['reocr']
+                if verbose:
+                    print(f"   OK {reocr['regions']} zone(s) relue(s), "
+                          f"{reocr['reocr_fraction']:.1%} de la page")
+                logger.info(f"OCR adaptatif: {reocr}")
+            else:
+                # 1. Chargement du document
+                if verbose:
+                    print("Chargement du document...")
+                logger.info(f"Chargement du document: {cv_file_path}")
+                document = loader.load_document(cv_file_path)
+                if not document:
+                    logger.error("Le document est vide ou n'a pas pu être chargé")
+                    raise RuntimeError("Le document est vide ou n'a pas pu être chargé.")
+            
+                if verbose:
+                    print(f"   OK {len(document)} page(s) chargee(s)")
+                logger.info(f"Document chargé: {len(document)} page(s)")
+                load_info = loader.last_load_info
+                if load_info.get('degraded'):
+                    if verbose:
+                        print(f"   ATTENTION document degrade: {load_info}")
+                    logger.warning(f"Document dégradé pour respecter les limites: {load_info}")
+            
+                # 2. Prétraitement des images
+                if verbose:
+                    print("Pretraitement des images...")
+                logger.info("Prétraitement des images en cours...")
+                deadline = limits.stage('pretraitement')
+                processed_images: List = []
+                with metrics.timer('cv_stage_seconds', stage='preprocess'):
+                    for img in document:
+                        deadline.check()
+                        processed_images.append(preprocessor.preprocess_image(img))
+                if verbose:
+                    print(f"   OK {len(processed_images)} image(s) pretraitee(s)")
+                logger.info(f"Images prétraitées: {len(processed_images)}")
+            
+                # 3. Extraction OCR avec détection de langue
+                if verbose:
+                    print("Extraction OCR et detection de langue...")
+                logger.info("Extraction OCR en cours...")
+                ocr_data = ocr_engine.extract_text_with_language(processed_images[0])
+
+            if dedup_index is not None:
+                dedup_index.store(signature, ocr_data)
         
         # Affichage des informations de langue détectée
         lang_info = ocr_data['language_info']
@@ -93,8 +198,12 @@ def analyze_cv(cv_file_path: str, output_dir: str = './output', verbose: bool =
         if verbose:
             print("Nettoyage et structuration du texte...")
         logger.info("Nettoyage et structuration du texte...")
-        full_text = text_processor.clean_ocr_text(ocr_data['ocr_results'])
-        structured_data = text_processor.extract_structured_sections(full_text)
+        with metrics.timer('cv_stage_seconds', stage='structure'):
+            if text_document:
+                full_text = ocr_data['full_text']
+            else:
+                full_text = text_processor.clean_ocr_text(ocr_data['ocr_results'])
+            structured_data = text_processor.extract_structured_sections(full_text)
         
         if verbose:
             sections_found = structured_data.get('sections', {})
@@ -127,56 +236,256 @@ def analyze_cv(cv_file_path: str, output_dir: str = './output', verbose: bool =
         base_filename = os.path.splitext(os.path.basename(cv_file_path))[0]
         output_filename = f"{base_filename}_analyzed.json"
         
-        output_file = exporter.export_cv_data(cv_data, output_filename)
+        with metrics.timer('cv_stage_seconds', stage='export'):
+            output_file = exporter.export_cv_data(cv_data, output_filename)
         
         if verbose:
             print(f"OK Analyse terminee. Fichier exporte: {output_file}")
         
         logger.info(f"Export réussi: {output_file}")
+        metrics.observe('cv_document_seconds', time.perf_counter() - started, format=doc_format)
+        metrics.inc('cv_documents_total', format=doc_format, status='success')
         return cv_data
         
+    except ResourceLimitError as e:
+        metrics.inc('cv_documents_total', format=doc_format, status=e.code.lower())
+        logger.error(f"Limite de ressources dépassée pour {cv_file_path}: {e}")
+        if verbose:
+            print(f"ERREUR {e}")
+        raise
     except Exception as e:
+        metrics.inc('cv_documents_total', format=doc_format, status='error')
         logger.error(f"Erreur lors de l'analyse du CV {cv_file_path}: {str(e)}", exc_info=True)
         if verbose:
             print(f"ERREUR lors de l'analyse du CV: {str(e)}")
         raise RuntimeError(f"Erreur lors de l'analyse du CV: {str(e)}")
 
 
-def analyze_multiple_cvs(cv_files: List[str], output_dir: str = './output') -> Dict[str, Dict[str, Any]]:
+def analyze_multiple_cvs(cv_files: List[str], output_dir: str = './output',
+                         dedup_index: 'PageDedupIndex' = None,
+                         workers: int = 1) -> Dict[str, Dict[str, Any]]:
     """
-    Analyse plusieurs CV en lot
+    Analyse plusieurs CV en lot dans des workers recyclés : chaque document a
+    une durée maximale (CV_TASK_TIMEOUT) au-delà de laquelle son worker est
+    tué et remplacé, et les workers sont renouvelés après CV_WORKER_MAX_TASKS
+    documents ou CV_WORKER_MAX_RSS_MB de mémoire résidente
     """
+    from functools import partial
+    from src.worker_pool import RecyclingWorkerPool, WorkerTimeoutError
+
     logger = logging.getLogger('batch_analysis')
     results = {}
     total = len(cv_files)
     
-    logger.info(f"Début de l'analyse en lot de {total} fichiers")
-    
-    for idx, cv_file in enumerate(cv_files, 1):
+    logger.info(f"Début de l'analyse en lot de {total} fichiers ({workers} worker(s))")
+
+    # Chaque worker ouvre l'index de quasi-doublons sur le même répertoire
+    dedup_dir = dedup_index.index_dir if dedup_index is not None else None
+    pool = RecyclingWorkerPool.from_env(workers, initializer=partial(_worker_init, dedup_dir))
+    with pool:
+        futures = {cv_file: pool.submit(_worker_analyze, cv_file, output_dir) for cv_file in cv_files}
+        for idx, (cv_file, future) in enumerate(futures.items(), 1):
+            try:
+                outcome = future.result()
+                results[cv_file] = {
+                    'status': 'success',
+                    'data': outcome['data']
+                }
+                if dedup_index is not None:
+                    dedup_index.lookups += outcome['dedup_lookups']
+                    dedup_index.hits += outcome['dedup_hits']
+                    dedup_index.rejected += outcome['dedup_rejected']
+                print(f"OK {idx}/{total} {os.path.basename(cv_file)}: "
+                      f"{outcome['data'].get('nom_complet') or 'nom non detecte'}")
+                
+            except Exception as e:
+                logger.error(f"Erreur avec le fichier {cv_file}: {str(e)}")
+                print(f"ERREUR {idx}/{total} {os.path.basename(cv_file)}: {e}")
+                results[cv_file] = {
+                    'status': 'error',
+                    'error': str(e)
+                }
+                if isinstance(e, ResourceLimitError):
+                    results[cv_file]['code'] = e.code
+                elif isinstance(e, WorkerTimeoutError):
+                    results[cv_file]['code'] = 'TIMEOUT'
+
+    pool_stats = pool.stats()
+    logger.info(f"Analyse en lot terminée - Réussis: {sum(1 for r in results.values() if r.get('status') == 'success')}/{total}")
+    logger.info(f"Workers: { {k: v for k, v in pool_stats.items() if k != 'rss_history'} }")
+    print(f"\n Workers: {pool_stats['workers_started']} démarré(s), "
+          f"{pool_stats['recycled_max_tasks'] + pool_stats['recycled_rss']} recyclé(s), "
+          f"{pool_stats['timeouts']} fichier(s) hors délai, {pool_stats['crashes']} arrêt(s) brutal(aux)")
+    history = pool_stats['rss_history']
+    if history:
+        step = max(1, len(history) // 10)
+        print(" RSS des workers (t, pid, Mo, documents): " + ", ".join(
+            f"{h['t']}s/{h['pid']}/{h['rss_mb']:.0f}/{h['documents']}" for h in history[::step]))
+        print(f" RSS max: {pool_stats['rss_max_mb']:.0f} Mo")
+    if dedup_index is not None:
+        logger.info(f"Déduplication OCR: {dedup_index.stats()}")
+    return results
+
+
+def analyze_multiple_cvs_pipelined(cv_files: List[str], output_dir: str = './output',
+                                   ocr_workers: int = 1) -> Dict[str, Dict[str, Any]]:
+    """
+    Analyse en lot en pipeline : rendu, prétraitement et OCR dans des pools
+    séparés reliés par des files bornées (pages en mémoire partagée)
+    """
+    from src.pipeline import StagedPipeline
+    from src.text_processor import BilingualTextProcessor
+    from src.cv_parser import BilingualCVParser
+    from src.json_exporter import BilingualJSONExporter
+
+    logger = logging.getLogger('batch_analysis')
+    text_processor = BilingualTextProcessor()
+    cv_parser = BilingualCVParser()
+    exporter = BilingualJSONExporter(output_dir)
+    results = {}
+
+    def on_result(item):
+        cv_file = item['path']
+        if 'error' in item:
+            logger.error(f"Erreur avec le fichier {cv_file}: {item['error']}")
+            print(f"ERREUR Erreur avec {cv_file}: {item['error']}")
+            results[cv_file] = {'status': 'error', 'error': item['error']}
+            return
         try:
-            print(f"\n{'='*60}")
-            print(f"Fichier {idx}/{total}: {os.path.basename(cv_file)}")
-            print(f"{'='*60}")
-            
-            logger.info(f"Traitement du fichier {idx}/{total}: {cv_file}")
-            result = analyze_cv(cv_file, output_dir, verbose=True)
-            results[cv_file] = {
-                'status': 'success',
-                'data': result
-            }
-            
+            # 4-6. Nettoyage, analyse sémantique et export (processus principal)
+            full_text = text_processor.clean_ocr_text(item['ocr_data']['ocr_results'])
+            structured_data = text_processor.extract_structured_sections(full_text)
+            cv_data = cv_parser.parse_bilingual_cv(structured_data)
+            base_filename = os.path.splitext(os.path.basename(cv_file))[0]
+            exporter.export_cv_data(cv_data, f"{base_filename}_analyzed.json")
+            results[cv_file] = {'status': 'success', 'data': cv_data}
+            print(f"OK {os.path.basename(cv_file)}: {cv_data.get('nom_complet') or 'nom non detecte'}")
         except Exception as e:
             logger.error(f"Erreur avec le fichier {cv_file}: {str(e)}", exc_info=True)
-            print(f"ERREUR Erreur avec {cv_file}: {e}")
-            results[cv_file] = {
-                'status': 'error',
-                'error': str(e)
-            }
-    
-    logger.info(f"Analyse en lot terminée - Réussis: {sum(1 for r in results.values() if r.get('status') == 'success')}/{total}")
+            results[cv_file] = {'status': 'error', 'error': str(e)}
+
+    # Les CV texte (DOCX, ODT, HTML, TXT) n'ont ni rendu ni OCR : hors pipeline
+    text_extensions = ('.docx', '.odt', '.html', '.htm', '.txt')
+    text_files = [f for f in cv_files if f.lower().endswith(text_extensions)]
+    for cv_file in text_files:
+        try:
+            results[cv_file] = {'status': 'success',
+                                'data': analyze_cv(cv_file, output_dir, verbose=False)}
+        except Exception as e:
+            logger.error(f"Erreur avec le fichier {cv_file}: {str(e)}")
+            results[cv_file] = {'status': 'error', 'error': str(e)}
+
+    logger.info(f"Début de l'analyse en pipeline de {len(cv_files)} fichiers")
+    pipeline = StagedPipeline(ocr_workers=ocr_workers)
+    stats = pipeline.run([f for f in cv_files if f not in text_files], on_result)
+
+    print(f"\n Débit: {stats['throughput_per_minute']} CV/min en {stats['wall_s']}s")
+    for stage, stage_stats in stats['stages'].items():
+        print(f"   {stage:<14} {stage_stats['workers']} worker(s)  utilisation {stage_stats['utilization']:.0%}")
     return results
 
 
+# Moteur OCR (et index de quasi-doublons) propres à chaque worker, chargés une seule fois
+_worker_ocr_engine = None
+_worker_dedup_index = None
+
+
+def _worker_init(dedup_dir: str = None):
+    """
+    Initialisation d'un worker (lot, ingestion, service) : chargement des modèles OCR.
+    Un échec du préchargement (poids absents...) n'empêche pas le worker de
+    démarrer : les CV texte n'utilisent pas l'OCR, et le moteur est rechargé
+    (et l'erreur remontée) au premier document image ou PDF scanné.
+    """
+    from src.ocr_engine import MultilingualOCREngine
+
+    global _worker_ocr_engine, _worker_dedup_index
+    _worker_ocr_engine = MultilingualOCREngine()
+    try:
+        _worker_ocr_engine.warm_up()
+    except Exception as e:
+        logging.getLogger('batch_analysis').warning(
+            f"Préchargement OCR impossible dans le worker {os.getpid()}: {e}")
+    if dedup_dir:
+        from src.page_dedup import PageDedupIndex
+        _worker_dedup_index = PageDedupIndex(dedup_dir)
+
+
+def _worker_analyze(cv_file: str, output_dir: str, verbose: bool = False,
+                    capture_output: bool = False) -> Dict[str, Any]:
+    """
+    Analyse d'un fichier dans un worker du pool
+    capture_output ajoute au résultat les affichages ('stdout', journaux compris)
+    et la sortie d'erreur ('stderr') produits pendant l'analyse
+    """
+    if capture_output:
+        return _capture_output(_worker_analyze, cv_file, output_dir, verbose)
+    index = _worker_dedup_index
+    before = (index.lookups, index.hits, index.rejected) if index is not None else (0, 0, 0)
+    cv_data = analyze_cv(cv_file, output_dir, verbose=verbose, ocr_engine=_worker_ocr_engine,
+                         dedup_index=_worker_dedup_index)
+    base_filename = os.path.splitext(os.path.basename(cv_file))[0]
+    return {
+        'output_file': os.path.join(output_dir, f"{base_filename}_analyzed.json"),
+        'data': cv_data,
+        'dedup_lookups': index.lookups - before[0] if index is not None else 0,
+        'dedup_hits': index.hits - before[1] if index is not None else 0,
+        'dedup_rejected': index.rejected - before[2] if index is not None else 0,
+    }
+
+
+def _capture_output(fn, *args) -> Dict[str, Any]:
+    """Exécute fn en capturant stdout / stderr et les journaux (format de setup_logging)"""
+    import io
+    from contextlib import redirect_stderr, redirect_stdout
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    handler = logging.StreamHandler(stdout)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    root = logging.getLogger()
+    previous_level = root.level
+    root.addHandler(handler)
+    if previous_level > logging.INFO:
+        root.setLevel(logging.INFO)
+    try:
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            result = fn(*args)
+    finally:
+        root.removeHandler(handler)
+        root.setLevel(previous_level)
+    result.update(stdout=stdout.getvalue(), stderr=stderr.getvalue())
+    return result
+
+
+def watch_directory(input_dir: str, output_dir: str, workers: int = 2,
+                    settle_seconds: float = 2.0, poll_interval: float = 1.0):
+    """
+    Mode ingestion continue : surveille input_dir jusqu'à SIGTERM / Ctrl+C
+    """
+    import signal
+    from src.ingestion import IngestionDaemon
+
+    daemon = IngestionDaemon(
+        input_dir, output_dir,
+        process_fn=_worker_analyze,
+        initializer=_worker_init,
+        workers=workers,
+        settle_seconds=settle_seconds,
+        poll_interval=poll_interval,
+    )
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+    print(f" Surveillance du répertoire: {input_dir} ({workers} worker(s)) - Ctrl+C pour arrêter")
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        daemon.stop()
+    stats = daemon.stats()
+    print(f" Traités: {stats['files_processed']}  Échecs: {stats['files_failed']}  "
+          f"Hors délai: {stats['files_timed_out']}  Doublons: {stats['duplicates_skipped']}  "
+          f"Débit: {stats['throughput_per_minute']}/min  RSS max: {stats['workers'].get('rss_max_mb', 0):.0f} Mo")
+    return stats
+
+
 def display_detailed_summary(cv_data: Dict[str, Any]):
     """
     Affiche un résumé détaillé des données extraites
@@ -262,24 +571,47 @@ Exemples d'utilisation:
   %(prog)s cv_hotesse.pdf -s                 # Avec résumé détaillé
   %(prog)s cv_hotesse.pdf -o ./exports       # Dossier de sortie personnalisé
   %(prog)s ./cvs -b                          # Analyse en lot d'un dossier
+  %(prog)s ./cvs -b --pipeline --workers 1   # Lot en pipeline (rendu/prétraitement/OCR)
+  %(prog)s ./cvs -b --parquet-dir ./parquet  # Lot + export Parquet pour l'analytique
+  %(prog)s ./input -w --workers 2            # Ingestion continue d'un dossier surveillé
   %(prog)s cv.pdf -l                         # Afficher seulement la langue détectée
         """
     )
     
     parser.add_argument("input", nargs='?', default=None, 
-                       help="Chemin du fichier CV (PDF, JPG, PNG) ou répertoire pour analyse en lot")
+                       help="Chemin du fichier CV (PDF, JPG, PNG, DOCX, ODT, HTML, TXT) ou répertoire pour analyse en lot")
     parser.add_argument("--output-dir", "-o", default="./output", 
                        help="Répertoire de sortie pour les fichiers JSON (défaut: ./output)")
     parser.add_argument("--batch", "-b", action="store_true",
                        help="Traiter tous les CV d'un répertoire en lot")
+    parser.add_argument("--pipeline", action="store_true",
+                       help="Avec --batch: rendu, prétraitement et OCR en pipeline parallèle (sans --dedup ni --coarse-to-fine)")
+    parser.add_argument("--watch", "-w", action="store_true",
+                       help="Surveiller un répertoire et traiter les nouveaux CV en continu")
+    parser.add_argument("--workers", type=int, default=None,
+                       help="Nombre de workers: lot -b (défaut: 1), mode --watch ou workers OCR avec --pipeline (défaut: 2)")
+    parser.add_argument("--settle-seconds", type=float, default=2.0,
+                       help="Délai sans modification avant de traiter un fichier (défaut: 2)")
     parser.add_argument("--summary", "-s", action="store_true",
                        help="Afficher un résumé détaillé après l'analyse")
     parser.add_argument("--language-info", "-l", action="store_true",
                        help="Afficher uniquement les informations de langue détectée")
     parser.add_argument("--quiet", "-q", action="store_true",
                        help="Mode silencieux (affichage minimal)")
+    parser.add_argument("--coarse-to-fine", action="store_true",
+                       help="OCR adaptatif: passe basse résolution puis relecture haute résolution des zones douteuses")
+    parser.add_argument("--dedup", action="store_true",
+                       help="Réutiliser l'OCR d'un CV déjà analysé (même fichier ou même page réexportée)")
+    parser.add_argument("--parquet-dir", default=None,
+                       help="Avec -b: ajoute les CV analysés au jeu de données Parquet partitionné (incrémental)")
+    parser.add_argument("--dedup-dir", default="./cache/ocr_dedup",
+                       help="Avec --dedup: répertoire de l'index des doublons (défaut: ./cache/ocr_dedup)")
     
     args = parser.parse_args()
+    if args.pipeline and (args.dedup or args.coarse_to_fine):
+        # Les étapes du pipeline (rendu / prétraitement / OCR) n'ont ni index de doublons ni OCR adaptatif
+        parser.error("--pipeline ne prend pas en charge --dedup ni --coarse-to-fine (utiliser -b sans --pipeline)")
+    setup_logging()
 
     if args.input is None:
         parser.print_help()
@@ -292,36 +624,60 @@ Exemples d'utilisation:
     
     try:
         logger.info(f"Démarrage de l'analyse avec args: {args}")
+        if not args.dedup or args.watch or args.language_info:
+            dedup_index = None
+        else:
+            from src.page_dedup import PageDedupIndex
+            dedup_index = PageDedupIndex(args.dedup_dir)
         
         # Mode analyse de langue uniquement
         if args.language_info:
             print(" Analyse linguistique du document...\n")
+            from src.document_loader import CVDocumentLoader
+            from src.image_preprocessor import CVImagePreprocessor
+            from src.ocr_engine import MultilingualOCREngine
             
             loader = CVDocumentLoader()
             preprocessor = CVImagePreprocessor()
             ocr_engine = MultilingualOCREngine()
             
             if os.path.isfile(args.input):
-                document = loader.load_document(args.input)
-                processed_images = [preprocessor.preprocess_image(img) for img in document]
-                ocr_data = ocr_engine.extract_text_with_language(processed_images[0])
+                if loader.is_text_document(args.input):
+                    text = loader.load_text(args.input)['text']
+                    ocr_data = {'language_info': ocr_engine.detect_language(text),
+                                'total_blocks': 0, 'total_words': len(text.split())}
+                else:
+                    document = loader.load_document(args.input)
+                    processed_images = [preprocessor.preprocess_image(img) for img in document]
+                    ocr_data = ocr_engine.extract_text_with_language(processed_images[0])
                 lang_info = ocr_data['language_info']
                 
                 print(f" Fichier: {os.path.basename(args.input)}")
-                print(f" Langue principale: {lang_info['primary'].upper()}")
+                print(f" Langue principale: {lang_info['primary'].upper()} (confiance {lang_info['confidence']:.2%})")
                 print(f"FR Score français: {lang_info['french']:.2%}")
                 print(f"EN Score anglais: {lang_info['english']:.2%}")
+                print(f"AR Score arabe: {lang_info['arabic']:.2%}")
                 print(f" Blocs de texte: {ocr_data['total_blocks']}")
                 print(f" Mots totaux: {ocr_data['total_words']}")
             else:
                 print("ERREUR L'option --language-info nécessite un fichier, pas un répertoire.")
             return
         
+        # Mode ingestion continue
+        if args.watch:
+            if not os.path.isdir(args.input):
+                print("ERREUR L'option --watch nécessite un répertoire.")
+                sys.exit(1)
+            watch_directory(args.input, args.output_dir, workers=args.workers or 2,
+                            settle_seconds=args.settle_seconds)
+            return
+
         # Mode traitement par lot
         if args.batch and os.path.isdir(args.input):
             print(f" Analyse en lot du répertoire: {args.input}\n")
             
-            supported_extensions = ['.pdf', '.jpg', '.jpeg', '.png', '.tiff', '.tif']
+            supported_extensions = ['.pdf', '.jpg', '.jpeg', '.png', '.tiff', '.tif',
+                                    '.docx', '.odt', '.html', '.htm', '.txt']
             cv_files = []
             
             for ext in supported_extensions:
@@ -335,7 +691,11 @@ Exemples d'utilisation:
                 return
             
             print(f"✓ {len(cv_files)} fichier(s) CV trouvé(s)")
-            results = analyze_multiple_cvs(cv_files, args.output_dir)
+            if args.pipeline:
+                results = analyze_multiple_cvs_pipelined(cv_files, args.output_dir, ocr_workers=args.workers or 2)
+            else:
+                results = analyze_multiple_cvs(cv_files, args.output_dir, dedup_index=dedup_index,
+                                               workers=args.workers or 1)
             
             successful = sum(1 for r in results.values() if r.get('status') == 'success')
             failed = len(results) - successful
@@ -347,11 +707,20 @@ Exemples d'utilisation:
             if failed > 0:
                 print(f"ERREUR Analyses échouées: {failed}/{len(cv_files)}")
             print(f" Fichiers exportés dans: {args.output_dir}")
+            if dedup_index is not None:
+                print(f" Doublons (OCR réutilisé): {dedup_index.hits}/{dedup_index.lookups} "
+                      f"({dedup_index.hit_rate:.1%}), {dedup_index.rejected} même modèle au contenu différent")
+            if args.parquet_dir:
+                from src.parquet_exporter import CVParquetExporter
+                export_stats = CVParquetExporter(args.parquet_dir).export_json_dir(args.output_dir)
+                print(f" Parquet: {export_stats['exported']} CV ajouté(s) à {args.parquet_dir} "
+                      f"({export_stats['skipped']} inchangé(s))")
             
         # Mode fichier unique
         elif os.path.isfile(args.input):
             verbose = not args.quiet
-            structured_data = analyze_cv(args.input, args.output_dir, verbose=verbose)
+            structured_data = analyze_cv(args.input, args.output_dir, verbose=verbose, dedup_index=dedup_index,
+                                         coarse_to_fine=args.coarse_to_fine)
             
             if args.summary:
                 display_detailed_summary(structured_data)
@@ -375,6 +744,10 @@ Exemples d'utilisation:
             print(f"ERREUR Erreur: '{args.input}' n'est ni un fichier ni un répertoire valide.")
             sys.exit(1)
             
+    except ResourceLimitError as e:
+        print(f"\nERREUR Limite de ressources: {e}")
+        logger.error(f"Limite de ressources: {e}")
+        sys.exit(EXIT_RESOURCE_LIMIT)
     except KeyboardInterrupt:
         print("\n\nATTENTION  Analyse interrompue par l'utilisateur.")
         logger.info("Analyse interrompue par l'utilisateur")
@@ -1,23 +1,111 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 from typing import Optional
+import asyncio
+import multiprocessing
 import os
-import subprocess
 import pathlib
 
+from main import _worker_init, _worker_analyze
+from src import metrics, model_store
+from src.resource_limits import ResourceLimitError
+from src.scheduler import PriorityScheduler, QueueFullError
+from src.worker_pool import RecyclingWorkerPool, WorkerTimeoutError, WorkerCrashedError
+
 app = FastAPI()
 
+# Voies de priorité : "interactive" (upload candidat) passe devant "bulk"
+scheduler = PriorityScheduler.from_env()
+
+# Durée maximale d'une analyse (le worker est tué et remplacé au-delà)
+ANALYZE_TIMEOUT = float(os.getenv("CV_ANALYZE_TIMEOUT", "300"))
+
+# Workers chauds (modèles chargés au démarrage, hors du chemin des requêtes),
+# recyclés après CV_WORKER_MAX_TASKS documents ou CV_WORKER_MAX_RSS_MB.
+# "spawn" : pas de fork d'un processus uvicorn multi-thread
+pool = RecyclingWorkerPool.from_env(
+    scheduler.workers, initializer=_worker_init,
+    task_timeout=ANALYZE_TIMEOUT, mp_context=multiprocessing.get_context("spawn"),
+)
+
 class AnalyzeRequest(BaseModel):
     input_path: str
     output_dir: Optional[str] = "/app/output"
     quiet: Optional[bool] = True
+    priority: Optional[str] = "interactive"
+
+@app.on_event("startup")
+def start_workers():
+    # Poids vérifiés une fois avant de lancer les workers : un magasin incomplet
+    # fait échouer le démarrage au lieu de la première requête
+    model_store.verify()
+    pool.start()
+
+@app.on_event("shutdown")
+def stop_workers():
+    pool.shutdown(wait=False)
+
+def _readiness() -> dict:
+    stats = pool.stats()
+    ready = sum(1 for w in stats["workers"] if w["ready"])
+    # "failing" : l'initialisation échoue de façon répétée, relance avec délai (voir "startup")
+    status = "ready" if ready else "failing" if stats["startup"]["failing"] else "loading"
+    return {"ready": ready > 0, "status": status, "workers_ready": ready, "startup": stats["startup"]}
 
 @app.get("/health")
 def health():
-    return {"ok": True, "service": "cv-python", "status": "ready"}
+    # Vivant dès que le processus répond ; prêt quand un worker a chargé ses modèles
+    return {"ok": True, "service": "cv-python", "alive": True, **_readiness(), "workers": scheduler.workers}
+
+@app.get("/ready")
+def readiness():
+    state = _readiness()
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=state)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    # Compteurs des workers (cumulés, y compris ceux déjà recyclés) + métriques du service
+    registry = metrics.MetricsRegistry.combined(pool.metrics_snapshots() + [metrics.snapshot()])
+
+    for lane, lane_stats in scheduler.stats()["lanes"].items():
+        registry.set_gauge("cv_queue_depth", lane_stats["queued"], lane=lane)
+        registry.set_gauge("cv_queue_running", lane_stats["running"], lane=lane)
+
+    pool_stats = pool.stats()
+    registry.set_gauge("cv_workers_ready", sum(1 for w in pool_stats["workers"] if w["ready"]))
+    for worker in pool_stats["workers"]:
+        registry.set_gauge("cv_worker_rss_bytes", worker["rss_mb"] * 1024 * 1024, pid=worker["pid"])
+    for event in ("timeouts", "crashes", "recycled_max_tasks", "recycled_rss"):
+        registry.inc("cv_worker_events_total", pool_stats[event], event=event)
+
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/scheduler")
+def scheduler_stats():
+    return scheduler.stats()
+
+@app.get("/workers")
+def worker_stats():
+    return pool.stats()
 
 @app.post("/analyze")
-def analyze(req: AnalyzeRequest):
+async def analyze(req: AnalyzeRequest):
+    priority = req.priority or "interactive"
+    if priority not in scheduler.lane_names:
+        return JSONResponse(status_code=400, content={
+            "ok": False, "error": f"unknown priority: {priority}", "priorities": scheduler.lane_names
+        })
+    try:
+        async with scheduler.slot(priority):
+            # L'attente du worker ne consomme pas de thread
+            return await _run_analysis(req)
+    except QueueFullError as e:
+        return JSONResponse(status_code=429, content={
+            "ok": False, "error": str(e), "code": "QUEUE_FULL", "priority": priority
+        })
+
+async def _run_analysis(req: AnalyzeRequest):
     input_path = req.input_path
     output_dir = req.output_dir or "/app/output"
 
@@ -29,27 +117,41 @@ def analyze(req: AnalyzeRequest):
     base = pathlib.Path(input_path).stem
     output_file = os.path.join(output_dir, f"{base}_analyzed.json")
 
-    cmd = [
-        "python", "main.py", input_path,
-        "--output-dir", output_dir,
-    ]
-    if req.quiet:
-        cmd.append("--quiet")
-
     try:
-        completed = subprocess.run(cmd, cwd="/app", capture_output=True, text=True, check=True)
+        # quiet=False : affichages détaillés de l'analyse dans "stdout", comme main.py sans --quiet
+        outcome = await asyncio.wrap_future(pool.submit(
+            _worker_analyze, input_path, output_dir, not req.quiet, True))
         return {
             "ok": True,
             "message": "analysis complete",
-            "stdout": completed.stdout[-2000:],
-            "stderr": completed.stderr[-2000:],
+            "stdout": outcome["stdout"][-2000:],
+            "stderr": outcome["stderr"][-2000:],
             "output_file": output_file
         }
-    except subprocess.CalledProcessError as e:
+    except WorkerTimeoutError as e:
+        return {
+            "ok": False,
+            "error": f"analysis timed out after {ANALYZE_TIMEOUT:.0f}s",
+            "code": "STAGE_TIMEOUT",
+            "worker_pid": e.pid
+        }
+    except ResourceLimitError as e:
+        return {
+            "ok": False,
+            "error": e.message,
+            "code": e.code
+        }
+    except WorkerCrashedError as e:
+        return {
+            "ok": False,
+            "error": str(e),
+            "code": "WORKER_CRASHED"
+        }
+    except Exception as e:
         return {
             "ok": False,
-            "error": "subprocess failed",
-            "returncode": e.returncode,
-            "stdout": e.stdout[-2000:] if e.stdout else "",
-            "stderr": e.stderr[-2000:] if e.stderr else ""
+            "error": "analysis failed",
+            "details": str(e),
+            "stdout": "",
+            "stderr": ""
         }
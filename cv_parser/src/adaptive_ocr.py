@@ -0,0 +1,126 @@
+"""
+Module d'OCR adaptatif « grossier → fin »
+Une première passe rapide à basse résolution, puis seules les zones à
+faible confiance ou non reconnues mais contenant de l'encre sont
+re-rendues à haute résolution (PDF) ou suréchantillonnées (images) et
+ré-analysées. Les boîtes finales sont exprimées dans le repère de la
+page à la résolution de référence (300 DPI), comme la passe classique.
+"""
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from . import metrics
+from .ocr_blocks import OCRBlocks
+
+
+class CoarseToFineOCR:
+    def __init__(self, ocr_engine, loader, preprocessor, coarse_scale: float = 0.5,
+                 fine_scale: float = 1.0, min_ink_pixels: int = 40,
+                 max_reocr_fraction: float = 0.6, max_regions: int = 40):
+        """
+        coarse_scale       : échelle de la première passe (0.5 → 150 DPI)
+        fine_scale         : échelle de la seconde passe (1.0 → 300 DPI)
+        min_ink_pixels     : encre minimale (pixels, passe grossière) d'une zone à relire
+        max_reocr_fraction : au-delà de cette fraction de page, on relit la page entière
+        max_regions        : nombre maximal de zones relues individuellement
+        """
+        self.ocr_engine = ocr_engine
+        self.loader = loader
+        self.preprocessor = preprocessor
+        self.coarse_scale = coarse_scale
+        self.fine_scale = fine_scale
+        self.min_ink_pixels = min_ink_pixels
+        self.max_reocr_fraction = max_reocr_fraction
+        self.max_regions = max_regions
+
+    # ==============================================================
+    # PIPELINE
+    # ==============================================================
+    def extract(self, file_path: str, page_num: int = 0) -> Dict:
+        """
+        Retourne le même format que MultilingualOCREngine.extract_text_with_language,
+        avec une clé 'reocr' décrivant la part de page relue
+        """
+        min_conf = self.ocr_engine.min_confidence
+
+        coarse = self.preprocessor.preprocess_image(
+            self.loader.render_page(file_path, page_num, scale=self.coarse_scale)
+        )
+        height, width = coarse.shape[:2]
+        # Passe grossière : lignes avec leur vraie confiance, sans filtrage
+        blocks = self.ocr_engine.extract_text(coarse, paragraph=False, min_confidence=0.0)
+
+        accepted = blocks.filter((blocks.confidences >= np.float32(min_conf)) & (blocks.lengths > 0))
+        low_confidence = len(blocks) - len(accepted)
+        regions = self._regions_to_reocr(coarse, accepted)
+        region_area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in regions)
+        fraction = region_area / float(width * height) if width and height else 0.0
+
+        to_base = 1.0 / self.coarse_scale
+        parts = [accepted.transformed(to_base)]
+
+        if fraction > self.max_reocr_fraction or len(regions) > self.max_regions:
+            # Trop de zones douteuses : une passe pleine page est moins chère
+            fine = self.preprocessor.preprocess_image(
+                self.loader.render_page(file_path, page_num, scale=self.fine_scale)
+            )
+            parts = [self.ocr_engine.extract_text(fine, paragraph=False).transformed(1.0 / self.fine_scale)]
+            regions, fraction = [(0, 0, width, height)], 1.0
+            metrics.inc('cv_ocr_fallback_total', kind='full_page')
+        else:
+            if regions:
+                metrics.inc('cv_ocr_fallback_total', kind='regions')
+            for x0, y0, x1, y1 in regions:
+                clip = (x0 / width, y0 / height, x1 / width, y1 / height)
+                crop = self.preprocessor.preprocess_image(
+                    self.loader.render_page(file_path, page_num, scale=self.fine_scale, clip=clip)
+                )
+                # Origine de la zone dans le repère de référence
+                origin_x, origin_y = x0 * to_base, y0 * to_base
+                found = self.ocr_engine.extract_text(crop, paragraph=False)
+                found = found.filter(found.lengths > 0)
+                parts.append(found.transformed(1.0 / self.fine_scale, origin_x, origin_y))
+
+        results = OCRBlocks.concatenate(parts)
+        ocr_data = self.ocr_engine.extract_text_with_language(None, results=results)
+        ocr_data['reocr'] = {
+            'coarse_blocks': len(blocks),
+            'low_confidence_blocks': low_confidence,
+            'regions': len(regions),
+            'reocr_fraction': round(fraction, 4),
+        }
+        return ocr_data
+
+    # ==============================================================
+    # SÉLECTION DES ZONES
+    # ==============================================================
+    def _regions_to_reocr(self, binary: np.ndarray, accepted: OCRBlocks) -> List[Tuple[int, int, int, int]]:
+        """
+        Zones d'encre non couvertes par un bloc accepté (blocs à faible
+        confiance et texte manqué par la détection), regroupées par dilatation
+        """
+        if binary.ndim == 3:
+            binary = cv2.cvtColor(binary, cv2.COLOR_BGR2GRAY)
+        ink = (binary < 128).astype(np.uint8)
+
+        covered = np.zeros_like(ink)
+        for x0, y0, x1, y1 in accepted.bounds().astype(np.int32).tolist():
+            cv2.rectangle(covered, (x0 - 2, y0 - 2), (x1 + 3, y1 + 3), 1, thickness=-1)
+        need = ink & (1 - covered)
+
+        # Regroupe les caractères d'une même ligne / d'un même mot
+        grouped = cv2.dilate(need, cv2.getStructuringElement(cv2.MORPH_RECT, (15, 5)))
+        contours, _ = cv2.findContours(grouped, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        height, width = ink.shape
+        regions = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            if int(need[y:y + h, x:x + w].sum()) < self.min_ink_pixels:
+                continue  # bruit, poussière, trait isolé
+            pad = 4
+            regions.append((max(0, x - pad), max(0, y - pad),
+                            min(width, x + w + pad), min(height, y + h + pad)))
+        return sorted(regions, key=lambda r: (r[1], r[0]))
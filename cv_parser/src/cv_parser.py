@@ -9,6 +9,8 @@ import re
 from typing import List, Dict
 from datetime import datetime
 
+from . import metrics
+
 
 class BilingualCVParser:
     """
@@ -86,7 +88,15 @@ class BilingualCVParser:
     # ==============================================================
     def parse_bilingual_cv(self, structured_data: Dict) -> Dict:
         """Analyse complète du CV bilingue."""
+        with metrics.timer('cv_stage_seconds', stage='parse'):
+            parsed_data = self._parse(structured_data)
+
+        for field, value in parsed_data.items():
+            if not value or (field == 'contact' and not any(value.values())):
+                metrics.inc('cv_parser_empty_fields_total', field=field)
+        return parsed_data
 
+    def _parse(self, structured_data: Dict) -> Dict:
         sections = structured_data.get('sections', {})
         language = structured_data.get('detected_language', 'fr')
         full_text = structured_data.get('full_text', '')
@@ -4,12 +4,33 @@ Module de chargement des documents CV standard
 import os
 import fitz  # PyMuPDF
 from PIL import Image
-import io
+
+from . import metrics
+from .resource_limits import ResourceLimits, ResourceLimitError
+from .text_loaders import CVTextLoader
 
 class CVDocumentLoader:
-    def __init__(self):
-        self.supported_formats = ['.pdf', '.jpg', '.jpeg', '.png', '.tiff', '.bmp']
+    def __init__(self, limits: ResourceLimits = None, dpi: int = 300):
+        self.limits = limits or ResourceLimits.from_env()
+        self.text_loader = CVTextLoader(self.limits)
+        self.image_formats = ['.pdf', '.jpg', '.jpeg', '.png', '.tiff', '.bmp']
+        self.supported_formats = self.image_formats + self.text_loader.supported_formats
+        self.dpi = dpi
+        # Informations sur le dernier chargement (pages ignorées, DPI réduit...)
+        self.last_load_info = {}
     
+    def is_text_document(self, file_path):
+        """Vrai pour les CV nés numériques (DOCX, ODT, HTML, TXT) : pas d'OCR"""
+        return os.path.splitext(file_path)[1].lower() in self.text_loader.supported_formats
+
+    def load_text(self, file_path):
+        """
+        Extrait directement le texte d'un CV DOCX/ODT/HTML/TXT
+        (voir CVTextLoader.load_text)
+        """
+        with metrics.timer('cv_stage_seconds', stage='text_extract'):
+            return self.text_loader.load_text(file_path)
+
     def load_document(self, file_path):
         """
         Charge un document CV et le convertit en images
@@ -19,45 +40,163 @@ class CVDocumentLoader:
             
         file_ext = os.path.splitext(file_path)[1].lower()
         
-        if file_ext == '.pdf':
-            return self._pdf_to_images(file_path)
-        elif file_ext in ['.jpg', '.jpeg', '.png', '.tiff', '.bmp']:
-            return self._load_image(file_path)
-        else:
+        if self.is_text_document(file_path):
+            raise ValueError(f"Format texte {file_ext}: utiliser load_text() (pas de rendu image)")
+        if file_ext not in self.image_formats:
             raise ValueError(f"Format non supporté: {file_ext}. Formats supportés: {self.supported_formats}")
+
+        with metrics.timer('cv_stage_seconds', stage='load'):
+            if file_ext == '.pdf':
+                images = self._pdf_to_images(file_path)
+            else:
+                images = self._load_image(file_path)
+        metrics.inc('cv_pages_total', len(images), format=file_ext.lstrip('.'))
+        return images
+
+    def load_preview(self, file_path, dpi=36):
+        """
+        Rendu basse résolution de la première page (empreinte perceptuelle,
+        sans payer le rendu 300 DPI complet)
+        """
+        file_ext = os.path.splitext(file_path)[1].lower()
+
+        if file_ext == '.pdf':
+            try:
+                pdf_document = fitz.open(file_path)
+                try:
+                    page = pdf_document[0]
+                    dpi = self.limits.render_dpi(page.rect.width, page.rect.height, dpi)
+                    pix = page.get_pixmap(matrix=fitz.Matrix(dpi/72, dpi/72))
+                    return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+                finally:
+                    pdf_document.close()
+            except ResourceLimitError:
+                raise
+            except Exception as e:
+                raise Exception(f"Erreur aperçu PDF: {str(e)}")
+
+        image = self._load_image(file_path)[0]
+        image.thumbnail((256, 256))
+        return image
     
+    def render_page(self, file_path, page_num=0, scale=1.0, clip=None):
+        """
+        Rendu d'une page (ou d'une zone) à l'échelle `scale` relative au DPI
+        de référence (scale=0.5 → 150 DPI pour une référence à 300 DPI).
+        clip = (x0, y0, x1, y1) en coordonnées normalisées [0, 1] de la page.
+        Les PDF sont re-rendus à la résolution demandée ; les images sont
+        recadrées puis redimensionnées (suréchantillonnées si scale > 1).
+        """
+        file_ext = os.path.splitext(file_path)[1].lower()
+
+        if file_ext == '.pdf':
+            try:
+                pdf_document = fitz.open(file_path)
+                try:
+                    page = pdf_document[page_num]
+                    rect = page.rect
+                    if clip is not None:
+                        x0, y0, x1, y1 = clip
+                        rect = fitz.Rect(rect.x0 + x0 * rect.width, rect.y0 + y0 * rect.height,
+                                         rect.x0 + x1 * rect.width, rect.y0 + y1 * rect.height)
+                    dpi = self.limits.render_dpi(rect.width, rect.height, self.dpi * scale)
+                    pix = page.get_pixmap(matrix=fitz.Matrix(dpi/72, dpi/72), clip=rect)
+                    return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+                finally:
+                    pdf_document.close()
+            except ResourceLimitError:
+                raise
+            except Exception as e:
+                raise Exception(f"Erreur rendu PDF: {str(e)}")
+
+        # Images : décodage unique, réutilisé pour les zones suivantes
+        cached_path, image = getattr(self, '_render_cache', (None, None))
+        if cached_path != file_path:
+            image = self._load_image(file_path)[0]
+            self._render_cache = (file_path, image)
+        if clip is not None:
+            width, height = image.size
+            x0, y0, x1, y1 = clip
+            image = image.crop((int(x0 * width), int(y0 * height),
+                                int(round(x1 * width)), int(round(y1 * height))))
+        if scale != 1.0:
+            size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+            image = image.resize(size, Image.BICUBIC if scale > 1 else Image.BILINEAR)
+        return image
+
     def _pdf_to_images(self, pdf_path):
         """
         Convertit un PDF en liste d'images en utilisant PyMuPDF (fitz)
+        Les limites (pages, pixels, octets décodés, durée) sont vérifiées
+        avant le rendu de chaque page
         """
+        limits = self.limits
+        deadline = limits.stage('chargement')
         try:
             # Ouvrir le document PDF
             pdf_document = fitz.open(pdf_path)
-            images = []
-            
-            # Convertir chaque page en image
-            for page_num in range(len(pdf_document)):
-                page = pdf_document[page_num]
-                # Rendre la page en image avec un zoom de 300 DPI (300/72 = 4.17)
-                mat = fitz.Matrix(300/72, 300/72)  # 300 DPI
-                pix = page.get_pixmap(matrix=mat)
-                
-                # Convertir en PIL Image
-                img_data = pix.tobytes("png")
-                image = Image.open(io.BytesIO(img_data))
-                images.append(image)
-            
-            pdf_document.close()
+            try:
+                total_pages = len(pdf_document)
+                page_count = limits.page_count(total_pages)
+                images = []
+                decoded_bytes = 0
+                dpis = []
+
+                # Convertir chaque page en image
+                for page_num in range(page_count):
+                    deadline.check()
+                    page = pdf_document[page_num]
+                    # 300 DPI par défaut (300/72 = 4.17), réduit si la page est trop grande
+                    dpi = limits.render_dpi(page.rect.width, page.rect.height, self.dpi)
+                    zoom = dpi / 72
+                    width = int(page.rect.width * zoom) + 1
+                    height = int(page.rect.height * zoom) + 1
+
+                    decoded_bytes += width * height * 3
+                    if decoded_bytes > limits.max_decoded_bytes and images and limits.degrade:
+                        break
+                    limits.check_decoded_bytes(decoded_bytes)
+
+                    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+                    images.append(Image.frombytes("RGB", (pix.width, pix.height), pix.samples))
+                    dpis.append(dpi)
+            finally:
+                pdf_document.close()
+
+            self.last_load_info = {
+                'pages_total': total_pages,
+                'pages_loaded': len(images),
+                'dpi': min(dpis) if dpis else self.dpi,
+                'degraded': len(images) < total_pages or any(d < self.dpi for d in dpis),
+            }
             return images
+        except ResourceLimitError:
+            raise
         except Exception as e:
             raise Exception(f"Erreur conversion PDF: {str(e)}")
     
     def _load_image(self, image_path):
         """
         Charge une image unique avec gestion des formats différents
+        La taille est contrôlée sur l'en-tête, avant décodage des pixels
         """
+        limits = self.limits
         try:
+            # Image.open ne lit que l'en-tête : aucun pixel n'est encore décodé
             image = Image.open(image_path)
+            width, height = image.size
+            degraded = False
+
+            if width * height > limits.max_page_pixels:
+                # JPEG : décodage direct à 1/2, 1/4 ou 1/8 de la résolution
+                if limits.degrade and image.format == 'JPEG':
+                    scale = 1
+                    while scale < 8 and (width // scale) * (height // scale) > limits.max_page_pixels:
+                        scale *= 2
+                    image.draft('RGB', (width // scale, height // scale))
+                    degraded = True
+                limits.check_image_size(*image.size)
+            limits.check_decoded_bytes(image.size[0] * image.size[1] * 4)
             
             # Conversion en RGB si nécessaire (pour PNG avec alpha)
             if image.mode in ('RGBA', 'LA', 'P'):
@@ -69,7 +208,15 @@ class CVDocumentLoader:
                 image = background
             elif image.mode != 'RGB':
                 image = image.convert('RGB')
-                
+
+            self.last_load_info = {
+                'pages_total': 1,
+                'pages_loaded': 1,
+                'size': list(image.size),
+                'degraded': degraded,
+            }
             return [image]
+        except ResourceLimitError:
+            raise
         except Exception as e:
-            raise Exception(f"Erreur chargement image {image_path}: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Erreur chargement image {image_path}: {str(e)}")
@@ -0,0 +1,338 @@
+"""
+Module d'ingestion continue d'un dossier surveillé
+Surveille le dossier d'entrée (inotify si disponible, sinon scrutation),
+attend que les fichiers soient complètement écrits, déduplique par contenu
+(SHA-256), alimente un pool de workers déjà chauds et tient un manifeste
+persistant pour reprendre sans retraitement après un redémarrage.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Optional
+
+try:
+    import inotify_simple
+except ImportError:  # dépendance optionnelle : repli sur la scrutation
+    inotify_simple = None
+
+from .worker_pool import RecyclingWorkerPool, WorkerTimeoutError
+
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.jpg', '.jpeg', '.png', '.tiff', '.tif', '.bmp',
+                        '.docx', '.odt', '.html', '.htm', '.txt')
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ==============================================================
+# SURVEILLANCE DU DOSSIER
+# ==============================================================
+class PollingWatcher:
+    """Détecte les fichiers nouveaux ou modifiés par comparaison de stat()"""
+
+    def __init__(self, directory: str, interval: float = 1.0):
+        self.directory = directory
+        self.interval = interval
+        self._snapshot: Dict[str, tuple] = {}
+
+    def poll(self, timeout: float) -> List[str]:
+        time.sleep(min(timeout, self.interval))
+        changed = []
+        snapshot = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+                snapshot[entry.path] = (st.st_size, st.st_mtime_ns)
+                if self._snapshot.get(entry.path) != snapshot[entry.path]:
+                    changed.append(entry.path)
+        self._snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Événements inotify (Linux) : création, fin d'écriture, déplacement"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._inotify = inotify_simple.INotify()
+        flags = inotify_simple.flags
+        self._inotify.add_watch(
+            directory, flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE | flags.MODIFY
+        )
+
+    def poll(self, timeout: float) -> List[str]:
+        events = self._inotify.read(timeout=int(timeout * 1000))
+        return sorted({os.path.join(self.directory, e.name) for e in events if e.name})
+
+    def close(self):
+        self._inotify.close()
+
+
+def create_watcher(directory: str, poll_interval: float = 1.0, use_inotify: bool = True):
+    if use_inotify and inotify_simple is not None:
+        try:
+            return InotifyWatcher(directory)
+        except OSError as e:
+            logging.getLogger('ingestion').warning(f"inotify indisponible ({e}), repli sur la scrutation")
+    return PollingWatcher(directory, poll_interval)
+
+
+# ==============================================================
+# MANIFESTE PERSISTANT
+# ==============================================================
+class IngestionManifest:
+    """
+    Manifeste JSON : état par contenu (sha256) et cache stat() par chemin
+    pour éviter de re-hacher les fichiers inchangés
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: Dict[str, Dict] = {}
+        self.paths: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.files = data.get('files', {})
+                self.paths = data.get('paths', {})
+            except (OSError, ValueError):
+                logging.getLogger('ingestion').warning(f"Manifeste illisible, réinitialisé: {path}")
+
+    def save(self, counters: Dict = None):
+        with self._lock:
+            data = {'version': 1, 'files': self.files, 'paths': self.paths}
+            if counters is not None:
+                data['counters'] = counters
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+
+    def pending(self) -> List[Dict]:
+        """Entrées soumises mais non terminées lors de l'exécution précédente"""
+        return [dict(entry, sha256=sha) for sha, entry in self.files.items()
+                if entry.get('status') in ('queued', 'processing')]
+
+
+# ==============================================================
+# DÉMON D'INGESTION
+# ==============================================================
+class IngestionDaemon:
+    def __init__(self, input_dir: str, output_dir: str, process_fn: Callable,
+                 workers: int = 2, initializer: Optional[Callable] = None,
+                 manifest_path: str = None, settle_seconds: float = 2.0,
+                 poll_interval: float = 1.0, stats_interval: float = 60.0,
+                 use_inotify: bool = True):
+        """
+        process_fn(path, output_dir) est exécutée dans un worker du pool ;
+        initializer() y est appelée une fois pour charger les modèles.
+        Les workers sont recyclés et les documents bornés dans le temps
+        (voir RecyclingWorkerPool.from_env).
+        """
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.process_fn = process_fn
+        self.workers = workers
+        self.initializer = initializer
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.stats_interval = stats_interval
+        self.use_inotify = use_inotify
+        self.manifest = IngestionManifest(
+            manifest_path or os.path.join(output_dir, '.ingest_manifest.json')
+        )
+        self.logger = logging.getLogger('ingestion')
+        self.stop_event = threading.Event()
+
+        # Fichiers vus mais pas encore stables : chemin -> (taille, mtime, stable_depuis, détecté_le)
+        self._settling: Dict[str, tuple] = {}
+        self._in_flight = {}
+        self.pool = None
+        self.started_at = time.time()
+        self.counters = {
+            'files_seen': 0,
+            'files_submitted': 0,
+            'files_processed': 0,
+            'files_failed': 0,
+            'files_timed_out': 0,
+            'duplicates_skipped': 0,
+            'lag_seconds_total': 0.0,
+            'lag_seconds_max': 0.0,
+            'lag_seconds_last': 0.0,
+        }
+
+    # --------------------------------------------------------------
+    def stats(self) -> Dict:
+        uptime = max(time.time() - self.started_at, 1e-6)
+        done = self.counters['files_processed'] + self.counters['files_failed']
+        workers = {}
+        if self.pool is not None:
+            workers = {k: v for k, v in self.pool.stats().items() if k != 'rss_history'}
+        return dict(
+            self.counters,
+            in_flight=len(self._in_flight),
+            settling=len(self._settling),
+            uptime_seconds=round(uptime, 1),
+            throughput_per_minute=round(done * 60 / uptime, 2),
+            lag_seconds_avg=round(self.counters['lag_seconds_total'] / done, 2) if done else 0.0,
+            workers=workers,
+        )
+
+    def stop(self):
+        self.stop_event.set()
+
+    # --------------------------------------------------------------
+    def _observe(self, path: str):
+        if not path.lower().endswith(SUPPORTED_EXTENSIONS) or os.path.basename(path).startswith('.'):
+            return
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self._settling.pop(path, None)
+            return
+
+        known = self.manifest.paths.get(path)
+        if known and known['size'] == st.st_size and known['mtime'] == st.st_mtime_ns:
+            return  # déjà traité, inchangé
+
+        previous = self._settling.get(path)
+        if previous is None:
+            self.counters['files_seen'] += 1
+        if previous is None or previous[:2] != (st.st_size, st.st_mtime_ns):
+            # Nouveau fichier ou encore en cours d'écriture : on relance l'attente
+            first_seen = previous[3] if previous else time.time()
+            self._settling[path] = (st.st_size, st.st_mtime_ns, time.monotonic(), first_seen)
+
+    def _stable_files(self) -> List[tuple]:
+        now = time.monotonic()
+        ready = []
+        for path, (size, mtime, since, first_seen) in list(self._settling.items()):
+            if now - since < self.settle_seconds:
+                continue
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                del self._settling[path]
+                continue
+            if (st.st_size, st.st_mtime_ns) != (size, mtime) or st.st_size == 0:
+                self._settling[path] = (st.st_size, st.st_mtime_ns, now, first_seen)
+                continue
+            del self._settling[path]
+            ready.append((path, size, mtime, first_seen))
+        return ready
+
+    def _submit(self, executor, path: str, size: int, mtime: int, first_seen: float, sha: str = None):
+        sha = sha or file_sha256(path)
+        self.manifest.paths[path] = {'size': size, 'mtime': mtime, 'sha256': sha}
+
+        entry = self.manifest.files.get(sha)
+        if sha in self._in_flight or (entry and entry.get('status') == 'done'):
+            self.counters['duplicates_skipped'] += 1
+            self.logger.info(f"Doublon ignoré: {path} (identique à {entry.get('path') if entry else path})")
+            return
+
+        self.manifest.files[sha] = {
+            'path': path,
+            'status': 'processing',
+            'detected_at': first_seen,
+            'submitted_at': time.time(),
+        }
+        future = executor.submit(self.process_fn, path, self.output_dir)
+        self._in_flight[sha] = future
+        self.counters['files_submitted'] += 1
+        self.manifest.save()
+
+    def _collect(self, done):
+        for sha, future in list(self._in_flight.items()):
+            if future not in done:
+                continue
+            del self._in_flight[sha]
+            entry = self.manifest.files[sha]
+            entry['finished_at'] = time.time()
+            lag = entry['finished_at'] - entry.get('detected_at', entry['submitted_at'])
+            try:
+                result = future.result()
+                entry['status'] = 'done'
+                if isinstance(result, dict) and result.get('output_file'):
+                    entry['output'] = result['output_file']
+                self.counters['files_processed'] += 1
+            except Exception as e:
+                entry['status'] = 'error'
+                entry['error'] = str(e)
+                self.counters['files_failed'] += 1
+                if isinstance(e, WorkerTimeoutError):
+                    entry['status'] = 'timeout'
+                    self.counters['files_timed_out'] += 1
+                self.logger.error(f"Échec ingestion {entry['path']}: {e}")
+            self.counters['lag_seconds_total'] += lag
+            self.counters['lag_seconds_max'] = max(self.counters['lag_seconds_max'], lag)
+            self.counters['lag_seconds_last'] = round(lag, 2)
+        self.manifest.save(self.stats())
+
+    # --------------------------------------------------------------
+    def run(self):
+        """Boucle principale ; s'arrête proprement après stop()"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        watcher = create_watcher(self.input_dir, self.poll_interval, self.use_inotify)
+        self.logger.info(f"Ingestion de {self.input_dir} ({type(watcher).__name__}, {self.workers} worker(s))")
+        last_stats = time.monotonic()
+
+        self.pool = RecyclingWorkerPool.from_env(self.workers, initializer=self.initializer)
+        with self.pool as executor:
+            # Reprise : fichiers soumis mais non terminés lors du dernier arrêt
+            for entry in self.manifest.pending():
+                path = entry['path']
+                if os.path.exists(path):
+                    st = os.stat(path)
+                    self._submit(executor, path, st.st_size, st.st_mtime_ns,
+                                 entry.get('detected_at', time.time()), sha=entry['sha256'])
+
+            # Balayage initial : fichiers arrivés pendant l'arrêt
+            for name in sorted(os.listdir(self.input_dir)):
+                self._observe(os.path.join(self.input_dir, name))
+
+            try:
+                while not self.stop_event.is_set():
+                    timeout = self.poll_interval if not self._settling else min(self.poll_interval, self.settle_seconds / 2)
+                    for path in watcher.poll(timeout):
+                        self._observe(path)
+
+                    for path, size, mtime, first_seen in self._stable_files():
+                        try:
+                            self._submit(executor, path, size, mtime, first_seen)
+                        except OSError as e:
+                            self.logger.warning(f"Lecture impossible de {path}: {e}")
+
+                    if self._in_flight:
+                        done, _ = wait(list(self._in_flight.values()), timeout=0, return_when=FIRST_COMPLETED)
+                        if done:
+                            self._collect(done)
+
+                    if time.monotonic() - last_stats >= self.stats_interval:
+                        self.logger.info(f"Compteurs ingestion: {self.stats()}")
+                        last_stats = time.monotonic()
+            finally:
+                # Arrêt : on termine les documents en cours avant de sauver
+                if self._in_flight:
+                    done, _ = wait(list(self._in_flight.values()))
+                    self._collect(done)
+                watcher.close()
+                self.manifest.save(self.stats())
+                self.logger.info(f"Ingestion arrêtée: {self.stats()}")
@@ -0,0 +1,258 @@
+"""
+Module de matching vectorisé candidats ↔ offres d'emploi
+Encode les champs produits par BilingualCVParser (compétences, langues,
+formations, expériences) dans une matrice creuse candidats × features
+et score tous les candidats contre une ou plusieurs offres en un seul
+produit matriciel.
+"""
+import re
+import unicodedata
+from typing import List, Dict, Iterable, Optional
+
+import numpy as np
+from scipy import sparse
+
+
+# Pondérations par bloc, alignées sur job-service/src/services/jobMatching.js
+# (le salaire n'existe pas dans les CV parsés, son poids est redistribué)
+DEFAULT_WEIGHTS = {
+    'skills': 0.4,
+    'experience': 0.25,
+    'education': 0.15,
+    'languages': 0.1,
+}
+
+
+def normalize_term(term: str) -> str:
+    """Normalise un terme : minuscules, sans accents, ponctuation réduite"""
+    if not term:
+        return ''
+    term = unicodedata.normalize('NFKD', str(term).lower())
+    term = ''.join(c for c in term if not unicodedata.combining(c))
+    term = re.sub(r'[^\w+#.]+', ' ', term)
+    return re.sub(r'\s+', ' ', term).strip(' .')
+
+
+class SkillVocabulary:
+    """
+    Vocabulaire normalisé des features (préfixées par bloc : skills:python,
+    languages:anglais...). Les synonymes sont ramenés à un terme canonique.
+    """
+
+    BLOCKS = ('skills', 'experience', 'education', 'languages')
+
+    def __init__(self, synonyms: Optional[Dict[str, str]] = None):
+        self.index: Dict[str, int] = {}
+        self.terms: List[str] = []
+        self.synonyms = {
+            'english': 'anglais', 'french': 'francais', 'arabic': 'arabe',
+            'spanish': 'espagnol', 'german': 'allemand', 'italian': 'italien',
+            'nodejs': 'node.js', 'node': 'node.js', 'js': 'javascript',
+            'customer service': 'orientation client',
+        }
+        if synonyms:
+            self.synonyms.update({normalize_term(k): normalize_term(v) for k, v in synonyms.items()})
+
+    def canonical(self, term: str) -> str:
+        norm = normalize_term(term)
+        return self.synonyms.get(norm, norm)
+
+    def feature(self, block: str, term: str, add: bool = True) -> Optional[int]:
+        """Retourne l'indice de la feature (bloc, terme), en l'ajoutant si besoin"""
+        term = self.canonical(term)
+        if not term:
+            return None
+        key = f"{block}:{term}"
+        idx = self.index.get(key)
+        if idx is None and add:
+            idx = len(self.terms)
+            self.index[key] = idx
+            self.terms.append(key)
+        return idx
+
+    def __len__(self):
+        return len(self.terms)
+
+
+class CandidateJobMatcher:
+    """
+    Moteur de matching en masse.
+
+    Usage :
+        matcher = CandidateJobMatcher()
+        matcher.fit_candidates(cv_datas)
+        top = matcher.top_k([job1, job2], k=20)
+    """
+
+    def __init__(self, vocabulary: SkillVocabulary = None, weights: Dict[str, float] = None):
+        self.vocabulary = vocabulary or SkillVocabulary()
+        weights = dict(weights or DEFAULT_WEIGHTS)
+        total = sum(weights.values()) or 1.0
+        self.weights = {block: w / total for block, w in weights.items()}
+
+        # Mots-clés de rôle et de diplôme reconnus dans les textes libres
+        self.role_keywords = [
+            'hotesse', 'steward', 'attendant', 'crew', 'agent', 'manager',
+            'responsable', 'superviseur', 'supervisor', 'chef', 'commercial',
+            'sales', 'assistant', 'coordinateur', 'coordinator', 'technicien',
+            'technician', 'ingenieur', 'engineer', 'developpeur', 'developer',
+            'consultant', 'analyste', 'analyst', 'directeur', 'director',
+        ]
+        self.education_keywords = [
+            'bac', 'baccalaureat', 'bts', 'dut', 'licence', 'bachelor',
+            'master', 'mba', 'doctorat', 'phd', 'diplome', 'diploma',
+            'degree', 'certification', 'cca', 'universite', 'university',
+            'ecole', 'school',
+        ]
+        self._role_re = self._keyword_regex(self.role_keywords)
+        self._education_re = self._keyword_regex(self.education_keywords)
+
+        self.candidate_ids: List = []
+        self.candidate_matrix = None
+
+    @staticmethod
+    def _keyword_regex(keywords: Iterable[str]):
+        alternatives = '|'.join(sorted((re.escape(k) for k in keywords), key=len, reverse=True))
+        return re.compile(rf"\b(?:{alternatives})\b")
+
+    # ==============================================================
+    # ENCODAGE DES CANDIDATS
+    # ==============================================================
+    def candidate_features(self, cv_data: Dict, add: bool = True) -> List[int]:
+        """Extrait les indices de features d'un CV parsé (ou d'un export JSON)"""
+        if 'cv_data' in cv_data:
+            cv_data = cv_data['cv_data']
+        vocab = self.vocabulary
+        features = set()
+
+        for skill in cv_data.get('competences', []) or []:
+            features.add(vocab.feature('skills', skill, add))
+
+        for langue in cv_data.get('langues', []) or []:
+            name = langue.get('langue', '') if isinstance(langue, dict) else langue
+            features.add(vocab.feature('languages', name, add))
+
+        for formation in cv_data.get('formations', []) or []:
+            text = formation.get('diplome', '') if isinstance(formation, dict) else formation
+            for kw in self._education_re.findall(normalize_term(text)):
+                features.add(vocab.feature('education', kw, add))
+
+        for exp in cv_data.get('experiences', []) or []:
+            text = exp.get('poste', '') if isinstance(exp, dict) else exp
+            for kw in self._role_re.findall(normalize_term(text)):
+                features.add(vocab.feature('experience', kw, add))
+
+        features.discard(None)
+        return sorted(features)
+
+    def fit_candidates(self, candidates: Iterable[Dict], ids: Iterable = None):
+        """
+        Construit la matrice creuse CSR candidats × features (binaire)
+        """
+        indptr = [0]
+        indices: List[int] = []
+        candidate_ids = []
+        ids_iter = iter(ids) if ids is not None else None
+
+        for position, cv_data in enumerate(candidates):
+            indices.extend(self.candidate_features(cv_data))
+            indptr.append(len(indices))
+            candidate_ids.append(next(ids_iter) if ids_iter is not None else position)
+
+        self.candidate_ids = candidate_ids
+        self._build_matrix(
+            np.asarray(indices, dtype=np.int32),
+            np.asarray(indptr, dtype=np.int64),
+        )
+        return self
+
+    def _build_matrix(self, indices: np.ndarray, indptr: np.ndarray):
+        data = np.ones(len(indices), dtype=np.float32)
+        self.candidate_matrix = sparse.csr_matrix(
+            (data, indices, indptr),
+            shape=(len(indptr) - 1, len(self.vocabulary)),
+        )
+
+    # ==============================================================
+    # ENCODAGE DES OFFRES
+    # ==============================================================
+    def job_matrix(self, jobs: List[Dict]):
+        """
+        Encode les offres en matrice de poids features × offres, plus un biais
+        par offre. Chaque bloc requis pèse weight / nb_termes_requis ; un bloc
+        vide compte comme satisfait (même règle que jobMatching.js).
+
+        Clés acceptées par offre : skills, languages, education, experience.
+        """
+        n_features = len(self.vocabulary)
+        rows, cols, vals = [], [], []
+        bias = np.zeros(len(jobs), dtype=np.float32)
+
+        for j, job in enumerate(jobs):
+            for block, weight in self.weights.items():
+                terms = job.get(block) or []
+                if isinstance(terms, str):
+                    terms = [terms]
+                if block == 'education':
+                    terms = [kw for t in terms for kw in self._education_re.findall(normalize_term(t))] or terms
+                elif block == 'experience':
+                    terms = [kw for t in terms for kw in self._role_re.findall(normalize_term(t))] or terms
+
+                required = {self.vocabulary.feature(block, t, add=False) for t in terms if normalize_term(t)}
+                if not required:
+                    bias[j] += weight
+                    continue
+
+                # Un terme absent du vocabulaire ne peut être satisfait par personne
+                share = weight / len(required)
+                for idx in required:
+                    if idx is not None:
+                        rows.append(idx)
+                        cols.append(j)
+                        vals.append(share)
+
+        weights = sparse.csr_matrix(
+            (np.asarray(vals, dtype=np.float32), (rows, cols)),
+            shape=(n_features, len(jobs)),
+        )
+        return weights, bias
+
+    # ==============================================================
+    # SCORING
+    # ==============================================================
+    def score(self, jobs: List[Dict]) -> np.ndarray:
+        """Retourne la matrice dense des scores (candidats × offres) dans [0, 1]"""
+        if self.candidate_matrix is None:
+            raise RuntimeError("Aucun candidat encodé: appelez fit_candidates() d'abord")
+        if isinstance(jobs, dict):
+            jobs = [jobs]
+        weights, bias = self.job_matrix(jobs)
+        product = self.candidate_matrix @ weights
+        scores = product.toarray() if sparse.issparse(product) else np.asarray(product)
+        scores += bias[np.newaxis, :]
+        return scores
+
+    def top_k(self, jobs: List[Dict], k: int = 10) -> List[List[Dict]]:
+        """
+        Retourne pour chaque offre les k meilleurs candidats, triés par score
+        décroissant : [[{'candidate': id, 'score': 87}, ...], ...]
+        """
+        if isinstance(jobs, dict):
+            jobs = [jobs]
+        scores = self.score(jobs)
+        n_candidates = scores.shape[0]
+        k = min(k, n_candidates)
+        if k <= 0:
+            return [[] for _ in jobs]
+
+        # argpartition O(n) par colonne puis tri des seuls k retenus
+        top = np.argpartition(-scores, k - 1, axis=0)[:k]
+        results = []
+        for j in range(scores.shape[1]):
+            idx = top[:, j]
+            idx = idx[np.argsort(-scores[idx, j], kind='stable')]
+            results.append([
+                {'candidate': self.candidate_ids[i], 'score': int(round(float(scores[i, j]) * 100))}
+                for i in idx
+            ])
+        return results
@@ -0,0 +1,172 @@
+"""
+Module de métriques (compteurs, jauges, histogrammes) au format Prometheus
+Chaque processus tient son propre registre ; les workers du pool renvoient
+un instantané cumulé avec chaque document et le service les fusionne pour
+GET /metrics. Aucune dépendance externe (format texte 0.0.4).
+
+    from src import metrics
+    metrics.inc('cv_documents_total', status='success')
+    with metrics.timer('cv_stage_seconds', stage='ocr'):
+        ...
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Tuple
+
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# nom -> (type, aide, seaux)
+DEFINITIONS = {
+    'cv_documents_total': ('counter', "Documents analysés par format et statut", None),
+    'cv_pages_total': ('counter', "Pages rendues ou décodées par le chargeur", None),
+    'cv_stage_seconds': ('histogram', "Durée de chaque étape d'analyse", LATENCY_BUCKETS),
+    'cv_document_seconds': ('histogram', "Durée totale d'analyse d'un document", LATENCY_BUCKETS),
+    'cv_ocr_blocks_total': ('counter', "Blocs de texte reconnus par l'OCR", None),
+    'cv_ocr_fallback_total': ('counter', "Replis de l'OCR (page entière relue, OCR réutilisé, texte direct)", None),
+    'cv_model_load_seconds': ('histogram', "Durée de chargement du modèle OCR", LATENCY_BUCKETS),
+    'cv_model_store_verify_seconds': ('histogram', "Durée du contrôle des poids du magasin local", LATENCY_BUCKETS),
+    'cv_parser_empty_fields_total': ('counter', "Champs non détectés par l'analyse sémantique", None),
+    'cv_queue_depth': ('gauge', "Analyses en attente par voie de priorité", None),
+    'cv_queue_running': ('gauge', "Analyses en cours par voie de priorité", None),
+    'cv_queue_wait_seconds': ('histogram', "Attente avant le début d'une analyse", LATENCY_BUCKETS),
+    'cv_queue_rejected_total': ('counter', "Analyses refusées (file pleine)", None),
+    'cv_workers_ready': ('gauge', "Workers dont les modèles sont chargés", None),
+    'cv_worker_rss_bytes': ('gauge', "Mémoire résidente de chaque worker", None),
+    'cv_worker_events_total': ('counter', "Événements des workers (recyclage, délai dépassé, arrêt brutal)", None),
+}
+
+
+def _key(labels: Dict) -> Tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple, float] = {}
+        self.gauges: Dict[Tuple, float] = {}
+        self.histograms: Dict[Tuple, list] = {}  # [compte par seau..., somme, total]
+
+    def reset(self):
+        """Vide le registre (processus fils hérité par fork)"""
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    # ==============================================================
+    # ENREGISTREMENT
+    # ==============================================================
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = (name, _key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self.gauges[(name, _key(labels))] = float(value)
+
+    def observe(self, name: str, value: float, **labels):
+        buckets = DEFINITIONS[name][2]
+        key = (name, _key(labels))
+        with self._lock:
+            state = self.histograms.get(key)
+            if state is None:
+                state = self.histograms[key] = [0] * len(buckets) + [0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    # ==============================================================
+    # AGRÉGATION ENTRE PROCESSUS
+    # ==============================================================
+    def snapshot(self) -> Dict:
+        """Copie sérialisable des valeurs cumulées"""
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges),
+                'histograms': {k: list(v) for k, v in self.histograms.items()},
+            }
+
+    def merge(self, snapshot: Dict):
+        """Ajoute un instantané (compteurs et histogrammes sommés, jauges remplacées)"""
+        with self._lock:
+            for key, value in snapshot['counters'].items():
+                self.counters[key] = self.counters.get(key, 0.0) + value
+            self.gauges.update(snapshot['gauges'])
+            for key, values in snapshot['histograms'].items():
+                state = self.histograms.get(key)
+                if state is None:
+                    self.histograms[key] = list(values)
+                else:
+                    for i, value in enumerate(values):
+                        state[i] += value
+
+    @classmethod
+    def combined(cls, snapshots: Iterable[Dict]) -> 'MetricsRegistry':
+        registry = cls()
+        for snapshot in snapshots:
+            registry.merge(snapshot)
+        return registry
+
+    # ==============================================================
+    # FORMAT TEXTE PROMETHEUS
+    # ==============================================================
+    def render(self) -> str:
+        snapshot = self.snapshot()
+        families: Dict[str, list] = {}
+        for kind in ('counters', 'gauges', 'histograms'):
+            for (name, labels), value in snapshot[kind].items():
+                families.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name in sorted(families):
+            kind, help_text, buckets = DEFINITIONS.get(name, ('untyped', '', None))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(families[name]):
+                if kind != 'histogram':
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+                for bound, count in zip(buckets, value):
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', _format_value(bound)),))} {count}")
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {value[-1]}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value[-2])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value[-1]}")
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels: Tuple) -> str:
+    if not labels:
+        return ''
+    escaped = ('{}="{}"'.format(k, v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+               for k, v in labels)
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# Registre du processus courant
+REGISTRY = MetricsRegistry()
+inc = REGISTRY.inc
+set_gauge = REGISTRY.set_gauge
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+snapshot = REGISTRY.snapshot
@@ -0,0 +1,122 @@
+"""
+Module du magasin local des poids EasyOCR (démarrage hors ligne)
+Les poids sont installés une fois (build de l'image) dans un répertoire fixe,
+puis chargés avec le téléchargement désactivé : un conteneur neuf ne dépend
+plus du réseau et le premier chargement a une durée stable. Les sommes de
+contrôle sont celles publiées par EasyOCR pour ces fichiers.
+
+Variables d'environnement :
+    CV_MODEL_DIR        répertoire des poids (défaut: <cv_parser>/models,
+                        /opt/cv-models dans l'image Docker)
+    CV_MODEL_DOWNLOAD   1 = laisser EasyOCR télécharger les poids manquants (défaut: 0)
+
+Installation des poids :
+    python -m src.model_store fetch
+    python -m src.model_store verify
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+from typing import Dict, List
+
+from . import metrics
+
+
+# Poids utilisés pour ['fr', 'en'] : détecteur CRAFT et reconnaisseur latin (nom -> md5)
+REQUIRED_MODELS = {
+    'craft_mlt_25k.pth': '2f8227d2def4037cdb3b34389dcf9ec1',
+    'latin_g2.pth': '469869130aad1a34e8f9086f4262bc59',
+}
+
+DEFAULT_MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models')
+
+
+class ModelStoreError(Exception):
+    """Poids absents ou corrompus dans le magasin local"""
+
+
+def model_dir() -> str:
+    return os.path.abspath(os.getenv('CV_MODEL_DIR', DEFAULT_MODEL_DIR))
+
+
+def download_enabled() -> bool:
+    return os.getenv('CV_MODEL_DOWNLOAD', '0') == '1'
+
+
+def missing_models(directory: str = None) -> List[str]:
+    directory = directory or model_dir()
+    return [name for name in REQUIRED_MODELS if not os.path.isfile(os.path.join(directory, name))]
+
+
+def ensure_present(directory: str = None):
+    """Vérification rapide (existence seulement) avant de créer le lecteur EasyOCR"""
+    directory = directory or model_dir()
+    missing = missing_models(directory)
+    if missing and not download_enabled():
+        raise ModelStoreError(
+            f"Poids EasyOCR absents de {directory}: {', '.join(missing)} "
+            f"(python -m src.model_store fetch, ou CV_MODEL_DOWNLOAD=1)")
+
+
+def _md5(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def verify(directory: str = None) -> Dict:
+    """
+    Contrôle les sommes des poids (au démarrage du service, une seule fois) ;
+    lève ModelStoreError si un fichier manque ou ne correspond pas
+    """
+    directory = directory or model_dir()
+    start = time.perf_counter()
+    ensure_present(directory)
+    total_bytes = 0
+    for name, expected in REQUIRED_MODELS.items():
+        path = os.path.join(directory, name)
+        if not os.path.isfile(path):
+            continue  # téléchargement autorisé : EasyOCR s'en chargera
+        if _md5(path) != expected:
+            raise ModelStoreError(f"Somme de contrôle invalide pour {path} (fichier corrompu ou incomplet)")
+        total_bytes += os.path.getsize(path)
+    elapsed = time.perf_counter() - start
+    metrics.observe('cv_model_store_verify_seconds', elapsed)
+    return {'directory': directory, 'files': len(REQUIRED_MODELS), 'bytes': total_bytes,
+            'seconds': round(elapsed, 3)}
+
+
+def fetch(directory: str = None) -> Dict:
+    """Télécharge les poids manquants dans le magasin (build de l'image), puis les vérifie"""
+    directory = directory or model_dir()
+    os.makedirs(directory, exist_ok=True)
+    if missing_models(directory):
+        import easyocr
+
+        easyocr.Reader(['fr', 'en'], gpu=False, model_storage_directory=directory,
+                       download_enabled=True, verbose=False)
+    return verify(directory)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Magasin local des poids EasyOCR")
+    parser.add_argument("command", choices=['fetch', 'verify'])
+    parser.add_argument("--model-dir", default=None, help="répertoire des poids (défaut: CV_MODEL_DIR)")
+    args = parser.parse_args(argv)
+
+    try:
+        result = fetch(args.model_dir) if args.command == 'fetch' else verify(args.model_dir)
+    except ModelStoreError as e:
+        print(f"ERREUR: {e}", file=sys.stderr)
+        return 1
+    print(f"OK {result['files']} fichier(s), {result['bytes'] / 1024 / 1024:.1f} Mo "
+          f"dans {result['directory']} ({result['seconds']}s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""
+Module de stockage colonnaire des blocs OCR
+Les boîtes et confiances sont conservées dans des tableaux NumPy et les
+textes dans un tampon unique indexé par des décalages : filtrage, tri et
+changement de repère sont vectorisés, et la sérialisation (pickle entre
+processus, octets bruts) ne produit qu'un seul tampon contigu.
+La vue « liste de dictionnaires » reste disponible (itération, indexation,
+to_dicts()) pour le code existant.
+"""
+import struct
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+import numpy as np
+
+
+class OCRBlocks:
+    # En-tête de to_bytes() : nombre de blocs, taille du texte UTF-8
+    _HEADER = struct.Struct('<II')
+
+    def __init__(self, boxes: np.ndarray = None, confidences: np.ndarray = None,
+                 text: str = '', offsets: np.ndarray = None, word_counts: np.ndarray = None):
+        """
+        boxes       : (n, 4, 2) float32, quatre coins (x, y) par bloc
+        confidences : (n,) float32
+        text        : textes concaténés ; le bloc i est text[offsets[i]:offsets[i + 1]]
+        offsets     : (n + 1,) int64
+        word_counts : (n,) int32, recalculé depuis le texte si absent
+        """
+        self.boxes = np.zeros((0, 4, 2), np.float32) if boxes is None else np.asarray(boxes, np.float32)
+        self.confidences = (np.zeros(0, np.float32) if confidences is None
+                            else np.asarray(confidences, np.float32))
+        self.text = text
+        self.offsets = np.zeros(1, np.int64) if offsets is None else np.asarray(offsets, np.int64)
+        if word_counts is None:
+            word_counts = [len(t.split()) for t in self.texts]
+        self.word_counts = np.asarray(word_counts, np.int32)
+
+    # ==============================================================
+    # CONSTRUCTION
+    # ==============================================================
+    @classmethod
+    def from_arrays(cls, boxes, confidences, texts: List[str]) -> 'OCRBlocks':
+        lengths = [len(t) for t in texts]
+        offsets = np.zeros(len(texts) + 1, np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(np.asarray(boxes, np.float32).reshape(-1, 4, 2), confidences, ''.join(texts), offsets)
+
+    @classmethod
+    def from_easyocr(cls, raw_results: Iterable, min_confidence: float = 0.0) -> 'OCRBlocks':
+        """
+        Convertit la sortie de easyocr.Reader.readtext : (bbox, texte, confiance)
+        ou (bbox, texte) en mode paragraphe (confiance 1.0)
+        """
+        boxes, confidences, texts = [], [], []
+        for result in raw_results:
+            if len(result) == 3:
+                bbox, text, confidence = result
+            elif len(result) == 2:
+                bbox, text = result
+                confidence = 1.0
+            else:
+                continue  # Ignorer les formats inattendus
+            boxes.append(bbox)
+            confidences.append(confidence)
+            texts.append(text.strip())
+        blocks = cls.from_arrays(boxes, confidences, texts)
+        return blocks.filter(blocks.confidences >= np.float32(min_confidence)) if min_confidence else blocks
+
+    @classmethod
+    def from_results(cls, results: Union['OCRBlocks', List[dict]]) -> 'OCRBlocks':
+        """Accepte l'ancien format (liste de dictionnaires) ou un OCRBlocks"""
+        if isinstance(results, OCRBlocks):
+            return results
+        return cls.from_arrays([r['bbox'] for r in results],
+                               [r['confidence'] for r in results],
+                               [r['text'].strip() for r in results])
+
+    @classmethod
+    def concatenate(cls, parts: List['OCRBlocks']) -> 'OCRBlocks':
+        parts = [p for p in parts if len(p)]
+        if not parts:
+            return cls()
+        offsets = [np.zeros(1, np.int64)]
+        base = 0
+        for part in parts:
+            offsets.append(part.offsets[1:] + base)
+            base += len(part.text)
+        return cls(np.concatenate([p.boxes for p in parts]),
+                   np.concatenate([p.confidences for p in parts]),
+                   ''.join(p.text for p in parts),
+                   np.concatenate(offsets),
+                   np.concatenate([p.word_counts for p in parts]))
+
+    # ==============================================================
+    # VUE COMPATIBLE (liste de dictionnaires)
+    # ==============================================================
+    def __len__(self) -> int:
+        return len(self.confidences)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(len(self)):
+            yield self._as_dict(i)
+
+    def __getitem__(self, key):
+        """Entier → dictionnaire ; tranche, masque booléen ou indices → OCRBlocks"""
+        if isinstance(key, (int, np.integer)):
+            index = int(key)
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError(f"bloc OCR hors limites: {key}")
+            return self._as_dict(index)
+        if isinstance(key, slice):
+            key = np.arange(len(self))[key]
+        return self.filter(key)
+
+    def _as_dict(self, i: int) -> Dict:
+        return {
+            'bbox': self.boxes[i].tolist(),
+            'text': self.text[self.offsets[i]:self.offsets[i + 1]],
+            'confidence': round(float(self.confidences[i]), 3),
+            'word_count': int(self.word_counts[i]),
+        }
+
+    def to_dicts(self) -> List[Dict]:
+        return list(self)
+
+    def __repr__(self) -> str:
+        return f"OCRBlocks({len(self)} blocs, {len(self.text)} caractères)"
+
+    # ==============================================================
+    # ACCÈS VECTORISÉS
+    # ==============================================================
+    @property
+    def texts(self) -> List[str]:
+        bounds = self.offsets.tolist()
+        return [self.text[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Longueur (caractères) du texte de chaque bloc"""
+        return np.diff(self.offsets)
+
+    @property
+    def top_left(self) -> np.ndarray:
+        """(n, 2) premier coin de chaque boîte, clé de tri historique"""
+        return self.boxes[:, 0, :]
+
+    def bounds(self) -> np.ndarray:
+        """(n, 4) rectangles englobants x0, y0, x1, y1"""
+        return np.concatenate([self.boxes.min(axis=1), self.boxes.max(axis=1)], axis=1)
+
+    def filter(self, mask) -> 'OCRBlocks':
+        """Sous-ensemble selon un masque booléen ou un tableau d'indices (ordre conservé)"""
+        indices = np.asarray(mask)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        bounds = self.offsets.tolist()
+        texts = [self.text[bounds[i]:bounds[i + 1]] for i in indices.tolist()]
+        offsets = np.zeros(len(texts) + 1, np.int64)
+        np.cumsum(self.lengths[indices], out=offsets[1:])
+        return OCRBlocks(self.boxes[indices], self.confidences[indices], ''.join(texts),
+                         offsets, self.word_counts[indices])
+
+    def reading_order(self) -> np.ndarray:
+        """Indices triés par Y puis X du premier coin (tri stable)"""
+        top_left = self.top_left
+        return np.lexsort((top_left[:, 0], top_left[:, 1]))
+
+    def transformed(self, factor: float, origin_x: float = 0.0, origin_y: float = 0.0) -> 'OCRBlocks':
+        """Change de repère : origine + coordonnées * factor, arrondi au pixel"""
+        boxes = np.rint(self.boxes * np.float32(factor) + np.array([origin_x, origin_y], np.float32))
+        return OCRBlocks(boxes, self.confidences, self.text, self.offsets, self.word_counts)
+
+    # ==============================================================
+    # SÉRIALISATION
+    # ==============================================================
+    def to_bytes(self) -> bytes:
+        encoded = self.text.encode('utf-8')
+        return b''.join([
+            self._HEADER.pack(len(self), len(encoded)),
+            self.boxes.astype('<f4', copy=False).tobytes(),
+            self.confidences.astype('<f4', copy=False).tobytes(),
+            self.word_counts.astype('<i4', copy=False).tobytes(),
+            self.offsets.astype('<i8', copy=False).tobytes(),
+            encoded,
+        ])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'OCRBlocks':
+        count, text_size = cls._HEADER.unpack_from(data)
+        position = cls._HEADER.size
+
+        def take(dtype: str, items: int) -> Tuple[np.ndarray, int]:
+            array = np.frombuffer(data, dtype=dtype, count=items, offset=position)
+            return array, position + array.nbytes
+
+        boxes, position = take('<f4', count * 8)
+        confidences, position = take('<f4', count)
+        word_counts, position = take('<i4', count)
+        offsets, position = take('<i8', count + 1)
+        text = bytes(data[position:position + text_size]).decode('utf-8')
+        return cls(boxes.reshape(count, 4, 2), confidences, text, offsets, word_counts)
+
+    def __reduce__(self):
+        # Un seul tampon d'octets entre processus (pipeline, pool d'ingestion)
+        return (OCRBlocks.from_bytes, (self.to_bytes(),))
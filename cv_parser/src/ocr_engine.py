@@ -2,101 +2,116 @@
 Module d'interface avec EasyOCR pour CV multilingues (FR + EN)
 Version compatible avec l'ancien et le nouveau code
 """
-import easyocr
-import cv2
+import time
 import numpy as np
-from typing import List, Dict
+from typing import Dict
+
+from . import metrics, model_store
+from .language_id import identify_language
+from .ocr_blocks import OCRBlocks
+
+LANGUAGE_NAMES = {'fr': 'french', 'en': 'english', 'ar': 'arabic'}
 
 class MultilingualOCREngine:
     def __init__(self):
         """
-        Initialise le lecteur EasyOCR avec français et anglais
+        Prépare le moteur EasyOCR (français et anglais)
+        Le modèle n'est chargé qu'à la première extraction ou via warm_up()
         """
-        self.reader = easyocr.Reader(
-            ['fr', 'en'],  # Français et anglais simultanément
-            gpu=False,
-            model_storage_directory='./models',
-            download_enabled=True,
-            detector=True,
-            recognizer=True
-        )
+        self._reader = None
         self.min_confidence = 0.6
+
+    @property
+    def reader(self):
+        """Lecteur EasyOCR, chargé à la première utilisation (import de torch inclus)"""
+        if self._reader is None:
+            start = time.perf_counter()
+            # Poids lus depuis le magasin local, sans téléchargement (voir model_store)
+            model_store.ensure_present()
+            import easyocr
+
+            self._reader = easyocr.Reader(
+                ['fr', 'en'],  # Français et anglais simultanément
+                gpu=False,
+                model_storage_directory=model_store.model_dir(),
+                download_enabled=model_store.download_enabled(),
+                detector=True,
+                recognizer=True
+            )
+            metrics.observe('cv_model_load_seconds', time.perf_counter() - start)
+        return self._reader
+
+    def warm_up(self):
+        """
+        Charge le modèle et exécute une inférence à blanc pour que la première
+        vraie requête ne paie ni le chargement ni l'initialisation de torch
+        """
+        self.reader.readtext(np.full((32, 64), 255, dtype=np.uint8))
+        return self
     
     def detect_language(self, text: str) -> Dict[str, float]:
         """
-        Détecte la langue dominante du texte
+        Détecte la langue dominante du texte (trigrammes, voir language_id)
         """
-        # Mots-clés français
-        fr_keywords = ['profil', 'expérience', 'formation', 'compétences', 
-                      'langues', 'centres d\'intérêt', 'chez', 'rue', 'boulevard']
-        
-        # Mots-clés anglais
-        en_keywords = ['profile', 'experience', 'education', 'skills', 
-                      'languages', 'interests', 'at', 'street', 'avenue']
-        
-        text_lower = text.lower()
-        fr_score = sum(1 for keyword in fr_keywords if keyword in text_lower)
-        en_score = sum(1 for keyword in en_keywords if keyword in text_lower)
-        
-        total = fr_score + en_score if (fr_score + en_score) > 0 else 1
-        
+        result = identify_language(text)
+        scores = result['scores']
         return {
-            'french': fr_score / total,
-            'english': en_score / total,
-            'primary': 'french' if fr_score >= en_score else 'english'
+            'french': scores['fr'],
+            'english': scores['en'],
+            'arabic': scores['ar'],
+            'confidence': result['confidence'],
+            'primary': LANGUAGE_NAMES[result['language']]
         }
-    
-    def extract_text(self, image) -> List[dict]:
+
+    def extract_text(self, image, paragraph: bool = True, min_confidence: float = None) -> OCRBlocks:
         """
         Extrait le texte d'une image avec détection multilingue
+        Les blocs se lisent aussi comme une liste de dictionnaires
+        (bbox, text, confidence, word_count)
+        paragraph=False renvoie des lignes avec leur confiance réelle ;
+        min_confidence=0 conserve tous les blocs (passe grossière adaptative)
         """
+        if min_confidence is None:
+            min_confidence = self.min_confidence
+
         # Conversion pour EasyOCR
         if isinstance(image, np.ndarray):
             ocr_image = image
         else:
+            import cv2
+
             ocr_image = np.array(image)
             if len(ocr_image.shape) == 3:
                 ocr_image = cv2.cvtColor(ocr_image, cv2.COLOR_RGB2BGR)
         
+        reader = self.reader
         # Extraction OCR avec les deux langues
-        results = self.reader.readtext(
-            ocr_image,
-            paragraph=True,
-            min_size=10,
-            text_threshold=0.7,
-            low_text=0.4,
-            link_threshold=0.4
-        )
+        with metrics.timer('cv_stage_seconds', stage='ocr'):
+            results = reader.readtext(
+                ocr_image,
+                paragraph=paragraph,
+                min_size=10,
+                text_threshold=0.7,
+                low_text=0.4,
+                link_threshold=0.4
+            )
         
-        # Formatage des résultats
-        formatted_results = []
-        for result in results:
-            # EasyOCR peut retourner soit (bbox, text, confidence) soit (bbox, text) avec paragraph=True
-            if len(result) == 3:
-                bbox, text, confidence = result
-            elif len(result) == 2:
-                bbox, text = result
-                confidence = 1.0  # Confiance par défaut si non fournie
-            else:
-                continue  # Ignorer les formats inattendus
-            
-            if confidence >= self.min_confidence:
-                formatted_results.append({
-                    'bbox': bbox,
-                    'text': text.strip(),
-                    'confidence': round(confidence, 3),
-                    'word_count': len(text.split())
-                })
-        
-        return formatted_results
+        # Formatage colonnaire (boîtes et confiances en tableaux NumPy)
+        blocks = OCRBlocks.from_easyocr(results, min_confidence)
+        metrics.inc('cv_ocr_blocks_total', len(blocks))
+        return blocks
     
-    def extract_text_with_language(self, image) -> Dict:
+    def extract_text_with_language(self, image, results: OCRBlocks = None) -> Dict:
         """
         Extrait le texte et détecte la langue
         Compatible avec l'ancien et le nouveau code
+        results permet de fournir des blocs déjà extraits (OCR adaptatif)
         """
-        results = self.extract_text(image)
-        full_text = ' '.join([r['text'] for r in results])
+        if results is None:
+            results = self.extract_text(image)
+        else:
+            results = OCRBlocks.from_results(results)
+        full_text = ' '.join(results.texts)
         language_info = self.detect_language(full_text)
         
         # Retourner avec tous les champs pour compatibilité
@@ -0,0 +1,303 @@
+"""
+Module de détection de quasi-doublons avant OCR
+Calcule un hash perceptuel (dHash 64 bits) sur un rendu basse résolution
+de la première page et le recherche dans un index local. Le hash ne sert
+qu'à trouver des candidats : deux CV différents construits sur le même
+modèle ont souvent le même dHash. Les résultats OCR ne sont réutilisés
+que si le contenu est confirmé : fichier identique octet par octet, ou
+rendu à résolution de lecture identique zone par zone (même page
+réexportée / recompressée). Une photo reprise n'est donc pas réutilisée.
+L'index est une base SQLite partagée par les workers d'un lot : chaque
+enregistrement est une insertion, sans réécriture concurrente du fichier.
+Une recherche ne lit que les candidats trouvés par index : même SHA-256,
+ou au moins un des 8 octets du dHash en commun (deux hash à distance de
+Hamming <= 7 ont forcément un octet identique).
+
+    signature = index.signature(apercu, chemin)    # empreintes calculées une fois
+    ocr_data = index.lookup(signature)
+    if ocr_data is None:
+        ocr_data = ...                             # OCR complet
+        index.store(signature, ocr_data)           # rendu de confirmation réutilisé
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .ocr_blocks import OCRBlocks
+
+
+class PageSignature:
+    """
+    Empreintes d'une page à analyser, partagées entre lookup() et store() :
+    le rendu de confirmation (le calcul le plus coûteux) n'est produit qu'au
+    premier besoin, puis réutilisé
+    """
+
+    def __init__(self, index: 'PageDedupIndex', image, source: str):
+        self.source = source
+        self.dhash, self.thumb = index.fingerprint(image)
+        self.digest = index.file_digest(source)
+        self._index = index
+        self._content = None
+
+    @property
+    def content(self) -> np.ndarray:
+        if self._content is None:
+            self._content = self._index.content_image(self.source)
+        return self._content
+
+
+class PageDedupIndex:
+    # Rendu de confirmation : largeur normalisée (~100 DPI pour un A4) et
+    # taille des zones comparées, en pixels
+    CONTENT_WIDTH = 800
+    CONTENT_TILE = 8
+    # Octets du dHash indexés séparément (recherche des candidats)
+    BANDS = 8
+
+    def __init__(self, index_dir: str = './cache/ocr_dedup', max_distance: int = 6,
+                 max_thumb_diff: float = 12.0, max_tile_diff: float = 6.0, loader=None):
+        """
+        index_dir      : dossier de l'index (index.db + résultats OCR)
+        max_distance   : distance de Hamming maximale entre dHash (sur 64 bits, < BANDS)
+        max_thumb_diff : écart moyen absolu maximal entre vignettes 32x32 (0-255)
+        max_tile_diff  : écart moyen absolu maximal sur chaque zone 8x8 du rendu
+                         de confirmation (0-255) ; la recompression JPEG reste
+                         sous 5, un chiffre de téléphone modifié dépasse 40
+        loader         : CVDocumentLoader pour le rendu de confirmation
+        """
+        if max_distance >= self.BANDS:
+            raise ValueError(f"max_distance doit être inférieure à {self.BANDS} (recherche par octets du dHash)")
+        self.index_dir = index_dir
+        self.max_distance = max_distance
+        self.max_thumb_diff = max_thumb_diff
+        self.max_tile_diff = max_tile_diff
+        self._loader = loader
+        # L'ancien index.json (sans empreinte de contenu) n'est plus lu
+        self.index_path = os.path.join(index_dir, 'index.db')
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.rejected = 0
+
+        os.makedirs(index_dir, exist_ok=True)
+        # timeout : attente du verrou d'écriture tenu par un autre worker
+        self._db = sqlite3.connect(self.index_path, timeout=30, check_same_thread=False,
+                                   isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        bands = ", ".join(f"band{i} INTEGER NOT NULL DEFAULT 0" for i in range(self.BANDS))
+        self._db.execute("CREATE TABLE IF NOT EXISTS pages ("
+                         "id INTEGER PRIMARY KEY AUTOINCREMENT, dhash INTEGER NOT NULL, "
+                         "thumb BLOB NOT NULL, sha256 TEXT NOT NULL, ocr_file TEXT NOT NULL, "
+                         f"content_file TEXT NOT NULL, source TEXT NOT NULL, {bands})")
+        self._add_band_columns()
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_sha256 ON pages (sha256)")
+        for i in range(self.BANDS):
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS pages_band{i} ON pages (band{i})")
+
+    def _add_band_columns(self):
+        """Index créé sans colonnes d'octets : ajout et remplissage depuis dhash"""
+        if 'band0' in {row[1] for row in self._db.execute("PRAGMA table_info(pages)")}:
+            return
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            # Un autre worker a pu migrer pendant l'attente du verrou
+            if 'band0' not in {row[1] for row in self._db.execute("PRAGMA table_info(pages)")}:
+                for i in range(self.BANDS):
+                    self._db.execute(f"ALTER TABLE pages ADD COLUMN band{i} INTEGER NOT NULL DEFAULT 0")
+                self._db.execute("UPDATE pages SET " + ", ".join(
+                    f"band{i} = (dhash >> {8 * i}) & 255" for i in range(self.BANDS)))
+            self._db.execute("COMMIT")
+        except sqlite3.Error:
+            self._db.execute("ROLLBACK")
+            raise
+
+    @classmethod
+    def bands(cls, dhash: int) -> List[int]:
+        """Octets du dHash, du poids faible au poids fort"""
+        return [(dhash >> (8 * i)) & 0xFF for i in range(cls.BANDS)]
+
+    def _candidates(self, signature: PageSignature) -> List[Dict]:
+        """Pages de même SHA-256 ou partageant au moins un octet de dHash (requête indexée)"""
+        where = " OR ".join(f"band{i} = ?" for i in range(self.BANDS))
+        with self._lock:
+            rows = self._db.execute("SELECT dhash, thumb, sha256, ocr_file, content_file, source "
+                                    f"FROM pages WHERE sha256 = ? OR {where}",
+                                    [signature.digest] + self.bands(signature.dhash)).fetchall()
+        return [{'dhash': dhash & 0xFFFFFFFFFFFFFFFF, 'thumb': thumb, 'sha256': sha256,
+                 'ocr_file': ocr_file, 'content_file': content_file, 'source': source}
+                for dhash, thumb, sha256, ocr_file, content_file, source in rows]
+
+    # ==============================================================
+    # EMPREINTES
+    # ==============================================================
+    @staticmethod
+    def fingerprint(image) -> Tuple[int, np.ndarray]:
+        """Retourne (dHash 64 bits, vignette 32x32 en niveaux de gris)"""
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+        gray = image.convert('L')
+
+        small = np.asarray(gray.resize((9, 8), Image.BILINEAR), dtype=np.int16)
+        bits = (small[:, 1:] > small[:, :-1]).flatten()
+        dhash = int(''.join('1' if b else '0' for b in bits), 2)
+
+        thumb = np.asarray(gray.resize((32, 32), Image.BILINEAR), dtype=np.uint8)
+        return dhash, thumb
+
+    @staticmethod
+    def file_digest(file_path: str) -> str:
+        """SHA-256 du fichier (confirmation d'un doublon exact)"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @property
+    def loader(self):
+        if self._loader is None:
+            from .document_loader import CVDocumentLoader
+            self._loader = CVDocumentLoader()
+        return self._loader
+
+    def content_image(self, file_path: str) -> np.ndarray:
+        """Première page en niveaux de gris, largeur CONTENT_WIDTH (résolution de lecture)"""
+        image = self.loader.render_page(file_path, 0, scale=1 / 3).convert('L')
+        height = max(1, round(image.height * self.CONTENT_WIDTH / image.width))
+        return np.asarray(image.resize((self.CONTENT_WIDTH, height), Image.BILINEAR), dtype=np.uint8)
+
+    @classmethod
+    def content_diff(cls, first: np.ndarray, second: np.ndarray) -> float:
+        """
+        Écart maximal entre zones CONTENT_TILE x CONTENT_TILE des deux rendus.
+        Un maximum local (et non une moyenne sur la page) : un nom ou un numéro
+        différent ne touche que quelques zones.
+        """
+        if abs(first.shape[0] - second.shape[0]) > 2:
+            return float('inf')
+        tile = cls.CONTENT_TILE
+        rows = min(first.shape[0], second.shape[0]) // tile
+        cols = first.shape[1] // tile
+        diff = np.abs(first[:rows * tile, :cols * tile].astype(np.int16) -
+                      second[:rows * tile, :cols * tile].astype(np.int16))
+        return float(diff.reshape(rows, tile, cols, tile).mean(axis=(1, 3)).max())
+
+    def signature(self, image, source: str) -> PageSignature:
+        """Empreintes de la page (image : aperçu basse résolution, source : fichier à analyser)"""
+        return PageSignature(self, image, source)
+
+    def _content_path(self, entry: Dict) -> str:
+        return os.path.join(self.index_dir, entry['content_file'])
+
+    # ==============================================================
+    # RECHERCHE / ENREGISTREMENT
+    # ==============================================================
+    def lookup(self, signature: PageSignature) -> Optional[Dict]:
+        """
+        Cherche un doublon de la page (voir signature()). Retourne les données
+        OCR mémorisées (avec une clé 'dedup') ou None.
+        """
+        with self._lock:
+            self.lookups += 1
+        thumb = signature.thumb.astype(np.int16)
+
+        candidates = []
+        for entry in self._candidates(signature):
+            distance = bin(signature.dhash ^ entry['dhash']).count('1')
+            if entry['sha256'] == signature.digest:
+                candidates.append((-1, distance, 0.0, entry))
+                continue
+            if distance > self.max_distance:
+                continue
+            # Vérification rapide : la vignette doit aussi être proche
+            stored_thumb = np.frombuffer(entry['thumb'], dtype=np.uint8).reshape(32, 32)
+            diff = float(np.mean(np.abs(thumb - stored_thumb.astype(np.int16))))
+            if diff <= self.max_thumb_diff:
+                candidates.append((distance, distance, diff, entry))
+
+        for _, distance, diff, entry in sorted(candidates, key=lambda c: (c[0], c[2])):
+            if entry['sha256'] == signature.digest:
+                match, content_diff = 'identical', 0.0
+            else:
+                # Même modèle de page ≠ même contenu : comparaison à résolution de lecture
+                try:
+                    with Image.open(self._content_path(entry)) as stored:
+                        content_diff = self.content_diff(signature.content, np.asarray(stored.convert('L')))
+                except (OSError, ValueError):
+                    continue
+                if content_diff > self.max_tile_diff:
+                    with self._lock:
+                        self.rejected += 1
+                    continue
+                match = 'content'
+
+            try:
+                with open(os.path.join(self.index_dir, entry['ocr_file']), 'r', encoding='utf-8') as f:
+                    ocr_data = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            ocr_data['ocr_results'] = OCRBlocks.from_results(ocr_data.get('ocr_results', []))
+            with self._lock:
+                self.hits += 1
+            ocr_data['dedup'] = {'hit': True, 'match': match, 'distance': distance,
+                                 'thumb_diff': round(diff, 2), 'content_diff': round(content_diff, 2),
+                                 'source': entry.get('source', '')}
+            return ocr_data
+        return None
+
+    def store(self, signature: PageSignature, ocr_data: Dict) -> None:
+        """Mémorise les résultats OCR de la page pour les prochains doublons"""
+        name = uuid.uuid4().hex
+        ocr_file, content_file = f"{name}.json", f"{name}.png"
+        payload = {k: v for k, v in ocr_data.items() if k != 'dedup'}
+
+        with open(os.path.join(self.index_dir, ocr_file), 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, default=_json_default)
+        Image.fromarray(signature.content).save(os.path.join(self.index_dir, content_file))
+
+        # Entier signé 64 bits côté SQLite
+        dhash = signature.dhash
+        signed_dhash = dhash - (1 << 64) if dhash >= 1 << 63 else dhash
+        columns = ", ".join(f"band{i}" for i in range(self.BANDS))
+        with self._lock:
+            self._db.execute(f"INSERT INTO pages (dhash, thumb, sha256, ocr_file, content_file, source, {columns}) "
+                             f"VALUES (?, ?, ?, ?, ?, ?, {', '.join('?' * self.BANDS)})",
+                             [signed_dhash, signature.thumb.tobytes(), signature.digest, ocr_file,
+                              content_file, os.path.basename(signature.source)] + self.bands(dhash))
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        return {
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'rejected': self.rejected,
+            'hit_rate': round(self.hit_rate, 4),
+            'entries': entries,
+        }
+
+
+def _json_default(value):
+    """Sérialise les types NumPy renvoyés par EasyOCR (bbox en int32...)"""
+    if isinstance(value, OCRBlocks):
+        return value.to_dicts()
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Type non sérialisable: {type(value)}")
@@ -0,0 +1,269 @@
+"""
+Module d'export colonnaire (Parquet) du corpus de CV analysés
+Les champs de cv_data sont écrits dans un jeu de données Parquet partitionné
+(detected_language=.../export_month=...) avec des colonnes listes pour les
+compétences, langues, expériences et formations. L'export est incrémental :
+chaque ajout crée de nouveaux fichiers, et un manifeste évite de réexporter
+les JSON inchangés. Les requêtes d'agrégation (fréquence des compétences,
+répartition des langues, nombre d'expériences) ne lisent que les colonnes
+utiles.
+
+Dépendance optionnelle : pyarrow
+    exporter = CVParquetExporter('./output/parquet')
+    exporter.export_json_dir('./output')            # reprise des *_analyzed.json
+    table = read_cv_dataset('./output/parquet', columns=['competences'])
+    skill_frequencies(table, top=20)
+"""
+import glob
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:  # dépendance optionnelle : export Parquet indisponible
+    pa = pc = ds = None
+
+
+PARTITION_COLUMNS = ('detected_language', 'export_month')
+
+
+def cv_schema():
+    """Schéma Arrow d'une ligne du jeu de données (un CV)"""
+    _require_pyarrow()
+    return pa.schema([
+        ('cv_id', pa.string()),
+        ('source_file', pa.string()),
+        ('exported_at', pa.timestamp('ms')),
+        ('export_date', pa.timestamp('ms')),
+        ('detected_language', pa.string()),
+        ('export_month', pa.string()),
+        ('nom_complet', pa.string()),
+        ('intitule_poste', pa.string()),
+        ('telephone', pa.string()),
+        ('email', pa.string()),
+        ('adresse', pa.string()),
+        ('profil', pa.string()),
+        ('experiences', pa.list_(pa.struct([
+            ('poste', pa.string()),
+            ('entreprise', pa.string()),
+            ('periode', pa.string()),
+            ('details', pa.list_(pa.string())),
+        ]))),
+        ('formations', pa.list_(pa.struct([('diplome', pa.string())]))),
+        ('competences', pa.list_(pa.string())),
+        ('langues', pa.list_(pa.struct([('langue', pa.string()), ('niveau', pa.string())]))),
+        ('centres_interet', pa.list_(pa.string())),
+    ])
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("L'export Parquet nécessite pyarrow (pip install pyarrow)")
+
+
+def _parse_datetime(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+class CVParquetExporter:
+    def __init__(self, dataset_dir: str = './output/parquet', rows_per_write: int = 50_000,
+                 compression: str = 'zstd'):
+        """
+        rows_per_write : lignes accumulées avant écriture (fichiers plus gros = lectures plus rapides)
+        """
+        _require_pyarrow()
+        self.dataset_dir = dataset_dir
+        self.rows_per_write = rows_per_write
+        self.compression = compression
+        self.schema = cv_schema()
+        # Les fichiers préfixés par '_' sont ignorés par pyarrow.dataset
+        self.manifest_path = os.path.join(dataset_dir, '_manifest.json')
+        os.makedirs(dataset_dir, exist_ok=True)
+        self._rows: List[Dict] = []
+        self.rows_written = 0
+        self.files_written = 0
+
+    # ==============================================================
+    # CONVERSION
+    # ==============================================================
+    def to_row(self, export_data: Dict, source_file: str = '') -> Dict:
+        """
+        Convertit un export {'metadata', 'cv_data'} (BilingualJSONExporter)
+        ou un cv_data seul en ligne du jeu de données
+        """
+        metadata = export_data.get('metadata', {}) if 'cv_data' in export_data else {}
+        cv_data = export_data.get('cv_data', export_data)
+        contact = cv_data.get('contact') or {}
+        now = datetime.now()
+        export_date = _parse_datetime(metadata.get('export_date')) or now
+        # Identifiant stable par fichier : chemin absolu (deux CV homonymes de
+        # dossiers différents ne se remplacent pas dans read_cv_dataset)
+        cv_id = (hashlib.sha1(os.path.abspath(source_file).encode('utf-8')).hexdigest()
+                 if source_file else uuid.uuid4().hex)
+
+        return {
+            'cv_id': cv_id,
+            'source_file': os.path.basename(source_file),
+            'exported_at': now,
+            'export_date': export_date,
+            'detected_language': metadata.get('detected_language') or 'unknown',
+            'export_month': export_date.strftime('%Y-%m'),
+            'nom_complet': cv_data.get('nom_complet', ''),
+            'intitule_poste': cv_data.get('intitule_poste', ''),
+            'telephone': contact.get('telephone', ''),
+            'email': contact.get('email', ''),
+            'adresse': contact.get('adresse', ''),
+            'profil': cv_data.get('profil', ''),
+            'experiences': [{
+                'poste': exp.get('poste', ''),
+                'entreprise': exp.get('entreprise', ''),
+                'periode': exp.get('periode', ''),
+                'details': list(exp.get('details') or []),
+            } for exp in cv_data.get('experiences') or []],
+            'formations': [{'diplome': f.get('diplome', '')} if isinstance(f, dict) else {'diplome': str(f)}
+                           for f in cv_data.get('formations') or []],
+            'competences': [str(c) for c in cv_data.get('competences') or []],
+            'langues': [{'langue': l.get('langue', ''), 'niveau': l.get('niveau', '')}
+                        if isinstance(l, dict) else {'langue': str(l), 'niveau': ''}
+                        for l in cv_data.get('langues') or []],
+            'centres_interet': [str(c) for c in cv_data.get('centres_interet') or []],
+        }
+
+    # ==============================================================
+    # ÉCRITURE INCRÉMENTALE
+    # ==============================================================
+    def append(self, export_data: Dict, source_file: str = ''):
+        """Ajoute un CV au tampon ; écrit un lot tous les rows_per_write CV"""
+        self._rows.append(self.to_row(export_data, source_file))
+        if len(self._rows) >= self.rows_per_write:
+            self.flush()
+
+    def append_rows(self, rows: Iterable[Dict]):
+        """Ajoute des lignes déjà converties (voir to_row)"""
+        for row in rows:
+            self._rows.append(row)
+            if len(self._rows) >= self.rows_per_write:
+                self.flush()
+
+    def flush(self) -> int:
+        """Écrit les lignes en attente dans de nouveaux fichiers Parquet"""
+        if not self._rows:
+            return 0
+        table = pa.Table.from_pylist(self._rows, schema=self.schema)
+        self._rows = []
+        self.write_table(table)
+        return table.num_rows
+
+    def write_table(self, table: 'pa.Table'):
+        written = []
+        ds.write_dataset(
+            table, self.dataset_dir, format='parquet',
+            partitioning=ds.partitioning(
+                pa.schema([(name, pa.string()) for name in PARTITION_COLUMNS]), flavor='hive'),
+            # Nom unique par écriture : les fichiers existants ne sont jamais écrasés
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore',
+            file_options=ds.ParquetFileFormat().make_write_options(compression=self.compression),
+            file_visitor=lambda f: written.append(f.path),
+        )
+        self.rows_written += table.num_rows
+        self.files_written += len(written)
+
+    def export_json_dir(self, json_dir: str, pattern: str = '*_analyzed.json') -> Dict:
+        """
+        Exporte les JSON nouveaux ou modifiés depuis le dernier appel ; une
+        version modifiée est ajoutée à nouveau (read_cv_dataset ne garde que la
+        plus récente par cv_id)
+        """
+        manifest = self._load_manifest()
+        exported = skipped = failed = 0
+        for path in sorted(glob.glob(os.path.join(json_dir, pattern))):
+            st = os.stat(path)
+            signature = [st.st_size, st.st_mtime_ns]
+            if manifest.get(path) == signature:
+                skipped += 1
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.append(json.load(f), source_file=path)
+            except (OSError, ValueError):
+                failed += 1
+                continue
+            manifest[path] = signature
+            exported += 1
+        self.flush()
+        self._save_manifest(manifest)
+        return {'exported': exported, 'skipped': skipped, 'failed': failed,
+                'rows_written': self.rows_written, 'files_written': self.files_written}
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, manifest: Dict):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+
+# ==============================================================
+# LECTURE ET AGRÉGATS
+# ==============================================================
+def read_cv_dataset(dataset_dir: str, columns: List[str] = None, filter=None,
+                    latest_only: bool = True) -> 'pa.Table':
+    """
+    Lit le jeu de données (seulement les colonnes demandées) ;
+    filter est une expression pyarrow.dataset, ex. ds.field('detected_language') == 'fr'.
+    latest_only ne garde que la dernière version de chaque cv_id
+    """
+    _require_pyarrow()
+    dataset = ds.dataset(dataset_dir, format='parquet', partitioning='hive')
+    wanted = list(columns) if columns else dataset.schema.names
+    extra = [c for c in ('cv_id', 'exported_at') if latest_only and c not in wanted]
+    table = dataset.to_table(columns=wanted + extra, filter=filter)
+
+    if latest_only and table.num_rows:
+        # Tri (cv_id, exported_at décroissant) puis première ligne de chaque cv_id
+        table = table.sort_by([('cv_id', 'ascending'), ('exported_at', 'descending')])
+        ids = table.column('cv_id')
+        first = pc.not_equal(ids.slice(1), ids.slice(0, len(ids) - 1))
+        table = table.filter(pa.concat_arrays([pa.array([True]), first.combine_chunks()]))
+    return table.drop_columns(extra) if extra else table
+
+
+def skill_frequencies(table: 'pa.Table', top: int = 20) -> List[Tuple[str, int]]:
+    """Compétences les plus fréquentes (insensible à la casse)"""
+    skills = pc.utf8_lower(pc.utf8_trim_whitespace(pc.list_flatten(table.column('competences'))))
+    counts = pc.value_counts(skills)
+    order = pc.array_sort_indices(counts.field('counts'), order='descending')
+    counts = counts.take(order[:top])
+    return list(zip(counts.field('values').to_pylist(), counts.field('counts').to_pylist()))
+
+
+def language_mix(table: 'pa.Table') -> Dict[str, int]:
+    """Nombre de CV mentionnant chaque langue"""
+    langues = pc.struct_field(pc.list_flatten(table.column('langues')), 'langue')
+    counts = pc.value_counts(pc.utf8_capitalize(langues))
+    return dict(sorted(zip(counts.field('values').to_pylist(), counts.field('counts').to_pylist()),
+                       key=lambda item: -item[1]))
+
+
+def experience_distribution(table: 'pa.Table') -> Dict[int, int]:
+    """Nombre de CV par nombre d'expériences"""
+    counts = pc.value_counts(pc.list_value_length(table.column('experiences')).fill_null(0))
+    return dict(sorted(zip(counts.field('values').to_pylist(), counts.field('counts').to_pylist())))
@@ -0,0 +1,297 @@
+"""
+Module d'exécution en pipeline par étapes
+Rendu (PyMuPDF), prétraitement (OpenCV) et OCR (torch) tournent chacun
+dans leur propre pool de processus, reliés par des files bornées. Les
+pages transitent par multiprocessing.shared_memory (seul un descripteur
+nom/forme/type est sérialisé) : le rendu et le prétraitement du document
+N+1 se recouvrent avec l'OCR du document N.
+Un worker arrêté brutalement (OOM, segfault) interrompt le pipeline : les
+documents encore en vol sont rendus en erreur au lieu de bloquer les files.
+"""
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, List
+
+import numpy as np
+
+
+# ==============================================================
+# TRANSFERT DES PAGES EN MÉMOIRE PARTAGÉE
+# ==============================================================
+def to_shared(array: np.ndarray) -> Dict:
+    """Copie un tableau dans un segment partagé et retourne son descripteur"""
+    shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    del view
+    shm.close()
+    return {'shm': shm.name, 'shape': array.shape, 'dtype': str(array.dtype)}
+
+
+def consume_shared(descriptor: Dict, fn: Callable):
+    """
+    Applique fn à la page partagée sans la copier, puis libère le segment
+    (fn ne doit pas conserver de référence vers le tableau reçu)
+    """
+    shm = SharedMemory(name=descriptor['shm'])
+    try:
+        view = np.ndarray(descriptor['shape'], dtype=descriptor['dtype'], buffer=shm.buf)
+        result = fn(view)
+        del view
+    finally:
+        shm.close()
+        shm.unlink()
+    return result
+
+
+def release_shared(descriptor: Dict):
+    try:
+        shm = SharedMemory(name=descriptor['shm'])
+        shm.close()
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+# ==============================================================
+# ÉTAPES (exécutées dans les processus workers)
+# ==============================================================
+class RenderStage:
+    def __init__(self):
+        from .document_loader import CVDocumentLoader
+
+        self.loader = CVDocumentLoader()
+
+    def __call__(self, item: Dict) -> Dict:
+        # Seule la première page est reconnue par le pipeline d'analyse
+        image = self.loader.render_page(item['path'], 0)
+        item['page'] = to_shared(np.asarray(image))
+        return item
+
+
+class PreprocessStage:
+    def __init__(self):
+        from .image_preprocessor import CVImagePreprocessor
+
+        self.preprocessor = CVImagePreprocessor()
+
+    def __call__(self, item: Dict) -> Dict:
+        processed = consume_shared(item['page'], self.preprocessor.preprocess_image)
+        item['page'] = to_shared(processed)
+        return item
+
+
+class OCRStage:
+    def __init__(self):
+        from .ocr_engine import MultilingualOCREngine
+
+        self.engine = MultilingualOCREngine().warm_up()
+
+    def __call__(self, item: Dict) -> Dict:
+        page = item.pop('page')
+        item['ocr_data'] = consume_shared(page, self.engine.extract_text_with_language)
+        return item
+
+
+def _stage_worker(stage_name: str, stage_factory: Callable, in_queue, out_queue, stats_queue):
+    try:
+        handler = stage_factory()
+        init_error = None
+    except Exception as e:
+        # Modèles absents, mémoire insuffisante... : les documents reçus sont
+        # transmis en erreur pour que les étapes suivantes et le flux se terminent
+        logging.getLogger('pipeline').error(f"Étape {stage_name}: initialisation impossible: {e}")
+        handler, init_error = None, f"{stage_name}: initialisation impossible: {e}"
+    busy = 0.0
+    items = 0
+    while True:
+        item = in_queue.get()
+        if item is None:
+            break
+        if 'error' not in item and handler is None:
+            if 'page' in item:
+                release_shared(item.pop('page'))
+            item['error'] = init_error
+        elif 'error' not in item:
+            start = time.perf_counter()
+            try:
+                item = handler(item)
+            except Exception as e:
+                if 'page' in item:
+                    release_shared(item.pop('page'))
+                item['error'] = f"{stage_name}: {e}"
+            busy += time.perf_counter() - start
+            items += 1
+        out_queue.put(item)
+    stats_queue.put({'stage': stage_name, 'pid': os.getpid(), 'busy': busy, 'items': items})
+
+
+# ==============================================================
+# ORCHESTRATION
+# ==============================================================
+class StagedPipeline:
+    STAGES = (
+        ('rendu', RenderStage),
+        ('pretraitement', PreprocessStage),
+        ('ocr', OCRStage),
+    )
+
+    def __init__(self, render_workers: int = 1, preprocess_workers: int = 1,
+                 ocr_workers: int = 1, queue_size: int = 4, poll_interval: float = 0.5):
+        """
+        queue_size    borne chaque file inter-étapes (pages en vol en mémoire partagée)
+        poll_interval intervalle (s) de vérification que les workers sont en vie
+        """
+        self.workers = {'rendu': render_workers, 'pretraitement': preprocess_workers,
+                        'ocr': ocr_workers}
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger('pipeline')
+        self.last_stats = {}
+
+    def run(self, cv_files: List[str], on_result: Callable[[Dict], None]) -> Dict:
+        """
+        Fait passer les fichiers dans les trois étapes ; on_result(item) est
+        appelée dans le processus principal pour chaque document terminé
+        (item contient 'path' et 'ocr_data' ou 'error')
+        """
+        # Un seul resource_tracker partagé : les segments créés par une étape
+        # et libérés par la suivante ne sont ni comptés deux fois ni fuités
+        resource_tracker.ensure_running()
+
+        queues = [mp.Queue(maxsize=self.queue_size) for _ in range(len(self.STAGES) + 1)]
+        stats_queue = mp.Queue()
+        pools = []
+        for index, (name, factory) in enumerate(self.STAGES):
+            pool = [mp.Process(target=_stage_worker, name=f"{name}-{i}",
+                               args=(name, factory, queues[index], queues[index + 1], stats_queue),
+                               daemon=True)
+                    for i in range(self.workers[name])]
+            for process in pool:
+                process.start()
+            pools.append(pool)
+
+        start = time.perf_counter()
+        stop = threading.Event()
+
+        def put(target, item) -> bool:
+            # put() bloquant interruptible : une étape morte ne vide plus sa file
+            while not stop.is_set():
+                try:
+                    target.put(item, timeout=self.poll_interval)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def feed():
+            for index, path in enumerate(cv_files):
+                if not put(queues[0], {'id': index, 'path': path}):
+                    return
+            # Fin de flux : chaque étape ne transmet ses sentinelles qu'une
+            # fois tous les workers de l'étape précédente terminés
+            for index, pool in enumerate(pools):
+                for _ in pool:
+                    if not put(queues[index], None):
+                        return
+                for process in pool:
+                    while process.is_alive():
+                        if stop.is_set():
+                            return
+                        process.join(self.poll_interval)
+            put(queues[-1], None)
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+
+        pending = dict(enumerate(cv_files))
+        done = 0
+        failure = None
+
+        def deliver(item):
+            nonlocal done
+            pending.pop(item.pop('id'), None)
+            done += 1
+            on_result(item)
+
+        while True:
+            failure = self._dead_worker(pools)
+            if failure is not None:
+                break
+            try:
+                item = queues[-1].get(timeout=self.poll_interval)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+            deliver(item)
+
+        if failure is not None:
+            self.logger.error(f"Pipeline interrompu: {failure}, {len(pending)} document(s) en vol")
+            stop.set()
+            for pool in pools:
+                for process in pool:
+                    if process.is_alive():
+                        process.terminate()
+                    process.join()
+            # Les documents déjà terminés sont rendus ; les pages encore dans les
+            # files intermédiaires sont libérées
+            for index, target in enumerate(queues):
+                while True:
+                    try:
+                        item = target.get(timeout=0.05)
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        continue
+                    if index == len(queues) - 1:
+                        deliver(item)
+                    elif 'page' in item:
+                        release_shared(item['page'])
+            for target in queues:
+                # Données non lues d'un worker tué : ne pas bloquer la sortie du processus
+                target.cancel_join_thread()
+            for index, path in list(pending.items()):
+                deliver({'id': index, 'path': path, 'error': f"pipeline: {failure}"})
+        feeder.join()
+        wall = time.perf_counter() - start
+
+        stage_stats = {name: {'workers': self.workers[name], 'busy_s': 0.0, 'items': 0}
+                       for name, _ in self.STAGES}
+        for _ in range(sum(len(pool) for pool in pools)):
+            try:
+                # Un worker tué n'envoie pas ses statistiques
+                stat = stats_queue.get(timeout=1.0 if failure is None else 0.05)
+            except queue.Empty:
+                break
+            stage_stats[stat['stage']]['busy_s'] += stat['busy']
+            stage_stats[stat['stage']]['items'] += stat['items']
+        for stats in stage_stats.values():
+            stats['utilization'] = round(stats['busy_s'] / (wall * stats['workers']), 3) if wall else 0.0
+            stats['busy_s'] = round(stats['busy_s'], 3)
+
+        self.last_stats = {
+            'documents': done,
+            'wall_s': round(wall, 3),
+            'throughput_per_minute': round(done * 60 / wall, 2) if wall else 0.0,
+            'stages': stage_stats,
+        }
+        if failure is not None:
+            self.last_stats['error'] = failure
+        self.logger.info(f"Pipeline terminé: {self.last_stats}")
+        return self.last_stats
+
+    @staticmethod
+    def _dead_worker(pools: List[List[mp.Process]]):
+        """Description du premier worker arrêté anormalement, ou None"""
+        for pool in pools:
+            for process in pool:
+                if process.exitcode not in (None, 0):
+                    return f"worker {process.name} arrêté brutalement (code {process.exitcode})"
+        return None
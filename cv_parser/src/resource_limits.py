@@ -0,0 +1,134 @@
+"""
+Module de garde-fous sur les ressources (documents hostiles ou surdimensionnés)
+Les limites sont vérifiées AVANT les allocations coûteuses (rendu PDF,
+décodage d'image) : le document échoue vite avec un code d'erreur clair,
+ou est dégradé (N premières pages, DPI réduit).
+
+Variables d'environnement :
+    CV_MAX_PAGES            nombre maximal de pages (défaut: 10)
+    CV_MAX_PAGE_PIXELS      pixels maximum par page rendue (défaut: 40 000 000)
+    CV_MAX_DECODED_BYTES    octets décodés maximum pour le document (défaut: 400 Mo)
+    CV_STAGE_TIMEOUT        durée maximale d'une étape en secondes (défaut: 120)
+    CV_DEGRADE              1 = dégrader au lieu d'échouer (défaut: 1)
+    CV_DEGRADED_PAGES       pages conservées en mode dégradé (défaut: 3)
+    CV_MIN_DPI              DPI minimal accepté en mode dégradé (défaut: 100)
+"""
+import os
+import time
+
+
+# Code de sortie de main.py lorsqu'une limite est dépassée
+EXIT_RESOURCE_LIMIT = 3
+
+
+class ResourceLimitError(Exception):
+    """Dépassement d'une limite de ressource, avec un code stable"""
+
+    TOO_MANY_PAGES = 'TOO_MANY_PAGES'
+    PAGE_TOO_LARGE = 'PAGE_TOO_LARGE'
+    DECODED_SIZE_EXCEEDED = 'DECODED_SIZE_EXCEEDED'
+    STAGE_TIMEOUT = 'STAGE_TIMEOUT'
+
+    def __init__(self, code: str, message: str):
+        super().__init__(f"[{code}] {message}")
+        self.code = code
+        self.message = message
+
+    def __reduce__(self):
+        # Transmise telle quelle depuis les workers (code conservé)
+        return (ResourceLimitError, (self.code, self.message))
+
+
+class ResourceLimits:
+    def __init__(self, max_pages: int = 10, max_page_pixels: int = 40_000_000,
+                 max_decoded_bytes: int = 400 * 1024 * 1024, stage_timeout: float = 120.0,
+                 degrade: bool = True, degraded_pages: int = 3, min_dpi: int = 100):
+        self.max_pages = max_pages
+        self.max_page_pixels = max_page_pixels
+        self.max_decoded_bytes = max_decoded_bytes
+        self.stage_timeout = stage_timeout
+        self.degrade = degrade
+        self.degraded_pages = degraded_pages
+        self.min_dpi = min_dpi
+
+    @classmethod
+    def from_env(cls):
+        defaults = cls()
+        return cls(
+            max_pages=int(os.getenv('CV_MAX_PAGES', defaults.max_pages)),
+            max_page_pixels=int(os.getenv('CV_MAX_PAGE_PIXELS', defaults.max_page_pixels)),
+            max_decoded_bytes=int(os.getenv('CV_MAX_DECODED_BYTES', defaults.max_decoded_bytes)),
+            stage_timeout=float(os.getenv('CV_STAGE_TIMEOUT', defaults.stage_timeout)),
+            degrade=os.getenv('CV_DEGRADE', '1') not in ('0', 'false', 'False'),
+            degraded_pages=int(os.getenv('CV_DEGRADED_PAGES', defaults.degraded_pages)),
+            min_dpi=int(os.getenv('CV_MIN_DPI', defaults.min_dpi)),
+        )
+
+    # ==============================================================
+    # VÉRIFICATIONS (avant allocation)
+    # ==============================================================
+    def page_count(self, total_pages: int) -> int:
+        """Retourne le nombre de pages à traiter, ou lève TOO_MANY_PAGES"""
+        if total_pages <= self.max_pages:
+            return total_pages
+        if self.degrade:
+            return min(self.degraded_pages, self.max_pages)
+        raise ResourceLimitError(
+            ResourceLimitError.TOO_MANY_PAGES,
+            f"{total_pages} pages (maximum {self.max_pages})"
+        )
+
+    def render_dpi(self, width_pt: float, height_pt: float, dpi: float) -> float:
+        """
+        Retourne le DPI de rendu d'une page PDF (dimensions en points),
+        réduit si besoin pour respecter max_page_pixels
+        """
+        pixels = (width_pt * dpi / 72) * (height_pt * dpi / 72)
+        if pixels <= self.max_page_pixels:
+            return dpi
+        reduced = 72 * (self.max_page_pixels / max(width_pt * height_pt, 1)) ** 0.5
+        if self.degrade and reduced >= self.min_dpi:
+            return int(reduced)
+        raise ResourceLimitError(
+            ResourceLimitError.PAGE_TOO_LARGE,
+            f"page de {width_pt:.0f}x{height_pt:.0f} pt: {pixels:,.0f} pixels à {dpi} DPI "
+            f"(maximum {self.max_page_pixels:,})"
+        )
+
+    def check_image_size(self, width: int, height: int):
+        """Lève PAGE_TOO_LARGE si l'image dépasse max_page_pixels"""
+        if width * height > self.max_page_pixels:
+            raise ResourceLimitError(
+                ResourceLimitError.PAGE_TOO_LARGE,
+                f"image de {width}x{height} pixels (maximum {self.max_page_pixels:,})"
+            )
+
+    def check_decoded_bytes(self, decoded_bytes: int):
+        if decoded_bytes > self.max_decoded_bytes:
+            raise ResourceLimitError(
+                ResourceLimitError.DECODED_SIZE_EXCEEDED,
+                f"{decoded_bytes:,} octets décodés (maximum {self.max_decoded_bytes:,})"
+            )
+
+    def stage(self, name: str):
+        return StageDeadline(name, self.stage_timeout)
+
+
+class StageDeadline:
+    """Budget de temps d'une étape, vérifié entre deux unités de travail"""
+
+    def __init__(self, name: str, timeout: float):
+        self.name = name
+        self.timeout = timeout
+        self.start = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+    def check(self):
+        if self.timeout and self.elapsed > self.timeout:
+            raise ResourceLimitError(
+                ResourceLimitError.STAGE_TIMEOUT,
+                f"étape '{self.name}' au-delà de {self.timeout:.0f}s"
+            )
@@ -0,0 +1,167 @@
+"""
+Module d'ordonnancement par voies de priorité
+Les analyses interactives (un candidat attend dans l'interface) passent
+devant les retraitements en masse : une capacité de workers leur est
+réservée, chaque voie a sa propre limite de file, et la priorité est
+réévaluée à chaque fin de document (préemption entre documents).
+Les requêtes en attente ne consomment pas de thread (asyncio).
+
+Variables d'environnement :
+    CV_WORKERS                 analyses simultanées (défaut: 2)
+    CV_RESERVED_INTERACTIVE    workers réservés à la voie interactive (défaut: 1)
+    CV_QUEUE_INTERACTIVE       taille max de la file interactive (défaut: 50)
+    CV_QUEUE_BULK              taille max de la file bulk (défaut: 1000)
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, List
+
+from . import metrics
+
+
+class QueueFullError(Exception):
+    """La file de la voie demandée est pleine"""
+
+    def __init__(self, lane: str, limit: int):
+        super().__init__(f"file '{lane}' pleine ({limit} en attente)")
+        self.lane = lane
+        self.limit = limit
+
+
+class Lane:
+    def __init__(self, name: str, max_queue: int, reserved: int = 0):
+        """
+        reserved : workers que les voies de priorité inférieure ne peuvent pas occuper
+        """
+        self.name = name
+        self.max_queue = max_queue
+        self.reserved = reserved
+        self.queue = deque()
+        self.running = 0
+        # Statistiques d'attente
+        self.started = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.recent_waits = deque(maxlen=1000)
+
+
+class PriorityScheduler:
+    def __init__(self, workers: int = 2, lanes: List[Lane] = None):
+        """
+        lanes est ordonnée de la plus prioritaire à la moins prioritaire
+        """
+        self.workers = workers
+        self.lanes = lanes or [Lane('interactive', 50, reserved=1), Lane('bulk', 1000)]
+        self._by_name: Dict[str, Lane] = {lane.name: lane for lane in self.lanes}
+        self._cond = None  # créée dans la boucle asyncio au premier usage
+
+    @classmethod
+    def from_env(cls):
+        workers = int(os.getenv('CV_WORKERS', '2'))
+        reserved = min(int(os.getenv('CV_RESERVED_INTERACTIVE', '1')), max(workers - 1, 0))
+        return cls(workers, [
+            Lane('interactive', int(os.getenv('CV_QUEUE_INTERACTIVE', '50')), reserved=reserved),
+            Lane('bulk', int(os.getenv('CV_QUEUE_BULK', '1000'))),
+        ])
+
+    @property
+    def lane_names(self) -> List[str]:
+        return [lane.name for lane in self.lanes]
+
+    # ==============================================================
+    # ADMISSION
+    # ==============================================================
+    def _capacity(self, lane: Lane) -> int:
+        """Workers utilisables par une voie : tout sauf ce que réservent les voies prioritaires"""
+        position = self.lanes.index(lane)
+        return self.workers - sum(l.reserved for l in self.lanes[:position])
+
+    def _can_start(self, lane: Lane, ticket) -> bool:
+        if lane.queue[0] is not ticket:
+            return False
+        running = sum(l.running for l in self.lanes)
+        if running >= self.workers:
+            return False
+        position = self.lanes.index(lane)
+        # Une voie prioritaire en attente passe toujours devant
+        if any(l.queue for l in self.lanes[:position]):
+            return False
+        running_at_or_below = sum(l.running for l in self.lanes[position:])
+        return running_at_or_below < self._capacity(lane)
+
+    @asynccontextmanager
+    async def slot(self, lane_name: str):
+        """
+        Attend un worker libre pour la voie puis le libère en sortie :
+            async with scheduler.slot('bulk'):
+                await analyser(...)
+        """
+        lane = self._by_name.get(lane_name)
+        if lane is None:
+            raise ValueError(f"Voie inconnue: {lane_name}. Voies: {self.lane_names}")
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+
+        ticket = object()
+        enqueued_at = time.monotonic()
+        async with self._cond:
+            if len(lane.queue) >= lane.max_queue:
+                lane.rejected += 1
+                metrics.inc('cv_queue_rejected_total', lane=lane.name)
+                raise QueueFullError(lane.name, lane.max_queue)
+            lane.queue.append(ticket)
+            try:
+                await self._cond.wait_for(lambda: self._can_start(lane, ticket))
+            except BaseException:
+                # Client parti / requête annulée : on libère sa place dans la file
+                lane.queue.remove(ticket)
+                self._cond.notify_all()
+                raise
+            lane.queue.popleft()
+            lane.running += 1
+            waited = time.monotonic() - enqueued_at
+            lane.started += 1
+            lane.wait_total += waited
+            lane.wait_max = max(lane.wait_max, waited)
+            lane.recent_waits.append(waited)
+            metrics.observe('cv_queue_wait_seconds', waited, lane=lane.name)
+            # Le suivant dans la file peut peut-être démarrer aussi
+            self._cond.notify_all()
+        try:
+            yield
+        finally:
+            async with self._cond:
+                lane.running -= 1
+                self._cond.notify_all()
+
+    # ==============================================================
+    # MÉTRIQUES
+    # ==============================================================
+    def stats(self) -> Dict:
+        lanes = {}
+        for lane in self.lanes:
+            waits = sorted(lane.recent_waits)
+            lanes[lane.name] = {
+                'queued': len(lane.queue),
+                'running': lane.running,
+                'capacity': self._capacity(lane),
+                'max_queue': lane.max_queue,
+                'started': lane.started,
+                'rejected': lane.rejected,
+                'wait_avg_s': round(lane.wait_total / lane.started, 3) if lane.started else 0.0,
+                'wait_max_s': round(lane.wait_max, 3),
+                'wait_p50_s': round(_percentile(waits, 0.50), 3),
+                'wait_p95_s': round(_percentile(waits, 0.95), 3),
+            }
+        return {'workers': self.workers, 'lanes': lanes}
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
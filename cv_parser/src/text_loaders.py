@@ -0,0 +1,243 @@
+"""
+Module de chargement direct des CV nés numériques (DOCX, ODT, HTML, TXT)
+Le texte est extrait sans passer par le rendu image ni l'OCR, avec des
+indices de mise en page : titres isolés sur leur propre ligne (précédés
+d'une ligne vide), éléments de liste et cellules de tableau ligne par ligne.
+Le résultat alimente directement BilingualTextProcessor.extract_structured_sections.
+"""
+import os
+import re
+import zipfile
+from html.parser import HTMLParser
+from typing import Dict, List, Tuple
+from xml.etree import ElementTree
+
+from .resource_limits import ResourceLimits, ResourceLimitError
+
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+TEXT_NS = '{urn:oasis:names:tc:opendocument:xmlns:text:1.0}'
+TABLE_NS = '{urn:oasis:names:tc:opendocument:xmlns:table:1.0}'
+DRAW_NS = '{urn:oasis:names:tc:opendocument:xmlns:drawing:1.0}'
+
+
+class CVTextLoader:
+    def __init__(self, limits: ResourceLimits = None):
+        self.supported_formats = ['.docx', '.odt', '.html', '.htm', '.txt']
+        self.limits = limits or ResourceLimits.from_env()
+
+    def load_text(self, file_path: str) -> Dict:
+        """
+        Retourne {'text', 'lines', 'headings', 'format'} pour un CV texte
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Fichier introuvable: {file_path}")
+
+        file_ext = os.path.splitext(file_path)[1].lower()
+        try:
+            if file_ext == '.docx':
+                blocks = self._docx_blocks(file_path)
+            elif file_ext == '.odt':
+                blocks = self._odt_blocks(file_path)
+            elif file_ext in ('.html', '.htm'):
+                blocks = self._html_blocks(self._read_text_file(file_path))
+            elif file_ext == '.txt':
+                blocks = [('paragraph', line) for line in self._read_text_file(file_path).split('\n')]
+            else:
+                raise ValueError(f"Format non supporté: {file_ext}. Formats supportés: {self.supported_formats}")
+        except (ResourceLimitError, ValueError):
+            raise
+        except Exception as e:
+            raise Exception(f"Erreur extraction texte {file_path}: {str(e)}")
+
+        lines, headings = self._layout(blocks)
+        return {
+            'text': '\n'.join(lines).strip(),
+            'lines': [l for l in lines if l],
+            'headings': headings,
+            'format': file_ext.lstrip('.'),
+        }
+
+    # ==============================================================
+    # MISE EN FORME
+    # ==============================================================
+    @staticmethod
+    def _layout(blocks: List[Tuple[str, str]]) -> Tuple[List[str], List[str]]:
+        lines, headings = [], []
+        for kind, text in blocks:
+            for part in text.split('\n'):
+                part = re.sub(r'[ \t ]+', ' ', part).strip()
+                if kind == 'heading' and part:
+                    if lines and lines[-1]:
+                        lines.append('')
+                    headings.append(part)
+                    lines.append(part)
+                elif part:
+                    lines.append(part)
+                elif lines and lines[-1]:
+                    lines.append('')
+        return lines, headings
+
+    def _read_text_file(self, file_path: str) -> str:
+        self.limits.check_decoded_bytes(os.path.getsize(file_path))
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        for encoding in ('utf-8-sig', 'cp1252'):
+            try:
+                return raw.decode(encoding).replace('\r\n', '\n').replace('\r', '\n')
+            except UnicodeDecodeError:
+                continue
+        return raw.decode('latin-1').replace('\r\n', '\n').replace('\r', '\n')
+
+    def _read_zip_xml(self, archive: zipfile.ZipFile, name: str):
+        # Taille décompressée vérifiée avant lecture (archives piégées)
+        self.limits.check_decoded_bytes(archive.getinfo(name).file_size)
+        return ElementTree.fromstring(archive.read(name))
+
+    # ==============================================================
+    # DOCX (WordprocessingML)
+    # ==============================================================
+    def _docx_blocks(self, file_path: str) -> List[Tuple[str, str]]:
+        blocks = []
+        with zipfile.ZipFile(file_path) as archive:
+            names = archive.namelist()
+            # Les en-têtes contiennent souvent le nom et les coordonnées
+            parts = sorted(n for n in names if re.match(r'word/header\d*\.xml$', n))
+            parts.append('word/document.xml')
+            for name in parts:
+                if name in names:
+                    self._docx_walk(self._read_zip_xml(archive, name), blocks)
+        return blocks
+
+    def _docx_walk(self, element, blocks):
+        for child in element:
+            if child.tag == MC_FALLBACK:
+                continue  # doublon VML des zones de texte
+            if child.tag == W_NS + 'p':
+                blocks.append((self._docx_kind(child), self._docx_text(child)))
+                self._docx_walk(child, blocks)  # zones de texte imbriquées
+            elif child.tag == W_NS + 'tc':
+                self._docx_walk(child, blocks)
+                blocks.append(('paragraph', ''))
+            else:
+                self._docx_walk(child, blocks)
+
+    @staticmethod
+    def _docx_kind(paragraph) -> str:
+        style = paragraph.find(f'{W_NS}pPr/{W_NS}pStyle')
+        if style is not None:
+            value = style.get(W_NS + 'val', '').lower()
+            if value.startswith(('heading', 'titre', 'title')):
+                return 'heading'
+        if paragraph.find(f'{W_NS}pPr/{W_NS}numPr') is not None:
+            return 'list'
+        return 'paragraph'
+
+    def _docx_text(self, element) -> str:
+        parts = []
+        for child in element:
+            if child.tag in (W_NS + 'txbxContent', MC_FALLBACK):
+                continue
+            if child.tag == W_NS + 't':
+                parts.append(child.text or '')
+            elif child.tag == W_NS + 'tab':
+                parts.append('\t')
+            elif child.tag in (W_NS + 'br', W_NS + 'cr'):
+                parts.append('\n')
+            else:
+                parts.append(self._docx_text(child))
+        return ''.join(parts)
+
+    # ==============================================================
+    # ODT (OpenDocument)
+    # ==============================================================
+    def _odt_blocks(self, file_path: str) -> List[Tuple[str, str]]:
+        blocks = []
+        with zipfile.ZipFile(file_path) as archive:
+            self._odt_walk(self._read_zip_xml(archive, 'content.xml'), blocks, in_list=False)
+        return blocks
+
+    def _odt_walk(self, element, blocks, in_list: bool):
+        for child in element:
+            if child.tag == TEXT_NS + 'h':
+                blocks.append(('heading', self._odt_text(child)))
+            elif child.tag == TEXT_NS + 'p':
+                blocks.append(('list' if in_list else 'paragraph', self._odt_text(child)))
+                self._odt_walk(child, blocks, in_list)  # cadres imbriqués
+            elif child.tag == TABLE_NS + 'table-cell':
+                self._odt_walk(child, blocks, in_list)
+                blocks.append(('paragraph', ''))
+            else:
+                self._odt_walk(child, blocks, in_list or child.tag == TEXT_NS + 'list-item')
+
+    def _odt_text(self, element) -> str:
+        parts = [element.text or '']
+        for child in element:
+            if child.tag == DRAW_NS + 'frame':
+                pass  # contenu des cadres émis séparément par _odt_walk
+            elif child.tag == TEXT_NS + 's':
+                parts.append(' ' * int(child.get(TEXT_NS + 'c', '1')))
+            elif child.tag == TEXT_NS + 'tab':
+                parts.append('\t')
+            elif child.tag == TEXT_NS + 'line-break':
+                parts.append('\n')
+            else:
+                parts.append(self._odt_text(child))
+            parts.append(child.tail or '')
+        return ''.join(parts)
+
+    # ==============================================================
+    # HTML
+    # ==============================================================
+    @staticmethod
+    def _html_blocks(html: str) -> List[Tuple[str, str]]:
+        parser = _CVHTMLParser()
+        parser.feed(html)
+        parser.close()
+        return parser.flush()
+
+
+class _CVHTMLParser(HTMLParser):
+    BLOCK_TAGS = {'p', 'div', 'section', 'article', 'header', 'footer', 'ul', 'ol', 'li',
+                  'tr', 'td', 'th', 'table', 'br', 'hr', 'address', 'blockquote', 'dt', 'dd'}
+    HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+    SKIP_TAGS = {'script', 'style', 'head', 'title', 'noscript', 'template'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks: List[Tuple[str, str]] = []
+        self._buffer: List[str] = []
+        self._kind = 'paragraph'
+        self._skip = 0
+
+    def flush(self) -> List[Tuple[str, str]]:
+        self._emit()
+        return self.blocks
+
+    def _emit(self, next_kind: str = 'paragraph'):
+        text = ''.join(self._buffer).strip()
+        if text:
+            self.blocks.append((self._kind, text))
+        self._buffer = []
+        self._kind = next_kind
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip += 1
+        elif tag in self.HEADING_TAGS:
+            self._emit('heading')
+        elif tag == 'li':
+            self._emit('list')
+        elif tag in self.BLOCK_TAGS:
+            self._emit()
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in self.HEADING_TAGS or tag in self.BLOCK_TAGS:
+            self._emit()
+
+    def handle_data(self, data):
+        if not self._skip:
+            self._buffer.append(re.sub(r'\s+', ' ', data))
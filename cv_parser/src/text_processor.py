@@ -3,7 +3,10 @@ Module de nettoyage et structuration du texte pour CV bilingues
 Version corrigée avec meilleure détection de sections
 """
 import re
-from typing import List, Dict
+from typing import List, Dict, Union
+
+from .language_id import identify_language
+from .ocr_blocks import OCRBlocks
 
 
 class BilingualTextProcessor:
@@ -40,16 +43,17 @@ class BilingualTextProcessor:
             }
         }
 
-    def clean_ocr_text(self, ocr_results: List[dict]) -> str:
+    def clean_ocr_text(self, ocr_results: Union[OCRBlocks, List[dict]]) -> str:
         """Nettoie et assemble le texte extrait par l'OCR"""
-        if not ocr_results:
+        if not len(ocr_results):
             return ""
-        
-        # Tri par position verticale puis horizontale
-        sorted_results = sorted(
-            ocr_results,
-            key=lambda x: (x['bbox'][0][1], x['bbox'][0][0])
-        )
+        blocks = OCRBlocks.from_results(ocr_results)
+
+        # Blocs non vides, triés par position verticale puis horizontale
+        blocks = blocks.filter(blocks.lengths > 0)
+        order = blocks.reading_order()
+        texts = blocks.texts
+        y_positions = blocks.top_left[order, 1].tolist()
 
         # Assemblage intelligent du texte
         lines = []
@@ -57,22 +61,15 @@ class BilingualTextProcessor:
         current_y = None
         y_threshold = 15
 
-        for result in sorted_results:
-            text = result['text'].strip()
-            if not text:
-                continue
-                
-            y_pos = result['bbox'][0][1]
-
+        for index, y_pos in zip(order.tolist(), y_positions):
             # Nouvelle ligne si le Y est trop différent
             if current_y is None or abs(y_pos - current_y) > y_threshold:
                 if current_line:
-                    line_text = ' '.join(current_line)
-                    lines.append(line_text)
+                    lines.append(' '.join(current_line))
                     current_line = []
                 current_y = y_pos
 
-            current_line.append(text)
+            current_line.append(texts[index])
 
         # Ajouter la dernière ligne
         if current_line:
@@ -105,27 +102,21 @@ class BilingualTextProcessor:
         return text.strip()
 
     def detect_document_language(self, text: str) -> str:
-        """Détecte la langue principale du document"""
+        """
+        Détecte la langue principale du document ('fr', 'en', 'ar', ou 'mixed'
+        pour un CV bilingue : aucune langue ne couvre 1,2 fois plus de texte que l'autre)
+        """
         if not text:
             return 'fr'
-        
-        text_lower = text.lower()
-
-        fr_indicators = 0
-        for section in self.section_keywords.values():
-            for keyword in section['fr']:
-                pattern = r'\b' + re.escape(keyword) + r'\b'
-                fr_indicators += len(re.findall(pattern, text_lower))
 
-        en_indicators = 0
-        for section in self.section_keywords.values():
-            for keyword in section['en']:
-                pattern = r'\b' + re.escape(keyword) + r'\b'
-                en_indicators += len(re.findall(pattern, text_lower))
+        result = identify_language(text)
+        if result['language'] == 'ar' or not result['confidence']:
+            return result['language']
 
-        if fr_indicators > en_indicators * 1.2:
+        shares = result['shares']
+        if shares['fr'] > shares['en'] * 1.2:
             return 'fr'
-        elif en_indicators > fr_indicators * 1.2:
+        elif shares['en'] > shares['fr'] * 1.2:
             return 'en'
         else:
             return 'mixed'
@@ -152,7 +143,8 @@ class BilingualTextProcessor:
             for section_name, keywords in self.section_keywords.items():
                 lang_keywords = keywords.get(language, [])
                 
-                if language == 'mixed':
+                # Mots-clés de section disponibles en français et anglais seulement
+                if language not in ('fr', 'en'):
                     lang_keywords = keywords['fr'] + keywords['en']
                 
                 # Chercher si un mot-clé correspond EXACTEMENT
@@ -0,0 +1,449 @@
+"""
+Module de pool de workers recyclés
+Chaque document s'exécute dans un processus worker déjà chaud, avec une
+durée maximale par document : un worker bloqué est tué puis remplacé sans
+interrompre le reste du lot. Les workers sont recyclés après N documents
+ou lorsque leur mémoire résidente (RSS) dépasse un seuil, ce qui purge la
+fragmentation accumulée par torch / OpenCV. Le successeur charge ses
+modèles en arrière-plan (dès le dernier document de son prédécesseur pour
+un recyclage planifié) : le chargement ne bloque pas les documents.
+
+submit() renvoie un concurrent.futures.Future : le pool remplace
+directement un ProcessPoolExecutor (wait(), as_completed(), asyncio.wrap_future).
+
+Variables d'environnement :
+    CV_TASK_TIMEOUT         durée maximale d'un document en secondes (défaut: 300)
+    CV_WORKER_MAX_TASKS     documents avant recyclage d'un worker (défaut: 50, 0 = jamais)
+    CV_WORKER_MAX_RSS_MB    RSS déclenchant le recyclage, en Mo (défaut: 3072, 0 = jamais)
+
+Si l'initialisation échoue plusieurs fois de suite (poids absents, GPU
+indisponible...), les documents en attente échouent aussitôt et les workers
+sont relancés avec un délai croissant (1 s, 2 s, 4 s... 60 s au plus) jusqu'à
+ce que l'un d'eux démarre ; stats()['startup'] décrit cet état.
+"""
+import logging
+import multiprocessing as mp
+import os
+import pickle
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.connection import wait as wait_connections
+from typing import Callable, Dict, List, Optional
+
+from . import metrics
+
+
+class WorkerTimeoutError(Exception):
+    """Le document a dépassé la durée maximale : son worker a été tué"""
+
+    def __init__(self, timeout: float, pid: int):
+        super().__init__(f"document abandonné après {timeout:g}s (worker {pid} tué)")
+        self.timeout = timeout
+        self.pid = pid
+
+    def __reduce__(self):
+        return (WorkerTimeoutError, (self.timeout, self.pid))
+
+
+class WorkerCrashedError(Exception):
+    """Le worker s'est arrêté brutalement pendant le document (OOM, segfault...)"""
+
+
+def current_rss_mb() -> float:
+    """Mémoire résidente actuelle du processus, en Mo"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        # Repli hors Linux : pic de RSS (Ko sous Linux, octets sous macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 if peak < 1 << 32 else peak / (1024 * 1024)
+
+
+def _worker_main(conn, initializer: Optional[Callable]):
+    """Boucle d'un worker : initialisation (modèles) puis un document par message"""
+    # Ctrl+C est géré par le processus parent, qui arrête les workers proprement
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Métriques propres au worker (rien d'hérité du parent en cas de fork)
+    metrics.REGISTRY.reset()
+    started = time.perf_counter()
+    if initializer is not None:
+        initializer()
+    conn.send(('ready', time.perf_counter() - started, current_rss_mb(), metrics.snapshot()))
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        task_id, fn, args = task
+        try:
+            outcome = (True, fn(*args))
+        except Exception as e:
+            try:
+                pickle.loads(pickle.dumps(e))
+                outcome = (False, e)
+            except Exception:
+                outcome = (False, RuntimeError(f"{type(e).__name__}: {e}"))
+        conn.send(('done', task_id, outcome, current_rss_mb(), metrics.snapshot()))
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.ready = False
+        self.spawned_at = time.monotonic()
+        self.task = None          # (task_id, future)
+        self.deadline = None
+        self.tasks_done = 0
+        self.rss_mb = 0.0
+        self.successor_spawned = False
+        self.metrics = None       # dernier instantané cumulé du registre du worker
+
+
+class RecyclingWorkerPool:
+    def __init__(self, workers: int = 2, initializer: Optional[Callable] = None,
+                 task_timeout: float = 300.0, max_tasks_per_worker: int = 50,
+                 max_rss_mb: float = 3072.0, mp_context=None, history_size: int = 1000,
+                 startup_attempts: int = 3, retry_delay: float = 1.0, max_retry_delay: float = 60.0):
+        """
+        task_timeout          : secondes par document avant de tuer le worker (0 = illimité)
+        max_tasks_per_worker  : documents avant recyclage (0 = jamais)
+        max_rss_mb            : RSS après un document déclenchant le recyclage (0 = jamais)
+        startup_attempts      : échecs d'initialisation consécutifs avant de relancer avec délai
+        retry_delay           : premier délai de relance, doublé à chaque échec (max_retry_delay au plus)
+        """
+        self.workers = workers
+        self.initializer = initializer
+        self.task_timeout = task_timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.max_rss_mb = max_rss_mb
+        self.startup_attempts = startup_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.ctx = mp_context or mp.get_context()
+        self.logger = logging.getLogger('worker_pool')
+
+        self._pending = deque()
+        self._workers: List[_Worker] = []
+        # Réentrant : les callbacks des futures peuvent resoumettre depuis le gestionnaire
+        self._lock = threading.RLock()
+        self._wake_recv, self._wake_send = self.ctx.Pipe(duplex=False)
+        self._next_task = 0
+        self._shutdown = False
+        self._startup_failures = 0
+        self._startup_error = None
+        self._respawn_at: List[float] = []  # relances différées (time.monotonic)
+        self._manager = None
+
+        # Métriques des workers déjà arrêtés (les compteurs ne reculent pas)
+        self._retired_metrics = metrics.MetricsRegistry()
+        self.started_at = time.time()
+        self.rss_history = deque(maxlen=history_size)  # (horodatage, pid, rss_mb, documents)
+        self.warmup_seconds = deque(maxlen=100)
+        self.counters = {
+            'tasks_submitted': 0,
+            'tasks_completed': 0,
+            'tasks_failed': 0,
+            'timeouts': 0,
+            'crashes': 0,
+            'workers_started': 0,
+            'recycled_max_tasks': 0,
+            'recycled_rss': 0,
+        }
+
+    @classmethod
+    def from_env(cls, workers: int = 2, initializer: Optional[Callable] = None, **kwargs):
+        """Les arguments explicites priment sur les variables d'environnement"""
+        options = {
+            'task_timeout': float(os.getenv('CV_TASK_TIMEOUT', '300')),
+            'max_tasks_per_worker': int(os.getenv('CV_WORKER_MAX_TASKS', '50')),
+            'max_rss_mb': float(os.getenv('CV_WORKER_MAX_RSS_MB', '3072')),
+        }
+        options.update(kwargs)
+        return cls(workers=workers, initializer=initializer, **options)
+
+    # ==============================================================
+    # API
+    # ==============================================================
+    def start(self) -> 'RecyclingWorkerPool':
+        """Démarre les workers (chargement des modèles en arrière-plan)"""
+        with self._lock:
+            if self._manager is not None:
+                return self
+            for _ in range(self.workers):
+                self._spawn()
+            self._manager = threading.Thread(target=self._manage, name='worker-pool', daemon=True)
+            self._manager.start()
+        return self
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """fn et args doivent être sérialisables (fonction de niveau module)"""
+        if self._shutdown:
+            raise RuntimeError("pool arrêté")
+        self.start()
+        future = Future()
+        with self._lock:
+            self._pending.append((future, fn, args))
+            self.counters['tasks_submitted'] += 1
+        self._wake()
+        return future
+
+    def shutdown(self, wait: bool = True):
+        """
+        wait=True : termine les documents en attente et en cours puis arrête les workers.
+        wait=False : annule les documents en attente et rend la main aussitôt ; le
+        gestionnaire arrête les workers en arrière-plan après les documents en cours
+        """
+        with self._lock:
+            self._shutdown = True
+            self._respawn_at.clear()
+            if not wait:
+                for future, _, _ in self._pending:
+                    future.cancel()
+                self._pending.clear()
+        self._wake()
+        if wait and self._manager is not None:
+            self._manager.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.shutdown(wait=True)
+
+    def metrics_snapshots(self) -> List[Dict]:
+        """Instantanés cumulés des métriques de tous les workers (actifs et arrêtés)"""
+        with self._lock:
+            return [self._retired_metrics.snapshot()] + [w.metrics for w in self._workers if w.metrics]
+
+    @property
+    def startup_failing(self) -> bool:
+        """L'initialisation des workers échoue de façon répétée (relances avec délai)"""
+        return self._startup_failures >= self.startup_attempts
+
+    def stats(self) -> Dict:
+        with self._lock:
+            workers = [{'pid': w.process.pid, 'ready': w.ready, 'busy': w.task is not None,
+                        'documents': w.tasks_done, 'rss_mb': round(w.rss_mb, 1)}
+                       for w in self._workers]
+            history = list(self.rss_history)
+            pending = len(self._pending)
+            next_retry = min(self._respawn_at, default=None)
+            startup = {'failing': self.startup_failing, 'consecutive_failures': self._startup_failures,
+                       'last_error': self._startup_error,
+                       'retry_in_s': round(max(0.0, next_retry - time.monotonic()), 1)
+                       if next_retry is not None else None}
+        warmups = list(self.warmup_seconds)
+        return dict(
+            self.counters,
+            pending=pending,
+            workers=workers,
+            startup=startup,
+            warmup_avg_s=round(sum(warmups) / len(warmups), 3) if warmups else 0.0,
+            rss_max_mb=round(max((h[2] for h in history), default=0.0), 1),
+            rss_history=[{'t': round(t - self.started_at, 2), 'pid': pid, 'rss_mb': round(rss, 1),
+                          'documents': docs} for t, pid, rss, docs in history],
+        )
+
+    # ==============================================================
+    # GESTION DES WORKERS (thread gestionnaire)
+    # ==============================================================
+    def _wake(self):
+        try:
+            self._wake_send.send_bytes(b'.')
+        except OSError:
+            pass
+
+    def _spawn(self, successor: bool = False) -> _Worker:
+        parent_conn, child_conn = self.ctx.Pipe()
+        process = self.ctx.Process(target=_worker_main, args=(child_conn, self.initializer),
+                                   name='cv-worker', daemon=True)
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, parent_conn)
+        self._workers.append(worker)
+        self.counters['workers_started'] += 1
+        return worker
+
+    def _retire(self, worker: _Worker, kill: bool = False):
+        self._workers.remove(worker)
+        if worker.metrics is not None:
+            self._retired_metrics.merge(worker.metrics)
+        if kill:
+            worker.process.kill()
+        else:
+            try:
+                worker.conn.send(None)
+            except (OSError, BrokenPipeError):
+                worker.process.kill()
+        worker.process.join(timeout=5)
+        if worker.process.is_alive():
+            worker.process.kill()
+            worker.process.join()
+        worker.conn.close()
+
+    def _replace(self, worker: _Worker, kill: bool = False):
+        """Retire le worker ; un successeur est lancé sauf s'il l'est déjà"""
+        self._retire(worker, kill)
+        if not worker.successor_spawned and not self._shutdown:
+            self._spawn()
+
+    def _on_message(self, worker: _Worker, message):
+        kind = message[0]
+        worker.metrics = message[-1]
+        if kind == 'ready':
+            _, warmup, rss, _ = message
+            worker.ready = True
+            worker.rss_mb = rss
+            self._startup_failures = 0
+            self._startup_error = None
+            self.warmup_seconds.append(warmup)
+            self.rss_history.append((time.time(), worker.process.pid, rss, 0))
+            self.logger.info(f"Worker {worker.process.pid} prêt en {warmup:.2f}s ({rss:.0f} Mo)")
+            return
+
+        _, task_id, (ok, value), rss, _ = message
+        _, future = worker.task
+        worker.task = None
+        worker.deadline = None
+        worker.tasks_done += 1
+        worker.rss_mb = rss
+        self.rss_history.append((time.time(), worker.process.pid, rss, worker.tasks_done))
+        if ok:
+            self.counters['tasks_completed'] += 1
+            future.set_result(value)
+        else:
+            self.counters['tasks_failed'] += 1
+            future.set_exception(value)
+
+        if self.max_tasks_per_worker and worker.tasks_done >= self.max_tasks_per_worker:
+            self.counters['recycled_max_tasks'] += 1
+            self.logger.info(f"Recyclage du worker {worker.process.pid} après {worker.tasks_done} documents")
+            self._replace(worker)
+        elif self.max_rss_mb and rss > self.max_rss_mb:
+            self.counters['recycled_rss'] += 1
+            self.logger.info(f"Recyclage du worker {worker.process.pid}: RSS {rss:.0f} Mo > {self.max_rss_mb:.0f} Mo")
+            self._replace(worker)
+
+    def _fail_pending(self, error: Exception):
+        while self._pending:
+            future, _, _ = self._pending.popleft()
+            if future.set_running_or_notify_cancel():
+                self.counters['tasks_failed'] += 1
+                future.set_exception(error)
+
+    def _dispatch(self):
+        for worker in self._workers:
+            if not self._pending:
+                return
+            if not worker.ready or worker.task is not None:
+                continue
+            future, fn, args = self._pending.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            self._next_task += 1
+            try:
+                worker.conn.send((self._next_task, fn, args))
+            except Exception as e:
+                # Tâche non sérialisable : échec de la tâche seule
+                self.counters['tasks_failed'] += 1
+                future.set_exception(e)
+                continue
+            worker.task = (self._next_task, future)
+            worker.deadline = time.monotonic() + self.task_timeout if self.task_timeout else None
+            # Dernier document avant recyclage planifié : le successeur se charge pendant ce temps
+            if (self.max_tasks_per_worker and not worker.successor_spawned
+                    and worker.tasks_done + 1 >= self.max_tasks_per_worker):
+                worker.successor_spawned = True
+                self._spawn()
+
+    def _check_deadlines(self):
+        now = time.monotonic()
+        for worker in list(self._workers):
+            if worker.deadline is not None and now >= worker.deadline:
+                _, future = worker.task
+                pid = worker.process.pid
+                self.counters['timeouts'] += 1
+                self.counters['tasks_failed'] += 1
+                self.logger.error(f"Document hors délai ({self.task_timeout:.0f}s): worker {pid} tué")
+                self._replace(worker, kill=True)
+                future.set_exception(WorkerTimeoutError(self.task_timeout, pid))
+
+    def _respawn_due(self):
+        now = time.monotonic()
+        for due in [t for t in self._respawn_at if t <= now]:
+            self._respawn_at.remove(due)
+            self._spawn()
+
+    def _manage(self):
+        while True:
+            with self._lock:
+                self._respawn_due()
+                if self.startup_failing and not any(w.ready for w in self._workers):
+                    self._fail_pending(WorkerCrashedError(
+                        f"aucun worker disponible (initialisation: {self._startup_error})"))
+                self._dispatch()
+                if self._shutdown and not self._pending and all(w.task is None for w in self._workers):
+                    break
+                connections = {w.conn: w for w in self._workers}
+                deadlines = [w.deadline for w in self._workers if w.deadline is not None] + self._respawn_at
+            timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            ready = wait_connections(list(connections) + [self._wake_recv], timeout=timeout)
+
+            with self._lock:
+                for conn in ready:
+                    if conn is self._wake_recv:
+                        while self._wake_recv.poll():
+                            self._wake_recv.recv_bytes()
+                        continue
+                    worker = connections[conn]
+                    if worker not in self._workers:
+                        continue
+                    try:
+                        message = conn.recv()
+                    except (EOFError, OSError):
+                        self._on_crash(worker)
+                        continue
+                    self._on_message(worker, message)
+                self._check_deadlines()
+
+        with self._lock:
+            for worker in list(self._workers):
+                self._retire(worker)
+        self.logger.info(f"Pool arrêté: {dict(self.counters)}")
+
+    def _on_crash(self, worker: _Worker):
+        self.counters['crashes'] += 1
+        worker.process.join(timeout=1)
+        exitcode = worker.process.exitcode
+        self.logger.error(f"Worker {worker.process.pid} arrêté brutalement (code {exitcode})")
+        task = worker.task
+        if not worker.ready:
+            self._startup_failures += 1
+            self._startup_error = f"worker arrêté pendant l'initialisation (code {exitcode})"
+            if self.startup_failing:
+                # L'initialisation échoue systématiquement : relance différée, délai doublé à chaque échec
+                self._retire(worker, kill=True)
+                self._fail_pending(WorkerCrashedError(
+                    f"initialisation des workers impossible ({self._startup_failures} échecs)"))
+                if not self._shutdown:
+                    retries = self._startup_failures - self.startup_attempts
+                    delay = min(self.max_retry_delay, self.retry_delay * 2 ** min(retries, 32))
+                    self._respawn_at.append(time.monotonic() + delay)
+                    self.logger.error(f"Nouvel essai de démarrage d'un worker dans {delay:.0f}s")
+                return
+        self._replace(worker, kill=True)
+        if task is not None:
+            self.counters['tasks_failed'] += 1
+            task[1].set_exception(WorkerCrashedError(
+                f"worker {worker.process.pid} arrêté pendant le document (code {exitcode})"))
@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from src.adaptive_ocr import CoarseToFineOCR
+from src.ocr_blocks import OCRBlocks
+
+# Page de référence (scale 1.0) : une ligne bien lue, une ligne douteuse à la passe grossière
+PAGE_SIZE = (1200, 1600)
+CLEAR_LINE = (100, 100, 500, 140)
+DOUBTFUL_LINE = (100, 400, 400, 440)
+
+
+def _box(x0, y0, x1, y1):
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+
+
+def _blocks(items):
+    return OCRBlocks.from_easyocr([(_box(*bounds), text, conf) for bounds, text, conf in items])
+
+
+class PageLoader:
+    def __init__(self):
+        self.page = Image.new('L', PAGE_SIZE, 255)
+        draw = ImageDraw.Draw(self.page)
+        for line in (CLEAR_LINE, DOUBTFUL_LINE):
+            draw.rectangle(line, fill=0)
+        self.renders = []
+
+    def render_page(self, file_path, page_num=0, scale=1.0, clip=None):
+        self.renders.append((scale, clip))
+        image = self.page
+        if clip is not None:
+            x0, y0, x1, y1 = clip
+            image = image.crop((int(x0 * image.width), int(y0 * image.height),
+                                int(round(x1 * image.width)), int(round(y1 * image.height))))
+        return image.resize((max(1, int(image.width * scale)), max(1, int(image.height * scale))))
+
+
+class GrayPreprocessor:
+    def preprocess_image(self, image):
+        return np.asarray(image, dtype=np.uint8)
+
+
+class FakeEngine:
+    min_confidence = 0.5
+
+    def __init__(self):
+        self.passes = []
+
+    def extract_text(self, image, paragraph=False, min_confidence=None):
+        height, width = image.shape[:2]
+        if (width, height) == (PAGE_SIZE[0] // 2, PAGE_SIZE[1] // 2):
+            self.passes.append('coarse')
+            return _blocks([((50, 50, 250, 70), "Alice Martin", 0.9),
+                            ((50, 200, 200, 220), "0b 12 3A", 0.2)])
+        if (width, height) == PAGE_SIZE:
+            self.passes.append('full_page')
+            return _blocks([((100, 100, 500, 140), "Alice Martin", 0.95),
+                            ((100, 400, 400, 440), "06 12 34 56 78", 0.9)])
+        self.passes.append('region')
+        return _blocks([((10, 10, 100, 30), "06 12 34 56 78", 0.9)])
+
+    def extract_text_with_language(self, image, results=None):
+        return {'ocr_results': results, 'full_text': ' '.join(block['text'] for block in results)}
+
+
+def _ocr(**kwargs):
+    loader, engine = PageLoader(), FakeEngine()
+    return CoarseToFineOCR(engine, loader, GrayPreprocessor(), **kwargs), loader, engine
+
+
+def test_only_the_doubtful_line_is_read_again():
+    ocr, loader, engine = _ocr()
+    data = ocr.extract('cv.pdf')
+
+    assert engine.passes == ['coarse', 'region']
+    assert data['reocr']['regions'] == 1 and data['reocr']['low_confidence_blocks'] == 1
+    assert 0 < data['reocr']['reocr_fraction'] < 0.05
+
+    # La zone relue couvre la ligne douteuse, pas la ligne bien lue
+    scale, (x0, y0, x1, y1) = loader.renders[-1]
+    assert scale == 1.0
+    assert x0 * PAGE_SIZE[0] <= DOUBTFUL_LINE[0] and x1 * PAGE_SIZE[0] >= DOUBTFUL_LINE[2]
+    assert y0 * PAGE_SIZE[1] <= DOUBTFUL_LINE[1] and y1 * PAGE_SIZE[1] >= DOUBTFUL_LINE[3]
+    assert y0 * PAGE_SIZE[1] > CLEAR_LINE[3]
+
+    # Boîtes finales dans le repère de référence
+    by_text = {block['text']: block['bbox'] for block in data['ocr_results']}
+    assert set(by_text) == {"Alice Martin", "06 12 34 56 78"}
+    assert by_text["Alice Martin"][0] == [100, 100]
+    origin_x, origin_y = round(x0 * PAGE_SIZE[0]), round(y0 * PAGE_SIZE[1])
+    assert by_text["06 12 34 56 78"][0] == pytest.approx([origin_x + 10, origin_y + 10], abs=2)
+
+
+def test_large_doubtful_area_falls_back_to_the_full_page():
+    ocr, loader, engine = _ocr(max_reocr_fraction=0.001)
+    data = ocr.extract('cv.pdf')
+
+    assert engine.passes == ['coarse', 'full_page']
+    assert loader.renders[-1] == (1.0, None)
+    assert data['reocr']['reocr_fraction'] == 1.0
+    assert [block['text'] for block in data['ocr_results']] == ["Alice Martin", "06 12 34 56 78"]
+
+
+def test_too_many_regions_falls_back_to_the_full_page():
+    ocr, _, engine = _ocr(max_regions=0)
+    ocr.extract('cv.pdf')
+    assert engine.passes == ['coarse', 'full_page']
+
+
+def test_clean_coarse_pass_reads_nothing_again():
+    ocr, loader, engine = _ocr()
+    engine.min_confidence = 0.1
+    data = ocr.extract('cv.pdf')
+    assert engine.passes == ['coarse']
+    assert data['reocr']['regions'] == 0 and len(loader.renders) == 1
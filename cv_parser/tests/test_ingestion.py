@@ -0,0 +1,134 @@
+import os
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from src.ingestion import IngestionDaemon, IngestionManifest
+
+
+def _analyze(path, output_dir):
+    if 'corrompu' in path:
+        raise ValueError("PDF illisible")
+    return {'output_file': os.path.join(output_dir, os.path.basename(path) + '.json')}
+
+
+class ImmediateExecutor:
+    """Exécute chaque document à la soumission (pas de pool de processus)"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append(args[0])
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    (tmp_path / 'input').mkdir()
+    return str(tmp_path / 'input'), str(tmp_path / 'output')
+
+
+def _daemon(dirs, settle_seconds=0.2):
+    os.makedirs(dirs[1], exist_ok=True)
+    return IngestionDaemon(dirs[0], dirs[1], process_fn=_analyze, settle_seconds=settle_seconds)
+
+
+def _write(directory, name, content=b'%PDF-1.4 cv'):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(content)
+    return path
+
+
+def _process(daemon, executor):
+    """Un tour de boucle : fichiers stables soumis puis résultats collectés"""
+    for path, size, mtime, first_seen in daemon._stable_files():
+        daemon._submit(executor, path, size, mtime, first_seen)
+    daemon._collect(set(daemon._in_flight.values()))
+
+
+def test_file_is_submitted_once_it_stops_changing(dirs):
+    daemon = _daemon(dirs)
+    path = _write(dirs[0], 'alice.pdf', b'%PDF-1.4 debut')
+    daemon._observe(path)
+    daemon._observe(os.path.join(dirs[0], 'notes.xlsx'))
+    assert daemon._stable_files() == []
+
+    # Encore en cours d'écriture : l'attente repart de zéro
+    time.sleep(0.15)
+    with open(path, 'ab') as f:
+        f.write(b' suite')
+    daemon._observe(path)
+    time.sleep(0.1)
+    assert daemon._stable_files() == []
+
+    time.sleep(0.15)
+    ready = daemon._stable_files()
+    assert [entry[0] for entry in ready] == [path]
+    assert ready[0][1] == os.path.getsize(path)
+    assert daemon.counters['files_seen'] == 1
+
+
+def test_empty_file_is_not_stable(dirs):
+    daemon = _daemon(dirs, settle_seconds=0)
+    path = _write(dirs[0], 'vide.pdf', b'')
+    daemon._observe(path)
+    assert daemon._stable_files() == []
+    assert path in daemon._settling
+
+
+def test_duplicate_content_is_skipped(dirs):
+    daemon, executor = _daemon(dirs, settle_seconds=0), ImmediateExecutor()
+    first = _write(dirs[0], 'alice.pdf')
+    copy = _write(dirs[0], 'alice (1).pdf')
+    for path in (first, copy):
+        daemon._observe(path)
+    _process(daemon, executor)
+
+    assert executor.submitted == [first]
+    assert daemon.counters['duplicates_skipped'] == 1
+    assert daemon.counters['files_processed'] == 1
+
+    # Même contenu déposé plus tard : déjà traité d'après le manifeste
+    later = _write(dirs[0], 'alice_bis.pdf')
+    daemon._observe(later)
+    _process(daemon, executor)
+    assert executor.submitted == [first]
+    assert daemon.counters['duplicates_skipped'] == 2
+
+
+def test_manifest_records_outcomes_and_resumes_unfinished_files(dirs):
+    daemon, executor = _daemon(dirs, settle_seconds=0), ImmediateExecutor()
+    done = _write(dirs[0], 'alice.pdf')
+    failed = _write(dirs[0], 'corrompu.pdf', b'%PDF-1.4 ???')
+    for path in (done, failed):
+        daemon._observe(path)
+    _process(daemon, executor)
+
+    manifest = IngestionManifest(daemon.manifest.path)
+    statuses = {entry['path']: entry for entry in manifest.files.values()}
+    assert statuses[done]['status'] == 'done'
+    assert statuses[done]['output'].endswith('alice.pdf.json')
+    assert statuses[failed]['status'] == 'error' and 'illisible' in statuses[failed]['error']
+    assert manifest.pending() == []
+
+    # Arrêt brutal pendant un document : repris au redémarrage
+    pending = _write(dirs[0], 'bruno.pdf', b'%PDF-1.4 bruno')
+    daemon._observe(pending)
+    for path, size, mtime, first_seen in daemon._stable_files():
+        daemon._submit(ImmediateExecutor(), path, size, mtime, first_seen)
+    restarted = IngestionManifest(daemon.manifest.path)
+    assert [(entry['path'], entry['status']) for entry in restarted.pending()] == [(pending, 'processing')]
+
+    # Fichier déjà traité et inchangé : ni re-haché ni resoumis après redémarrage
+    fresh = _daemon(dirs, settle_seconds=0)
+    fresh._observe(done)
+    assert fresh._stable_files() == []
+    assert fresh.counters['files_seen'] == 0
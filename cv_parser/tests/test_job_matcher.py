@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from src.job_matcher import CandidateJobMatcher, normalize_term
+
+SKILLS = ['Python', 'SQL', 'service client', 'Excel', 'secourisme', 'vente', 'Java', 'gestion']
+LANGUAGES = ['Anglais', 'English', 'Français', 'Arabe', 'Espagnol']
+DIPLOMAS = ['Licence en tourisme', 'Master MBA', 'BTS commerce', 'Baccalauréat', 'CCA']
+ROLES = ['Hôtesse de l\'air', 'Steward', 'Agent commercial', 'Superviseur', 'Développeur']
+
+
+def _random_cv(rng):
+    return {
+        'competences': rng.sample(SKILLS, rng.randint(0, 4)),
+        'langues': [{'langue': name} for name in rng.sample(LANGUAGES, rng.randint(0, 2))],
+        'formations': [{'diplome': d} for d in rng.sample(DIPLOMAS, rng.randint(0, 2))],
+        'experiences': [{'poste': p} for p in rng.sample(ROLES, rng.randint(0, 2))],
+    }
+
+
+def _brute_force_score(matcher, cv, job):
+    """Règle de jobMatching.js, terme à terme : part des termes requis présents, par bloc"""
+    vocab = matcher.vocabulary
+    have = {vocab.terms[i] for i in matcher.candidate_features(cv, add=False)}
+    score = 0.0
+    for block, weight in matcher.weights.items():
+        terms = job.get(block) or []
+        if block == 'education':
+            terms = [kw for t in terms for kw in matcher._education_re.findall(normalize_term(t))] or terms
+        elif block == 'experience':
+            terms = [kw for t in terms for kw in matcher._role_re.findall(normalize_term(t))] or terms
+        required = {f"{block}:{vocab.canonical(t)}" for t in terms if normalize_term(t)}
+        score += weight * (len(required & have) / len(required) if required else 1.0)
+    return score
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_top_k_matches_brute_force_ranking(seed):
+    rng = random.Random(seed)
+    cvs = [_random_cv(rng) for _ in range(300)]
+    jobs = [
+        {'skills': ['python', 'sql'], 'languages': ['english'], 'education': ['Master'],
+         'experience': ['developpeur']},
+        {'skills': ['Service client', 'vente'], 'languages': ['anglais', 'arabe'],
+         'experience': ['hotesse', 'steward']},
+        {'skills': ['secourisme', 'inconnu du vivier']},
+        {},
+    ]
+    matcher = CandidateJobMatcher().fit_candidates(cvs, ids=[f"cv{i}" for i in range(len(cvs))])
+
+    k = 15
+    for job, ranked in zip(jobs, matcher.top_k(jobs, k=k)):
+        expected = sorted((_brute_force_score(matcher, cv, job) for cv in cvs), reverse=True)[:k]
+        assert [r['score'] for r in ranked] == [int(round(s * 100)) for s in expected]
+        for result in ranked:
+            cv = cvs[int(result['candidate'][2:])]
+            assert result['score'] == int(round(_brute_force_score(matcher, cv, job) * 100))
+
+
+def test_synonyms_and_accents_share_a_feature():
+    matcher = CandidateJobMatcher().fit_candidates([
+        {'langues': [{'langue': 'English'}], 'competences': ['Sécurité']},
+        {'langues': [{'langue': 'anglais'}], 'competences': ['securite']},
+    ])
+    scores = matcher.score({'languages': ['Anglais'], 'skills': ['sécurité']})
+    assert scores[0, 0] == pytest.approx(scores[1, 0])
+    assert scores[0, 0] == pytest.approx(1.0)
+
+
+def test_k_larger_than_pool_and_unfitted_matcher():
+    matcher = CandidateJobMatcher().fit_candidates([{'competences': ['Python']}])
+    assert len(matcher.top_k({'skills': ['python']}, k=10)[0]) == 1
+    with pytest.raises(RuntimeError):
+        CandidateJobMatcher().score({'skills': ['python']})
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from src.metrics import MetricsRegistry
+
+
+def test_render_uses_the_prometheus_text_format():
+    registry = MetricsRegistry()
+    registry.inc('cv_documents_total', format='pdf', status='success')
+    registry.inc('cv_documents_total', 2, format='pdf', status='success')
+    registry.set_gauge('cv_queue_depth', 4, lane='bulk')
+    registry.observe('cv_stage_seconds', 0.3, stage='ocr')
+    registry.observe('cv_stage_seconds', 7.5, stage='ocr')
+    lines = registry.render().splitlines()
+
+    assert '# TYPE cv_documents_total counter' in lines
+    assert 'cv_documents_total{format="pdf",status="success"} 3' in lines
+    assert '# TYPE cv_queue_depth gauge' in lines
+    assert 'cv_queue_depth{lane="bulk"} 4' in lines
+    # Seaux cumulatifs
+    assert 'cv_stage_seconds_bucket{stage="ocr",le="0.25"} 0' in lines
+    assert 'cv_stage_seconds_bucket{stage="ocr",le="0.5"} 1' in lines
+    assert 'cv_stage_seconds_bucket{stage="ocr",le="10"} 2' in lines
+    assert 'cv_stage_seconds_bucket{stage="ocr",le="+Inf"} 2' in lines
+    assert 'cv_stage_seconds_sum{stage="ocr"} 7.8' in lines
+    assert 'cv_stage_seconds_count{stage="ocr"} 2' in lines
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.inc('cv_documents_total', format='a"b\\c\nd')
+    assert 'cv_documents_total{format="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+
+def test_worker_snapshots_are_merged():
+    first, second = MetricsRegistry(), MetricsRegistry()
+    for registry, seconds in ((first, 0.02), (second, 2.0)):
+        registry.inc('cv_documents_total', status='success')
+        registry.observe('cv_document_seconds', seconds)
+    first.set_gauge('cv_workers_ready', 1)
+    second.set_gauge('cv_workers_ready', 2)
+
+    combined = MetricsRegistry.combined([first.snapshot(), second.snapshot()])
+    lines = combined.render().splitlines()
+    assert 'cv_documents_total{status="success"} 2' in lines
+    assert 'cv_document_seconds_bucket{le="0.025"} 1' in lines
+    assert 'cv_document_seconds_count 2' in lines
+    # Jauge : dernière valeur reçue
+    assert 'cv_workers_ready 2' in lines
+    # Les instantanés d'origine ne sont pas modifiés
+    assert first.snapshot()['histograms'][('cv_document_seconds', ())][-1] == 1
+
+
+@pytest.fixture
+def server(monkeypatch):
+    pytest.importorskip('fastapi')
+    monkeypatch.syspath_prepend(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'python-service'))
+    import server
+    return server
+
+
+def test_ready_is_503_until_a_worker_has_loaded_its_models(server, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    workers = [{'ready': False, 'pid': 101, 'rss_mb': 0.0}]
+    startup = {'failing': False, 'consecutive_failures': 0, 'last_error': None, 'retry_in_s': None}
+    monkeypatch.setattr(server.pool, 'stats', lambda: {'workers': workers, 'startup': startup})
+    client = TestClient(server.app)
+
+    response = client.get('/ready')
+    assert response.status_code == 503
+    assert response.json()['ready'] is False and response.json()['workers_ready'] == 0
+    assert client.get('/health').status_code == 200
+
+    workers[0]['ready'] = True
+    response = client.get('/ready')
+    assert response.status_code == 200 and response.json()['workers_ready'] == 1
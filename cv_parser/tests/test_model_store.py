@@ -0,0 +1,44 @@
+import hashlib
+
+import pytest
+
+from src import model_store
+from src.model_store import ModelStoreError
+
+WEIGHTS = {'detecteur.pth': b'craft' * 100, 'lecteur.pth': b'latin' * 100}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_store, 'REQUIRED_MODELS',
+                        {name: hashlib.md5(content).hexdigest() for name, content in WEIGHTS.items()})
+    monkeypatch.setenv('CV_MODEL_DIR', str(tmp_path))
+    monkeypatch.setenv('CV_MODEL_DOWNLOAD', '0')
+    for name, content in WEIGHTS.items():
+        (tmp_path / name).write_bytes(content)
+    return tmp_path
+
+
+def test_complete_store_is_verified(store):
+    result = model_store.verify()
+    assert result['directory'] == str(store)
+    assert result['files'] == 2 and result['bytes'] == 1000
+    assert model_store.main(['verify']) == 0
+
+
+def test_missing_weights_fail_unless_download_is_enabled(store, monkeypatch, capsys):
+    (store / 'lecteur.pth').unlink()
+    with pytest.raises(ModelStoreError, match='lecteur.pth'):
+        model_store.verify()
+    assert model_store.main(['verify']) == 1
+    assert 'Poids EasyOCR absents' in capsys.readouterr().err
+
+    # EasyOCR téléchargera le fichier manquant ; celui présent reste contrôlé
+    monkeypatch.setenv('CV_MODEL_DOWNLOAD', '1')
+    assert model_store.verify()['bytes'] == 500
+
+
+def test_corrupt_weights_fail(store):
+    (store / 'detecteur.pth').write_bytes(b'craft' * 50)  # téléchargement interrompu
+    with pytest.raises(ModelStoreError, match='Somme de contrôle invalide'):
+        model_store.verify()
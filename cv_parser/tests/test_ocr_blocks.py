@@ -0,0 +1,61 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from src.ocr_blocks import OCRBlocks
+
+RAW = [
+    ([[10, 20], [200, 20], [200, 40], [10, 40]], "  Hôtesse de l'air  ", 0.93),
+    ([[10, 60], [120, 60], [120, 80], [10, 80]], "مضيفة طيران", 0.71),
+    ([[5, 100], [90, 100], [90, 118], [5, 118]], "", 0.4),
+    ([[300, 20], [400, 20], [400, 40], [300, 40]], "Émirats — 2019-2023", 0.88),
+]
+
+
+def _assert_same(first: OCRBlocks, second: OCRBlocks):
+    assert first.texts == second.texts
+    assert first.text == second.text
+    np.testing.assert_array_equal(first.boxes, second.boxes)
+    np.testing.assert_array_equal(first.confidences, second.confidences)
+    np.testing.assert_array_equal(first.offsets, second.offsets)
+    np.testing.assert_array_equal(first.word_counts, second.word_counts)
+    assert first.to_dicts() == second.to_dicts()
+
+
+@pytest.fixture
+def blocks():
+    return OCRBlocks.from_easyocr(RAW)
+
+
+def test_from_easyocr_keeps_non_ascii_text(blocks):
+    assert blocks.texts == ["Hôtesse de l'air", "مضيفة طيران", "", "Émirats — 2019-2023"]
+    assert blocks.word_counts.tolist() == [3, 2, 0, 3]
+    assert blocks[1]['text'] == "مضيفة طيران"
+
+
+@pytest.mark.parametrize("make", [lambda b: b, lambda b: b.filter(np.array([3, 1])), lambda b: OCRBlocks()])
+def test_bytes_round_trip(blocks, make):
+    original = make(blocks)
+    _assert_same(OCRBlocks.from_bytes(original.to_bytes()), original)
+
+
+def test_from_bytes_accepts_memoryview(blocks):
+    _assert_same(OCRBlocks.from_bytes(memoryview(blocks.to_bytes())), blocks)
+
+
+def test_pickle_round_trip(blocks):
+    restored = pickle.loads(pickle.dumps(blocks))
+    assert isinstance(restored, OCRBlocks)
+    _assert_same(restored, blocks)
+
+
+def test_filtered_blocks_keep_their_texts(blocks):
+    confident = blocks.filter(blocks.confidences >= 0.8)
+    assert confident.texts == ["Hôtesse de l'air", "Émirats — 2019-2023"]
+    restored = pickle.loads(pickle.dumps(confident[::-1]))
+    assert restored.texts == ["Émirats — 2019-2023", "Hôtesse de l'air"]
+
+
+def test_legacy_dicts_round_trip(blocks):
+    _assert_same(OCRBlocks.from_results(blocks.to_dicts()).filter(np.arange(len(blocks))), blocks)
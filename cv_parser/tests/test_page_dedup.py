@@ -0,0 +1,167 @@
+import io
+import multiprocessing as mp
+import os
+import shutil
+import sqlite3
+
+import fitz
+import pytest
+from PIL import Image
+
+from src.document_loader import CVDocumentLoader
+from src.ocr_blocks import OCRBlocks
+from src.page_dedup import PageDedupIndex
+
+
+def _scanned_cv(path, name, phone, quality=85):
+    """CV du même modèle (bandeau, lignes d'expérience) numérisé en JPEG dans un PDF"""
+    page_doc = fitz.open()
+    page = page_doc.new_page(width=595, height=842)
+    page.draw_rect(fitz.Rect(0, 0, 595, 120), color=(0.1, 0.2, 0.5), fill=(0.1, 0.2, 0.5))
+    page.insert_text((40, 70), name, fontsize=26, color=(1, 1, 1))
+    page.insert_text((40, 160), phone, fontsize=11)
+    for i in range(20):
+        page.insert_text((40, 200 + i * 28), f"Experience ligne {i}", fontsize=10)
+    pix = page.get_pixmap(matrix=fitz.Matrix(150 / 72, 150 / 72))
+    buffer = io.BytesIO()
+    Image.frombytes("RGB", (pix.width, pix.height), pix.samples).save(buffer, "JPEG", quality=quality)
+
+    scan = fitz.open()
+    scan.new_page(width=595, height=842).insert_image(fitz.Rect(0, 0, 595, 842), stream=buffer.getvalue())
+    scan.save(str(path))
+    return str(path)
+
+
+def _ocr_data(text):
+    return {'ocr_results': OCRBlocks.from_easyocr([([[0, 0], [10, 0], [10, 10], [0, 10]], text, 0.9)]),
+            'full_text': text, 'language_info': {'primary': 'fr'}}
+
+
+@pytest.fixture
+def index(tmp_path):
+    return PageDedupIndex(str(tmp_path / 'index'))
+
+
+@pytest.fixture
+def stored_cv(tmp_path, index):
+    path = _scanned_cv(tmp_path / 'alice.pdf', "Alice Martin", "06 12 34 56 78")
+    index.store(index.signature(CVDocumentLoader().load_preview(path), path), _ocr_data("Alice Martin"))
+    return path
+
+
+def _lookup(index, path):
+    return index.lookup(index.signature(CVDocumentLoader().load_preview(path), path))
+
+
+def test_identical_file_reuses_ocr(tmp_path, index, stored_cv):
+    copy = shutil.copy(stored_cv, tmp_path / 'copie.pdf')
+    result = _lookup(index, str(copy))
+    assert result is not None
+    assert result['dedup']['match'] == 'identical'
+    assert result['full_text'] == "Alice Martin"
+    assert result['ocr_results'].texts == ["Alice Martin"]
+
+
+def test_recompressed_page_reuses_ocr(tmp_path, index, stored_cv):
+    path = _scanned_cv(tmp_path / 'alice_q50.pdf', "Alice Martin", "06 12 34 56 78", quality=50)
+    result = _lookup(index, path)
+    assert result is not None
+    assert result['dedup']['match'] == 'content'
+
+
+@pytest.mark.parametrize("name, phone", [("Bruno Dupont", "06 12 34 56 78"),
+                                         ("Alice Martin", "06 12 34 56 79")])
+def test_same_template_different_content_is_rejected(tmp_path, index, stored_cv, name, phone):
+    path = _scanned_cv(tmp_path / 'autre.pdf', name, phone)
+    loader = CVDocumentLoader()
+    # Le hash perceptuel seul confondrait les deux pages
+    first, _ = PageDedupIndex.fingerprint(loader.load_preview(stored_cv))
+    second, _ = PageDedupIndex.fingerprint(loader.load_preview(path))
+    assert bin(first ^ second).count('1') <= index.max_distance
+
+    assert _lookup(index, path) is None
+    assert index.rejected == 1
+    assert index.stats()['hits'] == 0
+
+
+def _store_pages(index_dir, worker, count):
+    index = PageDedupIndex(index_dir)
+    for i in range(count):
+        path = os.path.join(index_dir, f"page_{worker}_{i}.png")
+        Image.new('L', (200, 280), 40 * worker + i).save(path)
+        index.store(index.signature(Image.open(path), path), _ocr_data(f"{worker}-{i}"))
+
+
+def test_concurrent_workers_keep_every_entry(tmp_path, index, stored_cv):
+    index_dir = index.index_dir
+    workers = [mp.Process(target=_store_pages, args=(index_dir, worker, 5)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+    assert all(process.exitcode == 0 for process in workers)
+
+    assert PageDedupIndex(index_dir).stats()['entries'] == 21
+    # Un index déjà ouvert voit les pages enregistrées par les autres workers
+    path = os.path.join(index_dir, "page_3_4.png")
+    result = index.lookup(index.signature(Image.open(path), path))
+    assert result is not None and result['full_text'] == "3-4"
+
+
+class CountingLoader(CVDocumentLoader):
+    def __init__(self):
+        super().__init__()
+        self.renders = 0
+
+    def render_page(self, *args, **kwargs):
+        self.renders += 1
+        return super().render_page(*args, **kwargs)
+
+
+def test_miss_renders_the_confirmation_page_once(tmp_path, stored_cv):
+    loader = CountingLoader()
+    index = PageDedupIndex(str(tmp_path / 'index'), loader=loader)
+    path = _scanned_cv(tmp_path / 'bruno.pdf', "Bruno Dupont", "06 12 34 56 78")
+    signature = index.signature(loader.load_preview(path), path)
+    renders = loader.renders
+
+    assert index.lookup(signature) is None
+    assert index.rejected == 1  # même modèle : comparé au rendu de confirmation puis rejeté
+    index.store(signature, _ocr_data("Bruno Dupont"))
+    assert loader.renders == renders + 1
+
+
+def test_candidates_come_from_indexed_columns(index, stored_cv):
+    where = " OR ".join(f"band{i} = 0" for i in range(index.BANDS))
+    plan = " ".join(row[-1] for row in index._db.execute(
+        f"EXPLAIN QUERY PLAN SELECT * FROM pages WHERE sha256 = '' OR {where}"))
+    assert 'MULTI-INDEX OR' in plan and 'SCAN' not in plan
+    assert 'pages_sha256' in plan and 'pages_band7' in plan
+
+
+def test_index_without_band_columns_is_migrated(tmp_path, index, stored_cv):
+    # Index au format précédent (sans colonnes d'octets du dHash)
+    columns = "dhash, thumb, sha256, ocr_file, content_file, source"
+    old_dir = tmp_path / 'ancien'
+    old_dir.mkdir()
+    for name in os.listdir(index.index_dir):
+        if not name.startswith('index.db'):
+            shutil.copy(os.path.join(index.index_dir, name), old_dir / name)
+    old = sqlite3.connect(str(old_dir / 'index.db'))
+    old.execute("CREATE TABLE pages (id INTEGER PRIMARY KEY AUTOINCREMENT, dhash INTEGER NOT NULL, "
+                "thumb BLOB NOT NULL, sha256 TEXT NOT NULL, ocr_file TEXT NOT NULL, "
+                "content_file TEXT NOT NULL, source TEXT NOT NULL)")
+    old.executemany(f"INSERT INTO pages ({columns}) VALUES (?, ?, ?, ?, ?, ?)",
+                    index._db.execute(f"SELECT {columns} FROM pages").fetchall())
+    old.commit()
+    old.close()
+
+    migrated = PageDedupIndex(str(old_dir))
+    path = _scanned_cv(tmp_path / 'alice_q50.pdf', "Alice Martin", "06 12 34 56 78", quality=50)
+    result = _lookup(migrated, path)
+    assert result is not None and result['dedup']['match'] == 'content'
+
+
+def test_max_distance_must_stay_below_the_band_count(tmp_path):
+    with pytest.raises(ValueError):
+        PageDedupIndex(str(tmp_path / 'index'), max_distance=PageDedupIndex.BANDS)
@@ -0,0 +1,92 @@
+import json
+import os
+
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+
+from src.parquet_exporter import CVParquetExporter, read_cv_dataset
+
+
+def _export(lang='fr', date='2026-03-14T10:00:00', nom='Awa Diallo', competences=('Secourisme',)):
+    return {
+        'metadata': {'export_date': date, 'detected_language': lang},
+        'cv_data': {'nom_complet': nom, 'contact': {'email': 'awa@example.com'},
+                    'competences': list(competences), 'langues': [{'langue': 'Anglais', 'niveau': 'C1'}]},
+    }
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def test_same_file_name_in_two_folders_keeps_both_cvs(tmp_path):
+    exporter = CVParquetExporter(str(tmp_path / 'parquet'))
+    exporter.append(_export(nom='Awa Diallo'), source_file=str(tmp_path / 'paris' / 'cv_analyzed.json'))
+    exporter.append(_export(nom='Lina Haddad'), source_file=str(tmp_path / 'dakar' / 'cv_analyzed.json'))
+    exporter.flush()
+
+    table = read_cv_dataset(str(tmp_path / 'parquet'), columns=['nom_complet', 'source_file'])
+    assert sorted(table.column('nom_complet').to_pylist()) == ['Awa Diallo', 'Lina Haddad']
+    assert set(table.column('source_file').to_pylist()) == {'cv_analyzed.json'}
+
+
+def test_rows_are_partitioned_by_language_and_month(tmp_path):
+    dataset_dir = tmp_path / 'parquet'
+    exporter = CVParquetExporter(str(dataset_dir))
+    exporter.append(_export(lang='fr', date='2026-03-14T10:00:00'), source_file='a.json')
+    exporter.append(_export(lang='en', date='2026-04-02T09:30:00'), source_file='b.json')
+    exporter.append({'cv_data': {'nom_complet': 'Sans métadonnées'}}, source_file='c.json')
+    exporter.flush()
+
+    partitions = {os.path.relpath(root, dataset_dir) for root, _, files in os.walk(dataset_dir)
+                  if any(f.endswith('.parquet') for f in files)}
+    assert 'detected_language=fr/export_month=2026-03' in partitions
+    assert 'detected_language=en/export_month=2026-04' in partitions
+    assert any(p.startswith('detected_language=unknown/') for p in partitions)
+
+    import pyarrow.dataset as ds
+    french = read_cv_dataset(str(dataset_dir), columns=['source_file'],
+                             filter=ds.field('detected_language') == 'fr')
+    assert french.column('source_file').to_pylist() == ['a.json']
+
+
+def test_manifest_skips_unchanged_files_and_latest_version_wins(tmp_path):
+    json_dir = tmp_path / 'output'
+    dataset_dir = str(tmp_path / 'parquet')
+    _write(str(json_dir / 'awa_analyzed.json'), _export(competences=('Secourisme',)))
+    _write(str(json_dir / 'lina_analyzed.json'), _export(nom='Lina Haddad'))
+    (json_dir / 'notes.json').write_text('{}', encoding='utf-8')
+
+    first = CVParquetExporter(dataset_dir).export_json_dir(str(json_dir))
+    assert (first['exported'], first['skipped'], first['failed']) == (2, 0, 0)
+
+    second = CVParquetExporter(dataset_dir).export_json_dir(str(json_dir))
+    assert (second['exported'], second['skipped']) == (0, 2)
+
+    # Version modifiée : ajoutée à nouveau, seule la plus récente est lue
+    path = str(json_dir / 'awa_analyzed.json')
+    _write(path, _export(competences=('Secourisme', 'Japonais')))
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    third = CVParquetExporter(dataset_dir).export_json_dir(str(json_dir))
+    assert (third['exported'], third['skipped']) == (1, 1)
+
+    everything = read_cv_dataset(dataset_dir, columns=['nom_complet'], latest_only=False)
+    assert everything.num_rows == 3
+    latest = read_cv_dataset(dataset_dir, columns=['source_file', 'competences'])
+    by_file = dict(zip(latest.column('source_file').to_pylist(), latest.column('competences').to_pylist()))
+    assert by_file == {'awa_analyzed.json': ['Secourisme', 'Japonais'], 'lina_analyzed.json': ['Secourisme']}
+
+
+def test_unreadable_json_is_counted_and_retried(tmp_path):
+    json_dir = tmp_path / 'output'
+    json_dir.mkdir()
+    (json_dir / 'broken_analyzed.json').write_text('{"cv_data": ', encoding='utf-8')
+    dataset_dir = str(tmp_path / 'parquet')
+
+    assert CVParquetExporter(dataset_dir).export_json_dir(str(json_dir))['failed'] == 1
+    # Absent du manifeste : nouvelle tentative au prochain export
+    assert CVParquetExporter(dataset_dir).export_json_dir(str(json_dir))['failed'] == 1
@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from src.pipeline import StagedPipeline
+
+
+class PassStage:
+    def __call__(self, item):
+        item['ocr_data'] = {'full_text': os.path.basename(item['path'])}
+        return item
+
+
+class MissingModelStage:
+    def __init__(self):
+        raise RuntimeError("poids OCR introuvables")
+
+
+class CrashingStage:
+    """Simule un worker tué (OOM) sur le document 'crash'"""
+
+    def __call__(self, item):
+        if item['path'] == 'crash':
+            os._exit(137)
+        return PassStage()(item)
+
+
+def _pipeline(ocr_stage, queue_size=4):
+    class TestPipeline(StagedPipeline):
+        STAGES = (('rendu', PassStage), ('pretraitement', PassStage), ('ocr', ocr_stage))
+
+    return TestPipeline(queue_size=queue_size, poll_interval=0.1)
+
+
+def _run(pipeline, files, timeout=30):
+    results = []
+    outcome = {}
+    thread = threading.Thread(
+        target=lambda: outcome.setdefault('stats', pipeline.run(files, results.append)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "le pipeline est bloqué"
+    return results, outcome['stats']
+
+
+def test_all_documents_pass_through():
+    files = [f"cv{i}.pdf" for i in range(10)]
+    results, stats = _run(_pipeline(PassStage), files)
+    assert sorted(r['path'] for r in results) == sorted(files)
+    assert all('error' not in r for r in results)
+    assert stats['documents'] == 10 and 'error' not in stats
+
+
+def test_stage_init_failure_fails_documents_instead_of_hanging():
+    files = [f"cv{i}.pdf" for i in range(12)]
+    results, _ = _run(_pipeline(MissingModelStage, queue_size=2), files)
+    assert sorted(r['path'] for r in results) == sorted(files)
+    assert all('poids OCR introuvables' in r['error'] for r in results)
+
+
+@pytest.mark.parametrize("position", [0, 5])
+def test_dead_worker_fails_in_flight_documents(position):
+    files = [f"cv{i}.pdf" for i in range(12)]
+    files.insert(position, 'crash')
+    results, stats = _run(_pipeline(CrashingStage, queue_size=2), files)
+    assert sorted(r['path'] for r in results) == sorted(files)
+    failed = [r for r in results if 'error' in r]
+    assert any(r['path'] == 'crash' for r in failed)
+    assert all('arrêté brutalement' in r['error'] for r in failed)
+    assert 'error' in stats
+
+
+@pytest.mark.parametrize('option', ['--dedup', '--coarse-to-fine'])
+def test_cli_rejects_options_the_pipeline_ignores(tmp_path, option):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    completed = subprocess.run(
+        [sys.executable, os.path.join(root, 'main.py'), str(tmp_path), '-b', '--pipeline', option],
+        cwd=tmp_path, capture_output=True, text=True)
+    assert completed.returncode == 2
+    assert '--pipeline ne prend pas en charge' in completed.stderr
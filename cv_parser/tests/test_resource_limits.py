@@ -0,0 +1,109 @@
+import os
+import pickle
+import subprocess
+import sys
+
+import fitz
+import pytest
+from PIL import Image
+
+from src.document_loader import CVDocumentLoader
+from src.resource_limits import EXIT_RESOURCE_LIMIT, ResourceLimitError, ResourceLimits, StageDeadline
+
+
+def _pdf(path, pages, width=595, height=842):
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page(width=width, height=height).insert_text((40, 60), f"Page {i + 1}")
+    doc.save(str(path))
+    return str(path)
+
+
+def _code(excinfo):
+    return excinfo.value.code
+
+
+def test_page_count_degrades_or_fails():
+    assert ResourceLimits(max_pages=10).page_count(4) == 4
+    assert ResourceLimits(max_pages=10, degraded_pages=3).page_count(500) == 3
+    with pytest.raises(ResourceLimitError) as excinfo:
+        ResourceLimits(max_pages=10, degrade=False).page_count(11)
+    assert _code(excinfo) == ResourceLimitError.TOO_MANY_PAGES
+
+
+def test_render_dpi_is_reduced_down_to_min_dpi():
+    limits = ResourceLimits(max_page_pixels=4_000_000, min_dpi=100)
+    assert limits.render_dpi(595, 842, 150) == 150
+    # A4 à 300 DPI : 8,7 Mpx > 4 Mpx, rendu réduit à ~203 DPI
+    assert 150 < limits.render_dpi(595, 842, 300) < 300
+    # Affiche A0 : il faudrait descendre sous min_dpi
+    with pytest.raises(ResourceLimitError) as excinfo:
+        limits.render_dpi(2384, 3370, 300)
+    assert _code(excinfo) == ResourceLimitError.PAGE_TOO_LARGE
+
+
+def test_too_many_pages_fails_before_rendering(tmp_path):
+    path = _pdf(tmp_path / 'long.pdf', 4)
+    loader = CVDocumentLoader(ResourceLimits(max_pages=3, degrade=False))
+    with pytest.raises(ResourceLimitError) as excinfo:
+        loader.load_document(path)
+    assert _code(excinfo) == ResourceLimitError.TOO_MANY_PAGES
+
+    degraded = CVDocumentLoader(ResourceLimits(max_pages=3, degraded_pages=2))
+    assert len(degraded.load_document(path)) == 2
+    assert degraded.last_load_info['degraded'] and degraded.last_load_info['pages_total'] == 4
+
+
+def test_decoded_bytes_limit_keeps_the_first_pages(tmp_path):
+    path = _pdf(tmp_path / 'pages.pdf', 3)
+    page_bytes = (int(595 * 300 / 72) + 1) * (int(842 * 300 / 72) + 1) * 3
+    loader = CVDocumentLoader(ResourceLimits(max_decoded_bytes=page_bytes * 2))
+    assert len(loader.load_document(path)) == 2
+
+    strict = CVDocumentLoader(ResourceLimits(max_decoded_bytes=page_bytes // 2, degrade=False))
+    with pytest.raises(ResourceLimitError) as excinfo:
+        strict.load_document(path)
+    assert _code(excinfo) == ResourceLimitError.DECODED_SIZE_EXCEEDED
+
+
+def test_oversized_image_is_checked_on_its_header(tmp_path):
+    png, jpeg = tmp_path / 'scan.png', tmp_path / 'scan.jpg'
+    Image.new('RGB', (1200, 1600), 'white').save(png)
+    Image.new('RGB', (1200, 1600), 'white').save(jpeg, quality=80)
+    limits = ResourceLimits(max_page_pixels=600_000)
+
+    with pytest.raises(ResourceLimitError) as excinfo:
+        CVDocumentLoader(limits).load_document(str(png))
+    assert _code(excinfo) == ResourceLimitError.PAGE_TOO_LARGE
+
+    # JPEG : décodé directement à résolution réduite
+    loader = CVDocumentLoader(limits)
+    image = loader.load_document(str(jpeg))[0]
+    assert image.size == (600, 800)
+    assert loader.last_load_info['degraded']
+
+
+def test_stage_deadline():
+    StageDeadline('ocr', 60).check()
+    expired = StageDeadline('ocr', 1)
+    expired.start -= 2
+    with pytest.raises(ResourceLimitError) as excinfo:
+        expired.check()
+    assert _code(excinfo) == ResourceLimitError.STAGE_TIMEOUT
+
+
+def test_error_keeps_its_code_across_processes():
+    error = pickle.loads(pickle.dumps(ResourceLimitError(ResourceLimitError.PAGE_TOO_LARGE, "image trop grande")))
+    assert (error.code, error.message) == (ResourceLimitError.PAGE_TOO_LARGE, "image trop grande")
+    assert str(error) == "[PAGE_TOO_LARGE] image trop grande"
+
+
+def test_cli_exits_with_the_resource_limit_status(tmp_path):
+    path = _pdf(tmp_path / 'long.pdf', 3)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, CV_MAX_PAGES='2', CV_DEGRADE='0')
+    completed = subprocess.run(
+        [sys.executable, os.path.join(root, 'main.py'), path, '-o', str(tmp_path / 'out')],
+        cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert completed.returncode == EXIT_RESOURCE_LIMIT == 3
+    assert 'TOO_MANY_PAGES' in completed.stdout
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from src.scheduler import Lane, PriorityScheduler, QueueFullError
+
+
+def _scheduler(workers=2, reserved=1, max_interactive=50, max_bulk=1000):
+    return PriorityScheduler(workers, [Lane('interactive', max_interactive, reserved=reserved),
+                                       Lane('bulk', max_bulk)])
+
+
+async def _hold(scheduler, lane, started, release, name=None):
+    async with scheduler.slot(lane):
+        started.append(name or lane)
+        await release.wait()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_bulk_cannot_use_the_reserved_worker():
+    async def scenario():
+        scheduler = _scheduler(workers=2, reserved=1)
+        started, release = [], asyncio.Event()
+        tasks = [asyncio.create_task(_hold(scheduler, 'bulk', started, release, f"bulk{i}")) for i in range(2)]
+        await _settle()
+        # Un worker libre, mais réservé à la voie interactive
+        assert started == ['bulk0']
+        assert scheduler.stats()['lanes']['bulk']['queued'] == 1
+
+        tasks.append(asyncio.create_task(_hold(scheduler, 'interactive', started, release)))
+        await _settle()
+        assert started == ['bulk0', 'interactive']
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert started[-1] == 'bulk1'
+        stats = scheduler.stats()['lanes']
+        assert stats['bulk']['capacity'] == 1 and stats['interactive']['capacity'] == 2
+        assert stats['bulk']['running'] == stats['interactive']['running'] == 0
+
+    asyncio.run(scenario())
+
+
+def test_waiting_interactive_request_goes_first():
+    async def scenario():
+        scheduler = _scheduler(workers=1, reserved=0)
+        started, first_release = [], asyncio.Event()
+        holder = asyncio.create_task(_hold(scheduler, 'bulk', started, first_release, 'holder'))
+        await _settle()
+        release = asyncio.Event()
+        release.set()
+        waiting = [asyncio.create_task(_hold(scheduler, 'bulk', started, release, 'bulk')),
+                   asyncio.create_task(_hold(scheduler, 'interactive', started, release))]
+        await _settle()
+        assert started == ['holder']
+
+        first_release.set()
+        await asyncio.gather(holder, *waiting)
+        assert started == ['holder', 'interactive', 'bulk']
+
+    asyncio.run(scenario())
+
+
+def test_full_lane_raises_queue_full_error():
+    async def scenario():
+        scheduler = _scheduler(workers=1, reserved=0, max_bulk=2)
+        started, release = [], asyncio.Event()
+        tasks = [asyncio.create_task(_hold(scheduler, 'bulk', started, release)) for _ in range(3)]
+        await _settle()
+        # Un document en cours, deux en file : la file bulk est pleine
+        with pytest.raises(QueueFullError) as excinfo:
+            async with scheduler.slot('bulk'):
+                pass
+        assert (excinfo.value.lane, excinfo.value.limit) == ('bulk', 2)
+        assert scheduler.stats()['lanes']['bulk']['rejected'] == 1
+
+        # L'autre voie a sa propre limite
+        interactive = asyncio.create_task(_hold(scheduler, 'interactive', started, release))
+        await _settle()
+        assert scheduler.stats()['lanes']['interactive']['queued'] == 1
+
+        release.set()
+        await asyncio.gather(*tasks, interactive)
+        assert len(started) == 4
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_request_leaves_the_queue():
+    async def scenario():
+        scheduler = _scheduler(workers=1, reserved=0, max_bulk=1)
+        started, release = [], asyncio.Event()
+        holder = asyncio.create_task(_hold(scheduler, 'bulk', started, release))
+        waiting = asyncio.create_task(_hold(scheduler, 'bulk', started, release))
+        await _settle()
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert scheduler.stats()['lanes']['bulk']['queued'] == 0
+
+        # La place libérée est de nouveau disponible
+        again = asyncio.create_task(_hold(scheduler, 'bulk', started, release))
+        await _settle()
+        release.set()
+        await asyncio.gather(holder, again)
+        assert len(started) == 2
+
+    asyncio.run(scenario())
+
+
+def test_unknown_lane():
+    async def scenario():
+        with pytest.raises(ValueError):
+            async with _scheduler().slot('urgent'):
+                pass
+
+    asyncio.run(scenario())
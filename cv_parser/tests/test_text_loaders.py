@@ -0,0 +1,92 @@
+import zipfile
+
+import pytest
+
+from src.resource_limits import ResourceLimitError, ResourceLimits
+from src.text_loaders import CVTextLoader
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+ODT = ('xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+       'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" '
+       'xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0"')
+
+
+def _zip(path, members):
+    with zipfile.ZipFile(path, 'w') as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return str(path)
+
+
+def _w_paragraph(text, style=None, numbered=False):
+    props = ''
+    if style:
+        props += f'<w:pStyle w:val="{style}"/>'
+    if numbered:
+        props += '<w:numPr><w:numId w:val="1"/></w:numPr>'
+    return f'<w:p><w:pPr>{props}</w:pPr><w:r><w:t>{text}</w:t></w:r></w:p>'
+
+
+def test_docx_keeps_headings_lists_table_cells_and_header(tmp_path):
+    body = (_w_paragraph("Hôtesse de l'air")
+            + _w_paragraph("Expérience", style='Heading1')
+            + _w_paragraph("Air France 2019-2023", numbered=True)
+            + '<w:tbl><w:tr><w:tc>' + _w_paragraph("Anglais") + '</w:tc>'
+            + '<w:tc>' + _w_paragraph("Courant") + '</w:tc></w:tr></w:tbl>')
+    path = _zip(tmp_path / 'cv.docx', {
+        'word/document.xml': f'<w:document {W}><w:body>{body}</w:body></w:document>',
+        'word/header1.xml': f'<w:hdr {W}>{_w_paragraph("Alice Martin")}</w:hdr>',
+    })
+
+    result = CVTextLoader(ResourceLimits()).load_text(path)
+    assert result['format'] == 'docx'
+    assert result['headings'] == ['Expérience']
+    assert result['lines'] == ["Alice Martin", "Hôtesse de l'air", 'Expérience',
+                               'Air France 2019-2023', 'Anglais', 'Courant']
+    # Titre isolé par une ligne vide
+    assert "Hôtesse de l'air\n\nExpérience\n" in result['text']
+
+
+def test_odt_keeps_headings_and_spacing(tmp_path):
+    content = (f'<office:document-content {ODT}><office:body><office:text>'
+               '<text:p>Alice<text:s/>Martin<text:line-break/>06 12 34 56 78</text:p>'
+               '<text:h text:outline-level="1">Compétences</text:h>'
+               '<text:list><text:list-item><text:p>Secourisme</text:p></text:list-item></text:list>'
+               '</office:text></office:body></office:document-content>')
+    path = _zip(tmp_path / 'cv.odt', {'content.xml': content})
+
+    result = CVTextLoader(ResourceLimits()).load_text(path)
+    assert result['headings'] == ['Compétences']
+    assert result['lines'] == ['Alice Martin', '06 12 34 56 78', 'Compétences', 'Secourisme']
+
+
+def test_html_and_txt(tmp_path):
+    html = tmp_path / 'cv.html'
+    html.write_text("<html><head><style>p {color: red}</style></head><body>"
+                    "<h1>Alice Martin</h1><p>alice.martin@example.com</p>"
+                    "<h2>Langues</h2><ul><li>Anglais</li><li>Espagnol</li></ul></body></html>",
+                    encoding='utf-8')
+    result = CVTextLoader(ResourceLimits()).load_text(str(html))
+    assert result['headings'] == ['Alice Martin', 'Langues']
+    assert result['lines'] == ['Alice Martin', 'alice.martin@example.com', 'Langues', 'Anglais', 'Espagnol']
+
+    # Fichier texte Windows (cp1252, fins de ligne CRLF)
+    txt = tmp_path / 'cv.txt'
+    txt.write_bytes("Alice Martin\r\nHôtesse de l'air\r\n".encode('cp1252'))
+    result = CVTextLoader(ResourceLimits()).load_text(str(txt))
+    assert result['lines'] == ['Alice Martin', "Hôtesse de l'air"]
+
+
+def test_archive_member_is_checked_before_decompression(tmp_path):
+    body = _w_paragraph('x' * 5000)
+    path = _zip(tmp_path / 'cv.docx', {'word/document.xml': f'<w:document {W}><w:body>{body}</w:body></w:document>'})
+    with pytest.raises(ResourceLimitError) as excinfo:
+        CVTextLoader(ResourceLimits(max_decoded_bytes=1000)).load_text(path)
+    assert excinfo.value.code == ResourceLimitError.DECODED_SIZE_EXCEEDED
+
+
+def test_unsupported_format(tmp_path):
+    path = tmp_path / 'cv.rtf'
+    path.write_text('{\\rtf1 Alice}')
+    with pytest.raises(ValueError, match='Format non supporté'):
+        CVTextLoader(ResourceLimits()).load_text(str(path))
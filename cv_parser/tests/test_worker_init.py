@@ -0,0 +1,35 @@
+import pytest
+from PIL import Image
+
+import main
+
+
+def test_text_cv_is_analyzed_without_ocr_weights(tmp_path, monkeypatch):
+    # Magasin de poids vide : seul un document à reconnaître doit échouer
+    monkeypatch.setenv('CV_MODEL_DIR', str(tmp_path / 'models'))
+    monkeypatch.setenv('CV_MODEL_DOWNLOAD', '0')
+    main._worker_init()
+
+    cv_file = tmp_path / 'cv.txt'
+    cv_file.write_text("Alice Martin\nalice.martin@example.com\n\nEXPERIENCE\nHôtesse de l'air, Air France\n",
+                       encoding='utf-8')
+    outcome = main._worker_analyze(str(cv_file), str(tmp_path / 'output'))
+    assert outcome['data']['nom_complet'] == 'Alice Martin'
+    assert outcome['data']['contact']['email'] == 'alice.martin@example.com'
+
+    scan = tmp_path / 'scan.png'
+    Image.new('RGB', (400, 560), 'white').save(scan)
+    with pytest.raises(RuntimeError, match='Poids EasyOCR absents'):
+        main._worker_analyze(str(scan), str(tmp_path / 'output'))
+
+
+@pytest.mark.parametrize('verbose', [False, True])
+def test_analysis_output_is_captured_for_the_service(tmp_path, verbose):
+    cv_file = tmp_path / 'cv.txt'
+    cv_file.write_text("Alice Martin\nalice.martin@example.com\n", encoding='utf-8')
+    outcome = main._worker_analyze(str(cv_file), str(tmp_path / 'output'), verbose, True)
+    assert outcome['data']['nom_complet'] == 'Alice Martin'
+    # Journaux toujours présents ; affichages détaillés seulement sans quiet
+    assert 'analyze_cv - INFO' in outcome['stdout']
+    assert ('Langue detectee' in outcome['stdout']) == verbose
+    assert isinstance(outcome['stderr'], str)
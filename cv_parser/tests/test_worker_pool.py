@@ -0,0 +1,70 @@
+import functools
+import os
+import time
+from concurrent.futures import wait
+
+import pytest
+
+from src.worker_pool import RecyclingWorkerPool, WorkerCrashedError
+
+
+def _init_unless_missing(flag_path):
+    # Initialisation impossible tant que le fichier témoin n'existe pas (poids absents...)
+    if not os.path.exists(flag_path):
+        raise RuntimeError("poids absents")
+
+
+def _square(x):
+    return x * x
+
+
+def _slow(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def _wait_until(predicate, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_startup_failures_are_retried_with_backoff(tmp_path):
+    flag = str(tmp_path / 'models_ready')
+    pool = RecyclingWorkerPool(workers=1, initializer=functools.partial(_init_unless_missing, flag),
+                               startup_attempts=2, retry_delay=0.2, max_retry_delay=0.4).start()
+    try:
+        assert _wait_until(lambda: pool.stats()['startup']['failing'])
+        # Pas de worker : le document échoue aussitôt au lieu d'attendre
+        with pytest.raises(WorkerCrashedError):
+            pool.submit(_square, 3).result(timeout=20)
+        assert _wait_until(lambda: pool.stats()['startup']['consecutive_failures'] >= 4)
+        assert pool.stats()['startup']['last_error']
+
+        # Les poids arrivent : une relance finit par démarrer et l'état d'échec s'efface
+        open(flag, 'w').close()
+        assert _wait_until(lambda: any(w['ready'] for w in pool.stats()['workers']))
+        assert pool.submit(_square, 4).result(timeout=20) == 16
+        startup = pool.stats()['startup']
+        assert not startup['failing'] and startup['consecutive_failures'] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_shutdown_without_wait_returns_at_once():
+    pool = RecyclingWorkerPool(workers=1).start()
+    running = pool.submit(_slow, 1.5)
+    assert _wait_until(lambda: any(w['busy'] for w in pool.stats()['workers']))
+    queued = pool.submit(_slow, 1.5)
+
+    started = time.monotonic()
+    pool.shutdown(wait=False)
+    assert time.monotonic() - started < 0.5
+    assert queued.cancelled()
+    # Le document en cours se termine en arrière-plan
+    wait([running], timeout=20)
+    assert running.result() == 1.5
+    assert _wait_until(lambda: not pool._manager.is_alive())